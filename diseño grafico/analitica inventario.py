@@ -0,0 +1,276 @@
+import json
+import math
+import time
+from array import array
+from datetime import date, datetime
+from itertools import islice
+from typing import Dict, Iterable, Iterator, List, Optional
+
+import numpy as np
+
+from cargador_inventario import cargar_inventario
+
+inv = cargar_inventario()
+
+# Día 0 de las columnas: 1970-01-01 (días locales, no UTC)
+ORDINAL_EPOCH = date(1970, 1, 1).toordinal()
+
+# -------------------------------
+# Historial en columnas NumPy
+# -------------------------------
+class ColumnasMovimientos:
+    """
+    Historial de movimientos como columnas NumPy: id del código (índice en `codigos`),
+    si es salida, cantidad y día local (días desde 1970-01-01). Se arma una vez y todos
+    los cálculos de PronosticoConsumo son operaciones sobre arrays, sin recorrer objetos.
+    """
+
+    def __init__(self, codigos: List[str], ids: np.ndarray, salidas: np.ndarray,
+                 cantidades: np.ndarray, dias: np.ndarray):
+        self.codigos = codigos
+        self.ids = ids
+        self.salidas = salidas
+        self.cantidades = cantidades
+        self.dias = dias
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    @staticmethod
+    def _dias_locales(epoch_us: np.ndarray) -> np.ndarray:
+        """Días locales desde epoch; el desfase horario se calcula una vez por hora distinta (cambios de horario)"""
+        if not len(epoch_us):
+            return np.zeros(0, dtype=np.int64)
+        horas, posiciones = np.unique(epoch_us // 3_600_000_000, return_inverse=True)
+        desfases = np.array([time.localtime(int(hora) * 3600).tm_gmtoff for hora in horas], dtype=np.int64)
+        return (epoch_us + desfases[posiciones] * 1_000_000) // 86_400_000_000
+
+    @classmethod
+    def desde_inventario(cls, inventario: 'inv.Inventario') -> 'ColumnasMovimientos':
+        """Con HistorialCompacto se copian sus arrays tal cual; si no, se recorre el historial una vez"""
+        historial = inventario._historial_movimientos
+        if isinstance(historial, inv.HistorialCompacto):
+            id_salida = historial._ID_TIPO[inv.TipoMovimiento.SALIDA]
+            # Copias: una vista sobre los arrays impediría que el historial siga creciendo
+            return cls(list(historial._codigos),
+                       np.frombuffer(historial._ids, dtype=np.int32).copy(),
+                       np.frombuffer(historial._tipos, dtype=np.int8) == id_salida,
+                       np.frombuffer(historial._cantidades, dtype=np.int64).copy(),
+                       cls._dias_locales(np.frombuffer(historial._fechas, dtype=np.int64)))
+        return cls.desde_movimientos(inventario._iterar_movimientos())
+
+    @classmethod
+    def desde_movimientos(cls, movimientos: Iterable['inv.MovimientoInventario']) -> 'ColumnasMovimientos':
+        codigos = []
+        id_por_codigo: Dict[str, int] = {}
+        ids = array('i')
+        salidas = array('b')
+        cantidades = array('q')
+        dias = array('q')
+        salida = inv.TipoMovimiento.SALIDA
+        for movimiento in movimientos:
+            id_codigo = id_por_codigo.get(movimiento.producto_codigo)
+            if id_codigo is None:
+                id_codigo = id_por_codigo[movimiento.producto_codigo] = len(codigos)
+                codigos.append(movimiento.producto_codigo)
+            ids.append(id_codigo)
+            salidas.append(movimiento.tipo is salida)
+            cantidades.append(movimiento.cantidad)
+            # Las fechas son locales sin zona: el ordinal ya es el día local
+            dias.append(movimiento.fecha.toordinal() - ORDINAL_EPOCH)
+        return cls(codigos, np.frombuffer(ids, dtype=np.int32), np.frombuffer(salidas, dtype=np.int8).astype(bool),
+                   np.frombuffer(cantidades, dtype=np.int64), np.frombuffer(dias, dtype=np.int64))
+
+    @classmethod
+    def desde_json(cls, ruta_archivo: str) -> 'ColumnasMovimientos':
+        """Movimientos de un archivo de Inventario.exportar_json"""
+        with open(ruta_archivo, 'r', encoding='utf-8') as archivo:
+            movimientos = json.load(archivo).get('movimientos', [])
+        codigos, ids = np.unique(np.array([m['producto_codigo'] for m in movimientos], dtype=object),
+                                 return_inverse=True)
+        salida = inv.TipoMovimiento.SALIDA.value
+        # NumPy interpreta las fechas ISO de una vez; al no tener zona, el día es el local
+        fechas = np.array([m['fecha'] for m in movimientos], dtype='datetime64[s]')
+        return cls(list(codigos), ids.astype(np.int32),
+                   np.array([m['tipo'] == salida for m in movimientos], dtype=bool),
+                   np.array([m['cantidad'] for m in movimientos], dtype=np.int64),
+                   fechas.astype('datetime64[D]').astype(np.int64))
+
+# -------------------------------
+# Pronóstico de consumo de todo el catálogo
+# -------------------------------
+class PronosticoConsumo:
+    """
+    Consumo (salidas) de cada producto en los últimos `dias` días hasta `hasta`, en una
+    sola pasada vectorizada: promedio diario, medias móviles de 7 y 30 días, desviación
+    del consumo diario, días de cobertura del stock actual y un punto de reorden sugerido
+    = max(stock_minimo, consumo esperado durante la reposición + stock de seguridad),
+    con stock de seguridad = z * desviación * raíz(plazo_reposicion).
+    """
+
+    def __init__(self, columnas: ColumnasMovimientos, productos: Iterable['inv.Producto'],
+                 dias: int = 90, hasta: Optional[datetime] = None,
+                 plazo_reposicion: int = 7, z: float = 1.65):
+        if dias <= 0:
+            raise ValueError("La ventana debe tener al menos un día")
+        productos = list(productos)
+        self.columnas = columnas
+        self.dias = dias
+        self.plazo_reposicion = plazo_reposicion
+        self.codigos = [p.codigo for p in productos]
+        self._posicion = {codigo: i for i, codigo in enumerate(self.codigos)}
+        self._productos = productos
+        self.stock = np.array([p.stock for p in productos], dtype=np.int64)
+        self.stock_minimo = np.array([p.stock_minimo for p in productos], dtype=np.int64)
+        self.activo = np.array([p.activo for p in productos], dtype=bool)
+        cantidad = len(productos)
+
+        self.dia_fin = (hasta or datetime.now()).toordinal() - ORDINAL_EPOCH
+        self.dia_inicio = self.dia_fin - dias + 1
+
+        # Movimiento -> posición en el catálogo (-1 si el producto ya no existe)
+        posicion_de = np.array([self._posicion.get(codigo, -1) for codigo in columnas.codigos] or [-1], dtype=np.int64)
+        en_ventana = (columnas.salidas & (columnas.dias >= self.dia_inicio) & (columnas.dias <= self.dia_fin))
+        posiciones = posicion_de[columnas.ids[en_ventana]]
+        existe = posiciones >= 0
+        posiciones = posiciones[existe]
+        cantidades = columnas.cantidades[en_ventana][existe].astype(np.float64)
+        dia = columnas.dias[en_ventana][existe] - self.dia_inicio
+
+        self.consumo_total = np.bincount(posiciones, weights=cantidades, minlength=cantidad)
+        self.consumo_diario = self.consumo_total / dias
+        self.media_7 = self._media_ultimos(posiciones, cantidades, dia, 7, cantidad)
+        self.media_30 = self._media_ultimos(posiciones, cantidades, dia, 30, cantidad)
+
+        # Desviación del consumo por día (los días sin salidas cuentan como 0): se suman las
+        # salidas de cada (producto, día) y luego los cuadrados por producto
+        claves, por_clave = np.unique(posiciones * dias + dia, return_inverse=True)
+        suma_dia = np.bincount(por_clave, weights=cantidades, minlength=len(claves))
+        suma_cuadrados = np.bincount(claves // dias, weights=suma_dia ** 2, minlength=cantidad)
+        self.desviacion = np.sqrt(np.maximum(suma_cuadrados / dias - self.consumo_diario ** 2, 0.0))
+
+        self.dias_cobertura = np.divide(self.stock, self.consumo_diario, out=np.full(cantidad, np.inf),
+                                        where=self.consumo_diario > 0)
+        consumo_reposicion = self.consumo_diario * plazo_reposicion
+        seguridad = z * self.desviacion * math.sqrt(plazo_reposicion)
+        self.punto_reorden = np.maximum(self.stock_minimo,
+                                        np.ceil(consumo_reposicion + seguridad)).astype(np.int64)
+        # Lo que falta para volver al punto de reorden más lo que se consumirá mientras llega el pedido
+        self.pedido_sugerido = np.maximum(self.punto_reorden + np.ceil(consumo_reposicion).astype(np.int64)
+                                          - self.stock, 0)
+
+    def _media_ultimos(self, posiciones: np.ndarray, cantidades: np.ndarray, dia: np.ndarray,
+                       ultimos: int, cantidad: int) -> np.ndarray:
+        ultimos = min(ultimos, self.dias)
+        recientes = dia >= self.dias - ultimos
+        return np.bincount(posiciones[recientes], weights=cantidades[recientes], minlength=cantidad) / ultimos
+
+    def en_riesgo(self) -> np.ndarray:
+        """Posiciones de productos activos con stock en o bajo su punto de reorden, los que se agotan antes primero"""
+        posiciones = np.flatnonzero(self.activo & (self.stock <= self.punto_reorden))
+        return posiciones[np.argsort(self.dias_cobertura[posiciones], kind='stable')]
+
+    def productos_en_riesgo(self) -> List['inv.Producto']:
+        return [self._productos[i] for i in self.en_riesgo()]
+
+    def datos(self, codigo: str) -> dict:
+        i = self._posicion[codigo]
+        return {
+            'consumo_diario': float(self.consumo_diario[i]),
+            'media_7': float(self.media_7[i]),
+            'media_30': float(self.media_30[i]),
+            'desviacion': float(self.desviacion[i]),
+            'dias_cobertura': float(self.dias_cobertura[i]),
+            'punto_reorden': int(self.punto_reorden[i]),
+            'pedido_sugerido': int(self.pedido_sugerido[i]),
+        }
+
+    def serie_diaria(self, codigo: str) -> np.ndarray:
+        """Salidas de cada día de la ventana para un producto (índice 0 = primer día)"""
+        columnas = self.columnas
+        try:
+            id_codigo = columnas.codigos.index(codigo)
+        except ValueError:
+            return np.zeros(self.dias)
+        filtro = ((columnas.ids == id_codigo) & columnas.salidas
+                  & (columnas.dias >= self.dia_inicio) & (columnas.dias <= self.dia_fin))
+        return np.bincount(columnas.dias[filtro] - self.dia_inicio, weights=columnas.cantidades[filtro],
+                           minlength=self.dias)
+
+def pronosticar(inventario: 'inv.Inventario', **opciones) -> PronosticoConsumo:
+    """PronosticoConsumo del historial y el catálogo de un inventario (opciones: dias, hasta, plazo_reposicion, z)"""
+    return PronosticoConsumo(ColumnasMovimientos.desde_inventario(inventario), inventario.productos, **opciones)
+
+# -------------------------------
+# Reporte de stock bajo con pronóstico
+# -------------------------------
+class ReporteStockBajoPronostico(inv.ReporteStockBajo):
+    """
+    Como ReporteStockBajo, pero con el consumo: incluye los productos que llegarán al
+    mínimo antes de reponerse (stock en o bajo el punto de reorden), ordenados por días
+    de cobertura, con el pedido sugerido de cada uno.
+    """
+
+    def __init__(self, pronostico: PronosticoConsumo):
+        self.pronostico = pronostico
+        self._en_riesgo = pronostico.en_riesgo()
+        super().__init__([pronostico._productos[i] for i in self._en_riesgo])
+
+    def generar_lineas(self) -> Iterator[str]:
+        pronostico = self.pronostico
+        yield "=" * 80
+        yield "TECHNOVA - ⚠️  REPORTE DE STOCK BAJO CON PRONÓSTICO ⚠️".center(80)
+        yield "=" * 80
+        yield f"Fecha: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}"
+        yield (f"Consumo de los últimos {pronostico.dias} días | "
+               f"Reposición: {pronostico.plazo_reposicion} días")
+        yield f"Productos a reponer: {len(self._en_riesgo)}"
+        yield "-" * 80
+        yield ""
+
+        for producto, i in zip(self.productos, self._en_riesgo):
+            cobertura = pronostico.dias_cobertura[i]
+            texto_cobertura = "sin consumo" if math.isinf(cobertura) else f"{cobertura:.1f} días"
+            yield f"{producto.nombre}"
+            yield (f"  Stock actual: {producto.stock} | Mínimo: {producto.stock_minimo} | "
+                   f"Punto de reorden: {pronostico.punto_reorden[i]}")
+            yield (f"  Consumo/día: {pronostico.consumo_diario[i]:.2f} (7 días: {pronostico.media_7[i]:.2f}, "
+                   f"30 días: {pronostico.media_30[i]:.2f}) | Cobertura: {texto_cobertura}")
+            yield f"  Pedido sugerido: {pronostico.pedido_sugerido[i]}"
+            yield ""
+
+        if not len(self._en_riesgo):
+            yield "✓ Ningún producto llegará a su mínimo durante la reposición"
+
+        yield "=" * 80
+
+# -------------------------------
+# Demostración con un año de historial sintético
+# -------------------------------
+def main(cantidad_productos: int = 10_000, cantidad_movimientos: int = 1_000_000):
+    import random
+    from datetime import timedelta
+
+    aleatorio = random.Random(42)
+    inventario = inv.Inventario(historial_compacto=True)
+    for i in range(cantidad_productos):
+        inventario.registrar_producto(inv.Producto(f"COD{i:07d}", f"Producto {i}", 10.0,
+                                                   aleatorio.randint(0, 200), aleatorio.randint(1, 20)))
+    # Movimientos repartidos en el último año (se incorporan como importados, sin tocar el stock)
+    ahora = datetime.now()
+    tipos = list(inv.TipoMovimiento)
+    for _ in range(cantidad_movimientos):
+        inventario._agregar_movimiento(inv.MovimientoInventario(
+            f"COD{aleatorio.randrange(cantidad_productos):07d}", aleatorio.choice(tipos), aleatorio.randint(1, 5),
+            ahora - timedelta(seconds=aleatorio.randrange(365 * 86400))))
+
+    inicio = time.perf_counter()
+    pronostico = pronosticar(inventario)
+    segundos = time.perf_counter() - inicio
+    print(f"Pronóstico de {cantidad_productos:,} productos con {cantidad_movimientos:,} movimientos: {segundos:.3f} s")
+    reporte = ReporteStockBajoPronostico(pronostico)
+    for linea in islice(reporte.generar_lineas(), 20):
+        print(linea)
+
+if __name__ == "__main__":
+    main()
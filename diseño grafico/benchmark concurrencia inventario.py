@@ -0,0 +1,106 @@
+import threading
+import time
+
+from cargador_inventario import cargar_inventario
+
+# -------------------------------
+# Ejecución concurrente
+# -------------------------------
+def ejecutar_hilos(cantidad_hilos: int, trabajo):
+    """
+    Lanza los hilos a la vez; trabajo(numero_hilo, latencias) agrega a la lista la
+    duración en ns de cada operación. Devuelve (segundos, latencias de todos los hilos).
+    """
+    barrera = threading.Barrier(cantidad_hilos + 1)
+    latencias_por_hilo = [[] for _ in range(cantidad_hilos)]
+
+    def hilo(numero):
+        barrera.wait()
+        trabajo(numero, latencias_por_hilo[numero])
+
+    hilos = [threading.Thread(target=hilo, args=(i,)) for i in range(cantidad_hilos)]
+    for h in hilos:
+        h.start()
+    barrera.wait()
+    inicio = time.perf_counter()
+    for h in hilos:
+        h.join()
+    segundos = time.perf_counter() - inicio
+    return segundos, [latencia for latencias in latencias_por_hilo for latencia in latencias]
+
+def percentil(valores: list, p: float) -> float:
+    ordenados = sorted(valores)
+    return ordenados[min(len(ordenados) - 1, int(len(ordenados) * p))]
+
+def escenario_independientes(inv, fabrica, cantidad_hilos: int, operaciones: int):
+    """Cada hilo mueve stock de sus propios productos"""
+    inventario = fabrica()
+    productos_por_hilo = 100
+    for i in range(cantidad_hilos * productos_por_hilo):
+        inventario.registrar_producto(inv.Producto(f"COD{i:07d}", f"Producto {i}", 10.0, operaciones))
+
+    def trabajo(numero, latencias):
+        reloj = time.perf_counter_ns
+        base = numero * productos_por_hilo
+        for j in range(operaciones):
+            codigo = f"COD{base + j % productos_por_hilo:07d}"
+            inicio = reloj()
+            if j % 2:
+                inventario.salida_stock(codigo, 1)
+            else:
+                inventario.entrada_stock(codigo, 1)
+            latencias.append(reloj() - inicio)
+
+    return ejecutar_hilos(cantidad_hilos, trabajo)
+
+def escenario_contencion(inv, fabrica, cantidad_hilos: int, operaciones: int):
+    """Todos los hilos venden el mismo producto, que no alcanza para todos"""
+    inventario = fabrica()
+    stock_inicial = cantidad_hilos * operaciones // 2
+    inventario.registrar_producto(inv.Producto("HOT", "Producto disputado", 10.0, stock_inicial))
+    vendidos = [0] * cantidad_hilos
+
+    def trabajo(numero, latencias):
+        reloj = time.perf_counter_ns
+        for _ in range(operaciones):
+            inicio = reloj()
+            try:
+                inventario.salida_stock("HOT", 1)
+                vendidos[numero] += 1
+            except ValueError:
+                pass
+            latencias.append(reloj() - inicio)
+
+    resultado = ejecutar_hilos(cantidad_hilos, trabajo)
+    stock_final = inventario.buscar_producto("HOT").stock
+    # Sin sincronización se pueden vender unidades que ya no estaban
+    sobreventa = sum(vendidos) + stock_final - stock_inicial
+    return resultado, stock_final, sobreventa
+
+def main(hilos=(1, 2, 4, 8, 16), operaciones_por_hilo: int = 20_000):
+    inv = cargar_inventario()
+
+    print("=" * 78)
+    print("BENCHMARK DE CONCURRENCIA - INVENTARIO".center(78))
+    print("=" * 78)
+    print(f"Operaciones por hilo: {operaciones_por_hilo:,}")
+
+    for nombre, fabrica in (("Inventario", inv.Inventario), ("InventarioConcurrente", inv.InventarioConcurrente)):
+        print("-" * 78)
+        print(nombre)
+        print(f"{'hilos':>6} {'escenario':<15} {'ops/s':>12} {'p50 µs':>9} {'p99 µs':>9} {'stock final':>12} {'sobreventa':>11}")
+        for cantidad_hilos in hilos:
+            segundos, latencias = escenario_independientes(inv, fabrica, cantidad_hilos, operaciones_por_hilo)
+            print(f"{cantidad_hilos:>6} {'independientes':<15} {len(latencias) / segundos:>12,.0f} "
+                  f"{percentil(latencias, 0.50) / 1000:>9.1f} {percentil(latencias, 0.99) / 1000:>9.1f}")
+
+            (segundos, latencias), stock_final, sobreventa = escenario_contencion(
+                inv, fabrica, cantidad_hilos, operaciones_por_hilo)
+            print(f"{cantidad_hilos:>6} {'contención':<15} {len(latencias) / segundos:>12,.0f} "
+                  f"{percentil(latencias, 0.50) / 1000:>9.1f} {percentil(latencias, 0.99) / 1000:>9.1f} "
+                  f"{stock_final:>12} {sobreventa:>11}")
+
+    print("=" * 78)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,292 @@
+import argparse
+import json
+import os
+import platform
+import random
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+from cargador_inventario import cargar_inventario
+
+inv = cargar_inventario()
+
+# -------------------------------
+# Datos sintéticos (reproducibles con la semilla)
+# -------------------------------
+PALABRAS = ["Laptop", "Mouse", "Teclado", "Monitor", "Cámara", "Router", "Impresora", "Disco",
+            "Memoria", "Audífonos", "Parlante", "Cable", "Cargador", "Tablet", "Micrófono"]
+
+def generar_productos(cantidad: int, semilla: int = 42) -> list:
+    aleatorio = random.Random(semilla)
+    productos = []
+    for i in range(cantidad):
+        nombre = f"TechNova {aleatorio.choice(PALABRAS)} {aleatorio.choice(PALABRAS)} {i}"
+        stock_minimo = aleatorio.randint(1, 10)
+        productos.append(inv.Producto(f"COD{i:07d}", nombre, round(aleatorio.uniform(5, 5000), 2),
+                                      aleatorio.randint(0, 100), stock_minimo))
+    return productos
+
+def generar_movimientos(codigos: list, cantidad: int, semilla: int = 43) -> list:
+    """(codigo, tipo, cantidad); las salidas son pequeñas para que casi todas tengan stock"""
+    aleatorio = random.Random(semilla)
+    entrada, salida = inv.TipoMovimiento.ENTRADA, inv.TipoMovimiento.SALIDA
+    return [(aleatorio.choice(codigos), entrada if aleatorio.random() < 0.6 else salida, aleatorio.randint(1, 3))
+            for _ in range(cantidad)]
+
+def inventario_con(productos: list, movimientos: list = ()) -> 'inv.Inventario':
+    inventario = inv.Inventario()
+    for producto in productos:
+        inventario.registrar_producto(inv.Producto(producto.codigo, producto.nombre, producto.precio,
+                                                   producto.stock, producto.stock_minimo))
+    for codigo, tipo, cantidad in movimientos:
+        try:
+            if tipo is inv.TipoMovimiento.ENTRADA:
+                inventario.entrada_stock(codigo, cantidad)
+            else:
+                inventario.salida_stock(codigo, cantidad)
+        except ValueError:
+            pass
+    return inventario
+
+# -------------------------------
+# Casos
+# -------------------------------
+# Cada caso recibe la escala y un directorio temporal y devuelve (preparar, medir, operaciones):
+# preparar() arma el estado que no se mide y medir(estado) es lo que se cronometra.
+def caso_registrar_producto(escala, directorio):
+    productos = generar_productos(escala)
+    def medir(inventario):
+        for producto in productos:
+            inventario.registrar_producto(producto)
+    return inv.Inventario, medir, escala
+
+def caso_buscar_producto(escala, directorio):
+    productos = generar_productos(escala)
+    aleatorio = random.Random(7)
+    codigos = [aleatorio.choice(productos).codigo for _ in range(escala)]
+    def medir(inventario):
+        buscar = inventario.buscar_producto
+        for codigo in codigos:
+            buscar(codigo)
+    return lambda: inventario_con(productos), medir, escala
+
+def caso_entrada_stock(escala, directorio):
+    productos = generar_productos(escala)
+    aleatorio = random.Random(8)
+    codigos = [aleatorio.choice(productos).codigo for _ in range(escala)]
+    def medir(inventario):
+        for codigo in codigos:
+            inventario.entrada_stock(codigo, 1)
+    return lambda: inventario_con(productos), medir, escala
+
+def caso_salida_stock(escala, directorio):
+    productos = generar_productos(escala)
+    aleatorio = random.Random(9)
+    codigos = [aleatorio.choice(productos).codigo for _ in range(escala)]
+    def preparar():
+        inventario = inventario_con(productos)
+        for codigo in codigos:
+            # Stock suficiente para que ninguna salida falle
+            inventario.buscar_producto(codigo)._stock += 1
+        inventario.recalcular_agregados()
+        return inventario
+    def medir(inventario):
+        for codigo in codigos:
+            inventario.salida_stock(codigo, 1)
+    return preparar, medir, escala
+
+def caso_exportar_csv(escala, directorio):
+    productos = generar_productos(escala)
+    ruta = os.path.join(directorio, "productos.csv")
+    return lambda: inventario_con(productos), lambda inventario: inventario.exportar_csv(ruta), escala
+
+def caso_importar_csv(escala, directorio):
+    ruta = os.path.join(directorio, "productos.csv")
+    inventario_con(generar_productos(escala)).exportar_csv(ruta)
+    return inv.Inventario, lambda inventario: inventario.importar_csv(ruta), escala
+
+def caso_importar_csv_paralelo(escala, directorio):
+    ruta = os.path.join(directorio, "productos.csv")
+    inventario_con(generar_productos(escala)).exportar_csv(ruta)
+    return inv.Inventario, lambda inventario: inventario.importar_csv_paralelo(ruta), escala
+
+def caso_abrir_instantanea(escala, directorio):
+    """Arranque desde la instantánea binaria; una operación = abrir y buscar un producto"""
+    productos = generar_productos(escala)
+    ruta = os.path.join(directorio, "catalogo.bin")
+    inventario_con(productos).guardar_instantanea(ruta)
+    codigo = productos[escala // 2].codigo
+    def medir(ruta_instantanea):
+        inv.InventarioMapeado(ruta_instantanea).buscar_producto(codigo)
+    return lambda: ruta, medir, 1
+
+def caso_exportar_json(escala, directorio):
+    productos = generar_productos(escala)
+    movimientos = generar_movimientos([p.codigo for p in productos], escala)
+    ruta = os.path.join(directorio, "inventario.json")
+    return (lambda: inventario_con(productos, movimientos),
+            lambda inventario: inventario.exportar_json(ruta), escala)
+
+def caso_importar_json(escala, directorio):
+    productos = generar_productos(escala)
+    ruta = os.path.join(directorio, "inventario.json")
+    inventario_con(productos, generar_movimientos([p.codigo for p in productos], escala)).exportar_json(ruta)
+    return inv.Inventario, lambda inventario: inventario.importar_json(ruta), escala
+
+def caso_obtener_historial(escala, directorio):
+    productos = generar_productos(escala)
+    movimientos = generar_movimientos([p.codigo for p in productos], escala)
+    consultas = 1000
+    def medir(inventario):
+        for _ in range(consultas):
+            inventario.obtener_historial(100)
+    return lambda: inventario_con(productos, movimientos), medir, consultas
+
+def caso_top_productos(escala, directorio):
+    """Tablero "top 50 por valor": cada consulta sigue a 10 entradas de stock (el orden se corrige, no se rearma)"""
+    productos = generar_productos(escala)
+    codigos = [p.codigo for p in productos]
+    consultas = 100
+    def preparar():
+        inventario = inventario_con(productos)
+        inventario.pagina_ranking(1)  # arma el orden por valor
+        return inventario
+    def medir(inventario):
+        for i in range(consultas):
+            for j in range(10):
+                inventario.entrada_stock(codigos[(i * 10 + j) * 7919 % escala], 5)
+            inventario.top_productos(50)
+    return preparar, medir, consultas
+
+def caso_clasificacion_abc(escala, directorio):
+    productos = generar_productos(escala)
+    return lambda: inventario_con(productos), lambda inventario: inventario.clasificacion_abc(), 1
+
+def caso_reporte(clase_reporte):
+    """Reporte.generar sobre el catálogo de la escala (el historial usa sus últimos 100 movimientos)"""
+    def caso(escala, directorio):
+        productos = generar_productos(escala)
+        movimientos = generar_movimientos([p.codigo for p in productos], escala)
+        def preparar():
+            inventario = inventario_con(productos, movimientos)
+            if clase_reporte is inv.ReporteHistorial:
+                return clase_reporte(inventario.obtener_historial(100))
+            if clase_reporte is inv.ReporteStockBajo:
+                return clase_reporte(inventario.productos_stock_bajo)
+            if clase_reporte is inv.ReporteValorInventario:
+                return clase_reporte(inventario.productos_activos, inventario.valor_total)
+            return clase_reporte(inventario.productos_activos)
+        # Una operación = un reporte completo
+        return preparar, lambda reporte: reporte.generar(), 1
+    return caso
+
+CASOS = {
+    'registrar_producto': caso_registrar_producto,
+    'buscar_producto': caso_buscar_producto,
+    'entrada_stock': caso_entrada_stock,
+    'salida_stock': caso_salida_stock,
+    'exportar_csv': caso_exportar_csv,
+    'importar_csv': caso_importar_csv,
+    'importar_csv_paralelo': caso_importar_csv_paralelo,
+    'abrir_instantanea': caso_abrir_instantanea,
+    'exportar_json': caso_exportar_json,
+    'importar_json': caso_importar_json,
+    'obtener_historial': caso_obtener_historial,
+    'top_productos': caso_top_productos,
+    'clasificacion_abc': caso_clasificacion_abc,
+    'ReporteInventario.generar': caso_reporte(inv.ReporteInventario),
+    'ReporteStockBajo.generar': caso_reporte(inv.ReporteStockBajo),
+    'ReporteValorInventario.generar': caso_reporte(inv.ReporteValorInventario),
+    'ReporteHistorial.generar': caso_reporte(inv.ReporteHistorial),
+    'ReporteListadoSimple.generar': caso_reporte(inv.ReporteListadoSimple),
+}
+
+# -------------------------------
+# Ejecución y resultados
+# -------------------------------
+def ejecutar(escalas, casos, repeticiones: int = 3) -> dict:
+    """Mide cada caso en cada escala; se informa la mediana de las repeticiones (y la mínima)"""
+    resultados = []
+    with tempfile.TemporaryDirectory() as directorio:
+        for escala in escalas:
+            for nombre in casos:
+                preparar, medir, operaciones = CASOS[nombre](escala, directorio)
+                tiempos = []
+                for _ in range(repeticiones):
+                    estado = preparar()
+                    inicio = time.perf_counter()
+                    medir(estado)
+                    tiempos.append(time.perf_counter() - inicio)
+                mediana = statistics.median(tiempos)
+                resultados.append({
+                    'caso': nombre,
+                    'escala': escala,
+                    'operaciones': operaciones,
+                    'segundos': mediana,
+                    'segundos_min': min(tiempos),
+                    'ops_por_segundo': operaciones / mediana if mediana else None,
+                })
+                print(f"{nombre:<32} {escala:>10,} {mediana:>10.4f} s {operaciones / max(mediana, 1e-9):>14,.0f} ops/s")
+    return {
+        'fecha': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+        'python': platform.python_version(),
+        'plataforma': platform.platform(),
+        'repeticiones': repeticiones,
+        'resultados': resultados,
+    }
+
+def comparar(actual: dict, base: dict, tolerancia: float) -> int:
+    """Imprime la comparación con la línea base; devuelve cuántos casos empeoraron más que la tolerancia"""
+    anteriores = {(r['caso'], r['escala']): r for r in base['resultados']}
+    regresiones = 0
+    print("-" * 78)
+    print(f"{'caso':<32} {'escala':>10} {'base s':>10} {'actual s':>10} {'cambio':>9}")
+    for resultado in actual['resultados']:
+        anterior = anteriores.get((resultado['caso'], resultado['escala']))
+        if anterior is None:
+            continue
+        cambio = resultado['segundos'] / anterior['segundos'] if anterior['segundos'] else 1.0
+        marca = ""
+        if cambio > 1 + tolerancia:
+            regresiones += 1
+            marca = "  ⚠️ REGRESIÓN"
+        print(f"{resultado['caso']:<32} {resultado['escala']:>10,} {anterior['segundos']:>10.4f} "
+              f"{resultado['segundos']:>10.4f} {cambio:>8.2f}x{marca}")
+    print("-" * 78)
+    print(f"Regresiones (más de {tolerancia:.0%} más lento): {regresiones}")
+    return regresiones
+
+def main(argumentos=None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark del núcleo de Inventario")
+    parser.add_argument('--escalas', type=int, nargs='+', default=[1_000, 10_000, 100_000],
+                        help="cantidades de productos (p. ej. 1000 10000 100000 1000000)")
+    parser.add_argument('--casos', nargs='+', choices=sorted(CASOS), default=list(CASOS))
+    parser.add_argument('--repeticiones', type=int, default=3)
+    parser.add_argument('--salida', help="archivo JSON donde guardar los resultados")
+    parser.add_argument('--comparar', help="archivo JSON de una ejecución anterior (línea base)")
+    parser.add_argument('--tolerancia', type=float, default=0.20,
+                        help="fracción de tiempo extra admitida antes de marcar regresión")
+    opciones = parser.parse_args(argumentos)
+
+    print("=" * 78)
+    print("BENCHMARK DEL NÚCLEO - INVENTARIO".center(78))
+    print("=" * 78)
+    resultados = ejecutar(opciones.escalas, opciones.casos, opciones.repeticiones)
+
+    if opciones.salida:
+        with open(opciones.salida, 'w', encoding='utf-8') as archivo:
+            json.dump(resultados, archivo, indent=2, ensure_ascii=False)
+        print(f"Resultados guardados en {opciones.salida}")
+
+    if opciones.comparar:
+        with open(opciones.comparar, 'r', encoding='utf-8') as archivo:
+            base = json.load(archivo)
+        # Código de salida distinto de cero si hay regresiones (útil en integración continua)
+        return 1 if comparar(resultados, base, opciones.tolerancia) else 0
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,46 @@
+import tracemalloc
+
+from cargador_inventario import cargar_inventario
+
+# -------------------------------
+# Medición de memoria
+# -------------------------------
+def medir(descripcion: str, funcion):
+    """Ejecuta la función y devuelve los bytes que siguen ocupados por su resultado"""
+    tracemalloc.start()
+    resultado = funcion()
+    actual, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f"{descripcion:<45} {actual / 1024 / 1024:>10.2f} MB")
+    return resultado, actual
+
+def main(cantidad_productos: int = 10_000, cantidad_movimientos: int = 1_000_000):
+    inv = cargar_inventario()
+
+    print("=" * 60)
+    print("BENCHMARK DE MEMORIA - INVENTARIO".center(60))
+    print("=" * 60)
+    print(f"Productos: {cantidad_productos:,} | Movimientos: {cantidad_movimientos:,}")
+    print("-" * 60)
+
+    medir(f"{cantidad_productos:,} Producto (__slots__)",
+          lambda: [inv.Producto(f"COD{i:07d}", f"Producto {i}", 10.0, 5) for i in range(cantidad_productos)])
+
+    # Los códigos se comparten entre movimientos, igual que al usar el código del producto
+    codigos = [f"COD{i:07d}" for i in range(cantidad_productos)]
+    tipos = list(inv.TipoMovimiento)
+
+    def crear_movimientos():
+        return [inv.MovimientoInventario(codigos[i % cantidad_productos], tipos[i % 2], 1)
+                for i in range(cantidad_movimientos)]
+
+    movimientos, bytes_lista = medir(f"{cantidad_movimientos:,} movimientos en lista", crear_movimientos)
+    _, bytes_compacto = medir(f"{cantidad_movimientos:,} movimientos en HistorialCompacto",
+                              lambda: inv.HistorialCompacto(movimientos))
+
+    print("-" * 60)
+    print(f"Reducción del historial: {bytes_lista / max(bytes_compacto, 1):.1f}x")
+    print("=" * 60)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+import itertools
+import os
+import random
+import tempfile
+import time
+
+from cargador_inventario import cargar_inventario
+
+# -------------------------------
+# Medición de tiempo
+# -------------------------------
+def medir(descripcion: str, cantidad: int, funcion):
+    """Ejecuta la función e imprime el tiempo y los movimientos por segundo"""
+    inicio = time.perf_counter()
+    funcion()
+    segundos = time.perf_counter() - inicio
+    print(f"{descripcion:<45} {segundos:>8.3f} s {cantidad / segundos:>14,.0f} mov/s")
+    return segundos
+
+def crear_inventario(inv, fabrica, cantidad_productos: int):
+    inventario = fabrica()
+    for i in range(cantidad_productos):
+        inventario.registrar_producto(inv.Producto(f"COD{i:07d}", f"Producto {i}", 10.0, 1000))
+    return inventario
+
+def main(cantidad_productos: int = 10_000, cantidad_movimientos: int = 200_000):
+    inv = cargar_inventario()
+
+    # Mismos movimientos para todos: mitad entradas, mitad salidas (algunas sin stock suficiente)
+    aleatorio = random.Random(42)
+    tipos = list(inv.TipoMovimiento)
+    movimientos = [(f"COD{aleatorio.randrange(cantidad_productos):07d}", aleatorio.choice(tipos),
+                    aleatorio.randint(1, 50)) for _ in range(cantidad_movimientos)]
+
+    print("=" * 80)
+    print("BENCHMARK DE MOVIMIENTOS - INVENTARIO".center(80))
+    print("=" * 80)
+    print(f"Productos: {cantidad_productos:,} | Movimientos: {cantidad_movimientos:,}")
+
+    # Cada diario en su propia carpeta dentro de una temporal que se borra al terminar
+    with tempfile.TemporaryDirectory() as directorio:
+        diarios = itertools.count(1)
+
+        def con_diario():
+            inventario = inv.Inventario()
+            inventario.usar_diario(inv.DiarioInventario(os.path.join(directorio, f"diario-{next(diarios)}")))
+            return inventario
+
+        for nombre, fabrica in (("Inventario", inv.Inventario), ("Inventario + diario", con_diario),
+                                ("InventarioSQLite", inv.InventarioSQLite)):
+            print("-" * 80)
+            inventario = crear_inventario(inv, fabrica, cantidad_productos)
+
+            def una_por_una():
+                for codigo, tipo, cantidad in movimientos:
+                    try:
+                        if tipo is inv.TipoMovimiento.ENTRADA:
+                            inventario.entrada_stock(codigo, cantidad)
+                        else:
+                            inventario.salida_stock(codigo, cantidad)
+                    except ValueError:
+                        pass
+
+            segundos_uno = medir(f"{nombre}: entrada/salida_stock", cantidad_movimientos, una_por_una)
+            inventario.cerrar()
+
+            inventario = crear_inventario(inv, fabrica, cantidad_productos)
+            segundos_lote = medir(f"{nombre}: registrar_movimientos", cantidad_movimientos,
+                                  lambda: inventario.registrar_movimientos(movimientos))
+            inventario.cerrar()
+            print(f"Aceleración: {segundos_uno / segundos_lote:.1f}x")
+
+    print("=" * 80)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,55 @@
+import os
+import random
+import time
+
+from cargador_inventario import cargar_inventario
+
+# -------------------------------
+# Medición de tiempo
+# -------------------------------
+def medir(descripcion: str, cantidad: int, funcion):
+    """Ejecuta la función e imprime el tiempo y los movimientos por segundo"""
+    inicio = time.perf_counter()
+    funcion()
+    segundos = time.perf_counter() - inicio
+    print(f"{descripcion:<35} {segundos:>8.3f} s {cantidad / segundos:>14,.0f} mov/s")
+    return segundos
+
+def main(cantidad_productos: int = 100_000, cantidad_movimientos: int = 1_000_000, tamano_lote: int = 20_000):
+    inv = cargar_inventario()
+
+    aleatorio = random.Random(42)
+    tipos = list(inv.TipoMovimiento)
+    movimientos = [(f"COD{aleatorio.randrange(cantidad_productos):07d}", aleatorio.choice(tipos),
+                    aleatorio.randint(1, 50)) for _ in range(cantidad_movimientos)]
+    lotes = [movimientos[i:i + tamano_lote] for i in range(0, cantidad_movimientos, tamano_lote)]
+
+    def cargar_y_medir(descripcion, inventario):
+        for i in range(cantidad_productos):
+            inventario.registrar_producto(inv.Producto(f"COD{i:07d}", f"Producto {i}", 10.0, 1000))
+        segundos = medir(descripcion, cantidad_movimientos,
+                         lambda: [inventario.registrar_movimientos(lote) for lote in lotes])
+        valor = inventario.valor_total
+        inventario.cerrar()
+        return segundos, valor
+
+    print("=" * 70)
+    print("BENCHMARK DE PARTICIONES - INVENTARIO".center(70))
+    print("=" * 70)
+    print(f"Productos: {cantidad_productos:,} | Movimientos: {cantidad_movimientos:,} | "
+          f"Lote: {tamano_lote:,} | Núcleos: {os.cpu_count()}")
+    print("-" * 70)
+
+    base, valor_base = cargar_y_medir("Inventario (1 proceso)", inv.Inventario())
+    particiones = 1
+    while particiones <= max(os.cpu_count() or 1, 2):
+        segundos, valor = cargar_y_medir(f"InventarioParticionado ({particiones})",
+                                         inv.InventarioParticionado(particiones))
+        coincide = "sí" if abs(valor - valor_base) < 1e-6 * max(valor_base, 1) else "NO"
+        print(f"{'':<35} aceleración {base / segundos:.2f}x, mismo valor total: {coincide}")
+        particiones *= 2
+
+    print("=" * 70)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,34 @@
+import importlib.util
+import os
+import sys
+
+# -------------------------------
+# Carga de los scripts del inventario como módulos (sus nombres tienen espacios)
+# -------------------------------
+DIRECTORIO = os.path.dirname(os.path.abspath(__file__))
+
+def cargar_modulo(nombre_modulo: str, nombre_archivo: str):
+    """
+    Carga un script de este directorio con el nombre de módulo indicado. Si ya está en
+    sys.modules se devuelve ese mismo módulo: cargarlo otra vez crearía clases distintas
+    (un Producto de una copia no pasaría isinstance contra el de la otra).
+    """
+    modulo = sys.modules.get(nombre_modulo)
+    if modulo is not None:
+        return modulo
+    spec = importlib.util.spec_from_file_location(nombre_modulo, os.path.join(DIRECTORIO, nombre_archivo))
+    modulo = importlib.util.module_from_spec(spec)
+    sys.modules[nombre_modulo] = modulo
+    try:
+        spec.loader.exec_module(modulo)
+    except BaseException:
+        # Una carga fallida no debe quedar registrada a medias
+        del sys.modules[nombre_modulo]
+        raise
+    return modulo
+
+def cargar_inventario():
+    return cargar_modulo("inventario_tkinder", "inventario con tkinder.py")
+
+def cargar_servicio():
+    return cargar_modulo("servicio_inventario", "servicio inventario.py")
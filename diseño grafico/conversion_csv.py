@@ -0,0 +1,96 @@
+import csv
+import io
+from typing import Callable, Iterable, List
+
+# Módulo aparte, sin tkinter ni el resto del inventario: los procesos de
+# Inventario.importar_csv_paralelo (spawn/forkserver) solo importan esto
+
+# -------------------------------
+# Error de conversión de una fila de CSV
+# -------------------------------
+class ErrorFilaCSV(ValueError):
+    def __init__(self, campo: str, motivo: str):
+        super().__init__(f"{campo}: {motivo}" if campo else motivo)
+        self.campo = campo
+        self.motivo = motivo
+
+# -------------------------------
+# Conversión de filas
+# -------------------------------
+def compilar_conversor_csv(encabezado: List[str], stock_minimo_default: int,
+                           valores_verdaderos: Iterable[str]) -> Callable[[List[str]], tuple]:
+    """
+    Resuelve una sola vez la posición de cada columna del CSV y devuelve una
+    función que convierte una fila en (codigo, nombre, precio, stock, stock_minimo, activo).
+    La función lanza ErrorFilaCSV indicando el campo que no pudo convertirse.
+    """
+    posiciones = {campo.strip(): i for i, campo in enumerate(encabezado)}
+    for campo in ('codigo', 'nombre', 'precio', 'stock'):
+        if campo not in posiciones:
+            raise ValueError(f"Falta la columna obligatoria '{campo}'")
+
+    i_codigo = posiciones['codigo']
+    i_nombre = posiciones['nombre']
+    i_precio = posiciones['precio']
+    i_stock = posiciones['stock']
+    i_minimo = posiciones.get('stock_minimo')
+    i_activo = posiciones.get('activo')
+    columnas_necesarias = max(i for i in (i_codigo, i_nombre, i_precio, i_stock, i_minimo, i_activo)
+                              if i is not None) + 1
+    valores_verdaderos = frozenset(valores_verdaderos)
+
+    def convertir(fila: List[str]) -> tuple:
+        if len(fila) < columnas_necesarias:
+            raise ErrorFilaCSV('', f"Se esperaban {columnas_necesarias} columnas, se encontraron {len(fila)}")
+
+        campo = 'codigo'
+        try:
+            codigo = fila[i_codigo].strip()
+            if not codigo:
+                raise ValueError("El código no puede estar vacío")
+            campo = 'nombre'
+            nombre = fila[i_nombre].strip()
+            if not nombre:
+                raise ValueError("El nombre no puede estar vacío")
+            campo = 'precio'
+            precio = float(fila[i_precio])
+            if precio < 0:
+                raise ValueError("El precio no puede ser negativo")
+            campo = 'stock'
+            stock = int(fila[i_stock])
+            if stock < 0:
+                raise ValueError("El stock no puede ser negativo")
+            campo = 'stock_minimo'
+            stock_minimo = int(fila[i_minimo]) if i_minimo is not None else stock_minimo_default
+            if stock_minimo < 0:
+                raise ValueError("El stock mínimo no puede ser negativo")
+        except ValueError as e:
+            raise ErrorFilaCSV(campo, str(e))
+
+        activo = fila[i_activo].strip().lower() in valores_verdaderos if i_activo is not None else True
+        return codigo, nombre, precio, stock, stock_minimo, activo
+
+    return convertir
+
+def convertir_trozo_csv(ruta_archivo: str, inicio: int, fin: int, encabezado: List[str],
+                        stock_minimo_default: int, valores_verdaderos: Iterable[str]) -> tuple:
+    """
+    Lee los bytes [inicio, fin) del CSV y los convierte con compilar_conversor_csv.
+    Devuelve (filas válidas, errores, registros leídos); cada error es
+    (número de registro dentro del trozo, campo, motivo, campos de la fila).
+    """
+    with open(ruta_archivo, 'rb') as archivo:
+        archivo.seek(inicio)
+        datos = archivo.read(fin - inicio)
+    convertir = compilar_conversor_csv(encabezado, stock_minimo_default, valores_verdaderos)
+    filas = []
+    errores = []
+    registros = 0
+    for registros, fila in enumerate(csv.reader(io.StringIO(datos.decode('utf-8'), newline='')), 1):
+        if not fila:
+            continue
+        try:
+            filas.append(convertir(fila))
+        except ErrorFilaCSV as e:
+            errores.append((registros, e.campo, e.motivo, fila))
+    return filas, errores, registros
@@ -0,0 +1,187 @@
+from typing import TYPE_CHECKING, Iterable, Optional
+import os
+import json
+import threading
+import time
+
+from modelo_inventario import MovimientoInventario
+from instantanea_binaria import InstantaneaBinaria
+
+if TYPE_CHECKING:
+    # Solo para las anotaciones: nucleo_inventario importa este módulo
+    from nucleo_inventario import Inventario
+
+# -------------------------------
+# Diario de escritura anticipada (persistencia)
+# -------------------------------
+class DiarioInventario:
+    """
+    Diario de solo anexar (una línea JSON por cambio). El fsync lo agrupa un hilo cada
+    `intervalo_fsync` segundos (0: en cada registro); cada `snapshot_cada` registros guarda
+    una instantánea y vuelve a empezar. Con catalogo_binario=True la instantánea es binaria.
+    """
+    ARCHIVO_DIARIO = 'diario.jsonl'
+    ARCHIVO_SNAPSHOT = 'snapshot.json'
+    
+    def __init__(self, directorio: str, intervalo_fsync: float = 0.05,
+                 max_pendientes: int = 10000, snapshot_cada: int = 100000,
+                 catalogo_binario: bool = False):
+        os.makedirs(directorio, exist_ok=True)
+        self.directorio = directorio
+        self.catalogo_binario = catalogo_binario
+        self.ruta_diario = os.path.join(directorio, self.ARCHIVO_DIARIO)
+        self.ruta_snapshot = os.path.join(directorio, self.ARCHIVO_SNAPSHOT)
+        self.intervalo_fsync = intervalo_fsync
+        self.max_pendientes = max_pendientes
+        self.snapshot_cada = snapshot_cada
+        
+        self._secuencia = 0
+        self._registros_desde_snapshot = 0
+        self._pendientes = 0
+        self._archivo = None
+        self._lock = threading.Lock()
+        self._detener = threading.Event()
+        self._hilo_fsync: Optional[threading.Thread] = None
+    
+    def restaurar(self, inventario: 'Inventario') -> int:
+        """Carga la instantánea y reaplica el diario sobre el inventario; devuelve los registros reaplicados"""
+        if self._archivo:
+            raise ValueError("El diario ya está abierto")
+        
+        if os.path.exists(self.ruta_snapshot):
+            with open(self.ruta_snapshot, 'r', encoding='utf-8') as archivo:
+                snapshot = json.load(archivo)
+            self._secuencia = snapshot['secuencia']
+            if 'catalogo' in snapshot:
+                inventario._cargar_catalogo(os.path.join(self.directorio, snapshot['catalogo']))
+            for datos in snapshot.get('productos', ()):
+                inventario._aplicar_registro({'op': 'producto', **datos})
+            if 'historial' in snapshot:
+                inventario._cargar_historial(os.path.join(self.directorio, snapshot['historial']))
+            for codigo, tipo, cantidad, fecha in snapshot.get('movimientos', ()):
+                inventario._aplicar_registro({'op': 'movimiento', 'codigo': codigo, 'tipo': tipo,
+                                              'cantidad': cantidad, 'fecha': fecha})
+        
+        reaplicados = 0
+        if os.path.exists(self.ruta_diario):
+            with open(self.ruta_diario, 'r', encoding='utf-8') as archivo:
+                for linea in archivo:
+                    try:
+                        registro = json.loads(linea)
+                    except json.JSONDecodeError:
+                        # Última línea incompleta por una caída durante la escritura
+                        break
+                    if registro['n'] <= self._secuencia:
+                        continue
+                    inventario._aplicar_registro(registro)
+                    self._secuencia = registro['n']
+                    reaplicados += 1
+        
+        self._registros_desde_snapshot = reaplicados
+        self._archivo = open(self.ruta_diario, 'a', encoding='utf-8')
+        if self.intervalo_fsync > 0:
+            self._hilo_fsync = threading.Thread(target=self._bucle_fsync, name='diario-fsync', daemon=True)
+            self._hilo_fsync.start()
+        return reaplicados
+    
+    def registrar(self, operacion: str, **datos) -> None:
+        with self._lock:
+            if not self._archivo:
+                raise ValueError("El diario no está abierto")
+            self._secuencia += 1
+            datos['op'] = operacion
+            datos['n'] = self._secuencia
+            self._archivo.write(json.dumps(datos, ensure_ascii=False) + '\n')
+            self._archivo.flush()
+            self._pendientes += 1
+            self._registros_desde_snapshot += 1
+            if self.intervalo_fsync <= 0 or self._pendientes >= self.max_pendientes:
+                self._fsync()
+    
+    def registrar_lote(self, registros: Iterable[tuple]) -> None:
+        """Como registrar, para muchos (operacion, datos) con una sola escritura y un solo flush"""
+        with self._lock:
+            if not self._archivo:
+                raise ValueError("El diario no está abierto")
+            lineas = []
+            for operacion, datos in registros:
+                self._secuencia += 1
+                datos['op'] = operacion
+                datos['n'] = self._secuencia
+                lineas.append(json.dumps(datos, ensure_ascii=False) + '\n')
+            self._archivo.write(''.join(lineas))
+            self._archivo.flush()
+            self._pendientes += len(lineas)
+            self._registros_desde_snapshot += len(lineas)
+            if self.intervalo_fsync <= 0 or self._pendientes >= self.max_pendientes:
+                self._fsync()
+    
+    def _fsync(self) -> None:
+        if self._pendientes:
+            os.fsync(self._archivo.fileno())
+            self._pendientes = 0
+    
+    def _bucle_fsync(self) -> None:
+        while not self._detener.wait(self.intervalo_fsync):
+            self.sincronizar()
+    
+    def sincronizar(self) -> None:
+        """Fuerza el fsync de los registros pendientes"""
+        with self._lock:
+            if self._archivo:
+                self._fsync()
+    
+    def necesita_snapshot(self) -> bool:
+        return self._registros_desde_snapshot >= self.snapshot_cada
+    
+    def escribir_snapshot(self, inventario: 'Inventario') -> None:
+        """Guarda el estado completo de forma atómica y vacía el diario"""
+        with self._lock:
+            snapshot = {'secuencia': self._secuencia}
+            if self.catalogo_binario:
+                # Nombre nuevo cada vez: el catálogo anterior puede seguir abierto con mmap
+                marca = time.time_ns()
+                snapshot['catalogo'] = f"catalogo-{marca}.bin"
+                InstantaneaBinaria.escribir(os.path.join(self.directorio, snapshot['catalogo']),
+                                            inventario._iterar_productos())
+                # El historial va en columnas: al abrir se copian sin armar ni indexar movimientos
+                snapshot['historial'] = f"historial-{marca}.bin"
+                inventario._historial_en_columnas().escribir(os.path.join(self.directorio, snapshot['historial']))
+            else:
+                snapshot['productos'] = [p.to_dict() for p in inventario._iterar_productos()]
+                snapshot['movimientos'] = [[m.producto_codigo, m.tipo.value, m.cantidad,
+                                            MovimientoInventario.fecha_a_epoch(m.fecha)]
+                                           for m in inventario._iterar_movimientos()]
+            ruta_temporal = self.ruta_snapshot + '.tmp'
+            with open(ruta_temporal, 'w', encoding='utf-8') as archivo:
+                json.dump(snapshot, archivo, ensure_ascii=False)
+                archivo.flush()
+                os.fsync(archivo.fileno())
+            os.replace(ruta_temporal, self.ruta_snapshot)
+            self._borrar_catalogos_viejos({snapshot.get('catalogo'), snapshot.get('historial')})
+            
+            # Si el proceso cae antes de vaciar el diario, la secuencia evita reaplicar registros
+            self._archivo.close()
+            self._archivo = open(self.ruta_diario, 'w', encoding='utf-8')
+            self._pendientes = 0
+            self._registros_desde_snapshot = 0
+    
+    def _borrar_catalogos_viejos(self, actuales: set) -> None:
+        for nombre in os.listdir(self.directorio):
+            if nombre.startswith(('catalogo-', 'historial-')) and nombre.endswith('.bin') and nombre not in actuales:
+                try:
+                    os.remove(os.path.join(self.directorio, nombre))
+                except OSError:
+                    # En Windows no se puede borrar mientras esté mapeado; se reintenta en la próxima instantánea
+                    pass
+    
+    def cerrar(self) -> None:
+        self._detener.set()
+        if self._hilo_fsync:
+            self._hilo_fsync.join()
+            self._hilo_fsync = None
+        with self._lock:
+            if self._archivo:
+                self._fsync()
+                self._archivo.close()
+                self._archivo = None
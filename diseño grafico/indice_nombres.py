@@ -0,0 +1,180 @@
+import heapq
+import re
+import unicodedata
+from bisect import bisect_left
+from typing import Callable, Dict, Iterable, List, Optional
+
+# Módulo aparte, sin tkinter: lo comparten nucleo_inventario e "inventario con input.py"
+
+# -------------------------------
+# Índice de búsqueda por nombre
+# -------------------------------
+class IndiceNombres:
+    """
+    Índice de los nombres de producto por palabra (normalizada, sin tildes) y por trigrama,
+    para buscar sin recorrer el catálogo.
+    """
+    _PALABRA = re.compile(r'\w+')
+    
+    def __init__(self):
+        self._nombres: Dict[str, str] = {}
+        # Los dict se usan como conjuntos ordenados: conservan el orden de registro
+        self._codigos_por_palabra: Dict[str, Dict[str, None]] = {}
+        self._palabras_por_trigrama: Dict[str, set] = {}
+        self._palabras_ordenadas: List[str] = []
+        self._orden_vigente = True
+    
+    @staticmethod
+    def normalizar(texto: str) -> str:
+        """Minúsculas y sin tildes ni diéresis: 'Cámara' -> 'camara'"""
+        if texto.isascii():
+            return texto.lower()
+        descompuesto = unicodedata.normalize('NFKD', texto.casefold())
+        return ''.join(c for c in descompuesto if not unicodedata.combining(c))
+    
+    @staticmethod
+    def _trigramas(palabra: str) -> set:
+        return {palabra[i:i + 3] for i in range(len(palabra) - 2)}
+    
+    def __len__(self) -> int:
+        return len(self._nombres)
+    
+    def agregar(self, codigo: str, nombre: str) -> None:
+        """Indexa el nombre del producto; si ya estaba indexado con otro nombre, lo reemplaza"""
+        normalizado = self.normalizar(nombre)
+        anterior = self._nombres.get(codigo)
+        if anterior == normalizado:
+            return
+        if anterior is not None:
+            self._quitar_palabras(codigo, anterior)
+        self._nombres[codigo] = normalizado
+        
+        for palabra in set(self._PALABRA.findall(normalizado)):
+            codigos = self._codigos_por_palabra.get(palabra)
+            if codigos is None:
+                codigos = self._codigos_por_palabra[palabra] = {}
+                for trigrama in self._trigramas(palabra):
+                    palabras = self._palabras_por_trigrama.get(trigrama)
+                    if palabras is None:
+                        self._palabras_por_trigrama[trigrama] = {palabra}
+                    else:
+                        palabras.add(palabra)
+                self._orden_vigente = False
+            codigos[codigo] = None
+    
+    def quitar(self, codigo: str) -> None:
+        normalizado = self._nombres.pop(codigo, None)
+        if normalizado is not None:
+            self._quitar_palabras(codigo, normalizado)
+    
+    def _quitar_palabras(self, codigo: str, normalizado: str) -> None:
+        for palabra in set(self._PALABRA.findall(normalizado)):
+            codigos = self._codigos_por_palabra[palabra]
+            codigos.pop(codigo, None)
+            if codigos:
+                continue
+            # Ningún producto usa ya la palabra: sale del vocabulario
+            del self._codigos_por_palabra[palabra]
+            for trigrama in self._trigramas(palabra):
+                palabras = self._palabras_por_trigrama[trigrama]
+                palabras.discard(palabra)
+                if not palabras:
+                    del self._palabras_por_trigrama[trigrama]
+            self._orden_vigente = False
+    
+    def limpiar(self) -> None:
+        self._nombres.clear()
+        self._codigos_por_palabra.clear()
+        self._palabras_por_trigrama.clear()
+        self._palabras_ordenadas = []
+        self._orden_vigente = True
+    
+    def _palabras_con(self, termino: str) -> List[str]:
+        """Palabras del vocabulario que contienen el término (que empiezan por él si es muy corto)"""
+        if len(termino) >= 3:
+            conjuntos = [self._palabras_por_trigrama.get(t) for t in self._trigramas(termino)]
+            if not all(conjuntos):
+                return []
+            conjuntos.sort(key=len)
+            candidatas = conjuntos[0].intersection(*conjuntos[1:])
+            return [p for p in candidatas if termino in p]
+        
+        if not self._orden_vigente:
+            self._palabras_ordenadas = sorted(self._codigos_por_palabra)
+            self._orden_vigente = True
+        ordenadas = self._palabras_ordenadas
+        palabras = []
+        i = bisect_left(ordenadas, termino)
+        while i < len(ordenadas) and ordenadas[i].startswith(termino):
+            palabras.append(ordenadas[i])
+            i += 1
+        return palabras
+    
+    def buscar(self, consulta: str, limite: Optional[int] = None) -> List[str]:
+        """
+        Códigos cuyos nombres contienen todas las palabras de la consulta, sin distinguir
+        mayúsculas ni tildes; primero las coincidencias exactas, luego por prefijo.
+        """
+        terminos = list(dict.fromkeys(self._PALABRA.findall(self.normalizar(consulta))))
+        if not terminos:
+            return []
+        # El término más largo suele ser el más selectivo: guía la búsqueda en el índice
+        guia = max(terminos, key=len)
+        otros = [t for t in terminos if t != guia]
+        
+        orden = [(0 if p == guia else 1 if p.startswith(guia) else 2, len(p), p) for p in self._palabras_con(guia)]
+        # Montículo: con límite solo se ordenan las palabras que llegan a usarse
+        heapq.heapify(orden)
+        
+        codigos = []
+        vistos = set()
+        while orden:
+            palabra = heapq.heappop(orden)[2]
+            for codigo in self._codigos_por_palabra[palabra]:
+                if codigo in vistos:
+                    continue
+                vistos.add(codigo)
+                if otros and not all(t in self._nombres[codigo] for t in otros):
+                    continue
+                codigos.append(codigo)
+                if limite and len(codigos) >= limite:
+                    return codigos
+        return codigos
+
+class IndiceNombresDiferido(IndiceNombres):
+    """
+    IndiceNombres que se arma con `fuente()` ((codigo, nombre) de todo el catálogo) la
+    primera vez que se busca, en una sola pasada. Hasta entonces los cambios se ignoran:
+    fuente ya los refleja. limpiar() lo deja otra vez sin armar.
+    """
+    
+    def __init__(self, fuente: Callable[[], Iterable[tuple]]):
+        super().__init__()
+        self._fuente = fuente
+        self._armado = False
+    
+    def _armar(self) -> None:
+        if not self._armado:
+            self._armado = True
+            for codigo, nombre in self._fuente():
+                super().agregar(codigo, nombre)
+    
+    def __len__(self) -> int:
+        self._armar()
+        return super().__len__()
+    
+    def agregar(self, codigo: str, nombre: str) -> None:
+        if self._armado:
+            super().agregar(codigo, nombre)
+    
+    def quitar(self, codigo: str) -> None:
+        if self._armado:
+            super().quitar(codigo)
+    
+    def limpiar(self) -> None:
+        super().limpiar()
+        self._armado = False
+    
+    def buscar(self, consulta: str, limite: Optional[int] = None) -> List[str]:
+        self._armar()
+        return super().buscar(consulta, limite)
@@ -0,0 +1,171 @@
+from typing import Iterable, Optional
+import os
+import mmap
+import struct
+from array import array
+
+from modelo_inventario import Producto
+
+# -------------------------------
+# Instantánea binaria del catálogo (mmap)
+# -------------------------------
+class InstantaneaBinaria:
+    """
+    Catálogo en un archivo binario versionado que se lee con mmap sin parsearlo: columnas de
+    ancho fijo, textos UTF-8, filas ordenadas por código y los agregados en la cabecera.
+    Usa el orden de bytes de la máquina que lo escribió.
+    """
+    MAGIA = b'TNVCATAL'
+    VERSION = 1
+    # magia, versión, cantidad, en stock bajo, total activos, bytes del montículo, valor total (64 bytes)
+    CABECERA = struct.Struct('=8sI4x4qd8x')
+    
+    def __init__(self, ruta_archivo: str):
+        with open(ruta_archivo, 'rb') as archivo:
+            self._mapa = mmap.mmap(archivo.fileno(), 0, access=mmap.ACCESS_READ)
+        if len(self._mapa) < self.CABECERA.size:
+            self._mapa.close()
+            raise ValueError(f"Instantánea incompleta: {ruta_archivo}")
+        magia, version, cantidad, en_stock_bajo, total_activos, bytes_texto, valor_total = \
+            self.CABECERA.unpack_from(self._mapa)
+        if magia != self.MAGIA or version != self.VERSION:
+            self._mapa.close()
+            raise ValueError(f"{ruta_archivo} no es una instantánea de catálogo (versión {self.VERSION})")
+        self.cantidad = cantidad
+        self.total_activos = total_activos
+        self.valor_total = valor_total
+        
+        vista = memoryview(self._mapa)
+        posicion = self.CABECERA.size
+        columnas = []
+        for formato, largo in (('d', cantidad), ('q', cantidad), ('q', cantidad), ('B', cantidad),
+                               ('Q', 2 * cantidad + 1), ('q', cantidad), ('q', en_stock_bajo)):
+            fin = posicion + largo * array(formato).itemsize
+            columnas.append(vista[posicion:fin].cast(formato))
+            posicion = self._alinear(fin)
+        if posicion + bytes_texto > len(self._mapa):
+            for columna in columnas:
+                columna.release()
+            vista.release()
+            self._mapa.close()
+            raise ValueError(f"Instantánea incompleta: {ruta_archivo}")
+        self._vista = vista
+        (self._precios, self._stocks, self._minimos, self._activos,
+         self._desplazamientos, self._orden, self._filas_stock_bajo) = columnas
+        self._inicio_texto = posicion
+    
+    @staticmethod
+    def _alinear(posicion: int) -> int:
+        return (posicion + 7) & ~7
+    
+    @classmethod
+    def escribir(cls, ruta_archivo: str, productos: Iterable[Producto]) -> int:
+        """Guarda los productos de forma atómica (archivo temporal y reemplazo); devuelve cuántos"""
+        precios = array('d')
+        stocks = array('q')
+        minimos = array('q')
+        activos = array('B')
+        desplazamientos = array('Q', [0])
+        filas_stock_bajo = array('q')
+        texto = bytearray()
+        codigos = []
+        total_activos = 0
+        valor_total = 0.0
+        for fila, producto in enumerate(productos):
+            codigo = producto._codigo.encode('utf-8')
+            codigos.append(codigo)
+            texto += codigo
+            desplazamientos.append(len(texto))
+            texto += producto._nombre.encode('utf-8')
+            desplazamientos.append(len(texto))
+            precios.append(producto._precio)
+            stocks.append(producto._stock)
+            minimos.append(producto._stock_minimo)
+            activos.append(producto._activo)
+            if producto._activo:
+                total_activos += 1
+                valor_total += producto._precio * producto._stock
+                if producto._stock <= producto._stock_minimo:
+                    filas_stock_bajo.append(fila)
+        # UTF-8 ordena los bytes igual que los puntos de código, así que coincide con el orden de str
+        orden = array('q', sorted(range(len(codigos)), key=codigos.__getitem__))
+        
+        ruta_temporal = ruta_archivo + '.tmp'
+        with open(ruta_temporal, 'wb') as archivo:
+            archivo.write(cls.CABECERA.pack(cls.MAGIA, cls.VERSION, len(codigos), len(filas_stock_bajo),
+                                            total_activos, len(texto), valor_total))
+            for columna in (precios, stocks, minimos, activos, desplazamientos, orden, filas_stock_bajo):
+                datos = columna.tobytes()
+                archivo.write(datos)
+                archivo.write(bytes(cls._alinear(len(datos)) - len(datos)))
+            archivo.write(texto)
+            archivo.flush()
+            os.fsync(archivo.fileno())
+        os.replace(ruta_temporal, ruta_archivo)
+        return len(codigos)
+    
+    def __len__(self) -> int:
+        return self.cantidad
+    
+    def _texto(self, indice: int) -> str:
+        inicio = self._inicio_texto
+        return str(self._mapa[inicio + self._desplazamientos[indice]:inicio + self._desplazamientos[indice + 1]], 'utf-8')
+    
+    def codigo(self, fila: int) -> str:
+        return self._texto(2 * fila)
+    
+    def nombre(self, fila: int) -> str:
+        return self._texto(2 * fila + 1)
+    
+    def contenido(self, fila: int) -> tuple:
+        """(nombre, precio, stock, stock_minimo, activo) de la fila, sin armar el Producto"""
+        return (self.nombre(fila), self._precios[fila], self._stocks[fila], self._minimos[fila],
+                bool(self._activos[fila]))
+    
+    def activo(self, fila: int) -> bool:
+        return bool(self._activos[fila])
+    
+    def activos_entre(self, inicio: int, fin: int) -> int:
+        """Cuántas filas de [inicio, fin) están activas (se cuentan los bytes de la columna, sin recorrerlas)"""
+        return self._activos[inicio:fin].tobytes().count(1)
+    
+    def producto(self, fila: int) -> Producto:
+        """Arma el Producto de la fila; los datos se validaron al escribirse, no se vuelven a validar"""
+        producto = Producto.__new__(Producto)
+        producto._codigo = self.codigo(fila)
+        producto._nombre = self.nombre(fila)
+        producto._precio = self._precios[fila]
+        producto._stock = self._stocks[fila]
+        producto._stock_minimo = self._minimos[fila]
+        producto._activo = bool(self._activos[fila])
+        return producto
+    
+    def buscar_fila(self, codigo: str) -> Optional[int]:
+        """Fila del código (búsqueda binaria sobre el orden por código) o None"""
+        buscado = codigo.encode('utf-8')
+        mapa = self._mapa
+        inicio_texto = self._inicio_texto
+        desplazamientos = self._desplazamientos
+        orden = self._orden
+        bajo, alto = 0, self.cantidad
+        while bajo < alto:
+            medio = (bajo + alto) // 2
+            fila = orden[medio]
+            actual = mapa[inicio_texto + desplazamientos[2 * fila]:inicio_texto + desplazamientos[2 * fila + 1]]
+            if actual < buscado:
+                bajo = medio + 1
+            elif actual > buscado:
+                alto = medio
+            else:
+                return fila
+        return None
+    
+    def filas_stock_bajo(self) -> Iterable[int]:
+        return self._filas_stock_bajo
+    
+    def cerrar(self) -> None:
+        # Las vistas exportan el búfer del mmap: se liberan antes de cerrarlo
+        for columna in (self._precios, self._stocks, self._minimos, self._activos,
+                        self._desplazamientos, self._orden, self._filas_stock_bajo, self._vista):
+            columna.release()
+        self._mapa.close()
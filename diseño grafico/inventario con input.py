@@ -1,8 +1,16 @@
 from abc import ABC, abstractmethod
 from datetime import datetime
-from typing import List, Optional
+from typing import Dict, List, Optional
 from enum import Enum
 import os
+import sys
+
+# indice_nombres está junto a este archivo, que suele cargarse por ruta (su nombre tiene espacios)
+try:
+    from indice_nombres import IndiceNombres
+except ImportError:
+    sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+    from indice_nombres import IndiceNombres
 
 # -------------------------------
 # Enumeración para tipos de movimiento
@@ -179,9 +187,14 @@ class ReporteStockBajo(Reporte):
         return "\n".join(lineas)
 
 class ReporteValorInventario(Reporte):
+    def __init__(self, productos: List[Producto], valor_total: Optional[float] = None):
+        """valor_total: total ya calculado (Inventario.valor_total) para no recorrer los productos"""
+        super().__init__(productos)
+        self.valor_total = valor_total
+    
     def generar(self) -> str:
-        valor_total = sum(p.precio * p.stock for p in self.productos if p.activo)
         productos_activos = [p for p in self.productos if p.activo]
+        valor_total = self.valor_total if self.valor_total is not None else sum(p.precio * p.stock for p in productos_activos)
         
         lineas = [
             "\n" + "=" * 70,
@@ -211,6 +224,15 @@ class Inventario:
     def __init__(self):
         self._productos: List[Producto] = []
         self._historial_movimientos: List[MovimientoInventario] = []
+        # Índice por código para búsquedas O(1); debe mantenerse junto a _productos
+        self._indice_codigos: Dict[str, Producto] = {}
+        # Índice de texto para buscar_por_nombre; debe mantenerse junto a _productos
+        self._indice_nombres = IndiceNombres()
+        # Agregados de productos activos, actualizados en cada cambio
+        self._valor_total = 0.0
+        self._total_activos = 0
+        # Códigos con stock bajo en el orden en que entraron (dict como conjunto ordenado)
+        self._codigos_stock_bajo: Dict[str, None] = {}
     
     @property
     def productos(self) -> List[Producto]:
@@ -220,11 +242,38 @@ class Inventario:
     def productos_activos(self) -> List[Producto]:
         return [p for p in self._productos if p.activo]
     
+    @property
+    def productos_stock_bajo(self) -> List[Producto]:
+        return [self._indice_codigos[codigo] for codigo in self._codigos_stock_bajo]
+    
+    @property
+    def valor_total(self) -> float:
+        return self._valor_total
+    
+    @property
+    def total_activos(self) -> int:
+        return self._total_activos
+    
+    def _antes_de_cambiar(self, producto: Producto) -> None:
+        """Retira el producto de los agregados; llamar antes de modificarlo"""
+        if producto.activo:
+            self._total_activos -= 1
+            self._valor_total -= producto.precio * producto.stock
+            self._codigos_stock_bajo.pop(producto.codigo, None)
+    
+    def _despues_de_cambiar(self, producto: Producto) -> None:
+        """Vuelve a sumar el producto a los agregados; llamar después de modificarlo"""
+        if producto.activo:
+            self._total_activos += 1
+            self._valor_total += producto.precio * producto.stock
+            if producto.tiene_stock_bajo():
+                self._codigos_stock_bajo[producto.codigo] = None
+    
     def registrar_producto(self, producto: Producto) -> None:
         if self._buscar_producto_por_codigo(producto.codigo):
             raise ValueError(f"Ya existe un producto con el código '{producto.codigo}'")
         
-        self._productos.append(producto)
+        self._agregar_producto(producto)
         print(f"✓ Producto '{producto.nombre}' registrado exitosamente")
     
     def entrada_stock(self, codigo: str, cantidad: int) -> None:
@@ -232,7 +281,9 @@ class Inventario:
             raise ValueError("La cantidad debe ser mayor a cero")
         
         producto = self.buscar_producto(codigo)
+        self._antes_de_cambiar(producto)
         producto.stock += cantidad
+        self._despues_de_cambiar(producto)
         
         movimiento = MovimientoInventario(codigo, TipoMovimiento.ENTRADA, cantidad)
         self._historial_movimientos.append(movimiento)
@@ -248,7 +299,9 @@ class Inventario:
         if producto.stock < cantidad:
             raise ValueError(f"Stock insuficiente. Disponible: {producto.stock}, Solicitado: {cantidad}")
         
+        self._antes_de_cambiar(producto)
         producto.stock -= cantidad
+        self._despues_de_cambiar(producto)
         
         movimiento = MovimientoInventario(codigo, TipoMovimiento.SALIDA, cantidad)
         self._historial_movimientos.append(movimiento)
@@ -265,19 +318,30 @@ class Inventario:
         return producto
     
     def _buscar_producto_por_codigo(self, codigo: str) -> Optional[Producto]:
-        for producto in self._productos:
-            if producto.codigo == codigo:
-                return producto
-        return None
+        return self._indice_codigos.get(codigo)
     
-    def buscar_por_nombre(self, nombre: str) -> List[Producto]:
-        nombre_lower = nombre.lower()
-        return [p for p in self._productos if nombre_lower in p.nombre.lower()]
+    def _agregar_producto(self, producto: Producto) -> None:
+        """Agrega el producto a la lista y al índice por código"""
+        self._productos.append(producto)
+        self._indice_codigos[producto.codigo] = producto
+        self._indice_nombres.agregar(producto.codigo, producto.nombre)
+        self._despues_de_cambiar(producto)
+    
+    def buscar_por_nombre(self, nombre: str, limite: Optional[int] = None) -> List[Producto]:
+        """
+        Productos cuyo nombre contiene las palabras buscadas, sin distinguir mayúsculas ni
+        tildes, ordenados por relevancia (ver IndiceNombres.buscar)
+        """
+        return [self._indice_codigos[codigo] for codigo in self._indice_nombres.buscar(nombre, limite)]
     
     def actualizar_precio(self, codigo: str, nuevo_precio: float) -> None:
         producto = self.buscar_producto(codigo)
         precio_anterior = producto.precio
+        if nuevo_precio < 0:
+            raise ValueError("El precio no puede ser negativo")
+        self._antes_de_cambiar(producto)
         producto.precio = nuevo_precio
+        self._despues_de_cambiar(producto)
         print(f"✓ Precio de '{producto.nombre}' actualizado: S/. {precio_anterior:.2f} → S/. {nuevo_precio:.2f}")
     
     def mostrar_historial_movimientos(self, ultimos: int = 10) -> None:
@@ -412,12 +476,12 @@ class SistemaInventario:
     
     def ver_stock_bajo(self):
         """Muestra productos con stock bajo"""
-        reporte = ReporteStockBajo(self.inventario.productos_activos)
+        reporte = ReporteStockBajo(self.inventario.productos_stock_bajo)
         self.inventario.generar_reporte(reporte)
     
     def ver_valor_inventario(self):
         """Muestra el valor total del inventario"""
-        reporte = ReporteValorInventario(self.inventario.productos_activos)
+        reporte = ReporteValorInventario(self.inventario.productos_activos, self.inventario.valor_total)
         self.inventario.generar_reporte(reporte)
     
     def actualizar_precio(self):
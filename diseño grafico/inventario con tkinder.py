@@ -1,434 +1,85 @@
-from abc import ABC, abstractmethod
 from datetime import datetime
-from typing import List, Optional
-from enum import Enum
+from typing import Callable, List, Optional
 import tkinter as tk
 from tkinter import ttk, messagebox, scrolledtext, filedialog
-import csv
 import os
-import json
+import sys
+import threading
+import queue
+from contextlib import nullcontext
 
-# -------------------------------
-# Enumeración para tipos de movimiento
-# -------------------------------
-class TipoMovimiento(Enum):
-    ENTRADA = "Entrada"
-    SALIDA = "Salida"
+# Los módulos del inventario están junto a este archivo, que suele cargarse por ruta (su nombre tiene espacios);
+# los scripts que lo cargan con cargador_inventario usan también las clases que importa
+try:
+    from modelo_inventario import TipoMovimiento, MovimientoInventario, Producto
+except ImportError:
+    sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+    from modelo_inventario import TipoMovimiento, MovimientoInventario, Producto
+from rankings_inventario import ListaOrdenada, clasificar_abc
+from diario_inventario import DiarioInventario
+from metricas_inventario import MetricasInventario
+from nucleo_inventario import (HistorialCompacto, IndiceMovimientos, EstadisticasProducto, Inventario,
+                               Reporte, ReporteInventario, ReporteStockBajo, ReporteValorInventario,
+                               ReporteHistorial, ReporteConsumo, ReporteListadoSimple)
+from inventario_concurrente import InventarioConcurrente
+from inventario_particionado import InventarioParticionado
+from inventario_sqlite import InventarioSQLite
+from inventario_mapeado import InventarioMapeado
 
 # -------------------------------
-# Clase para registrar movimientos de inventario
+# Cancelación de operaciones largas desde la GUI
 # -------------------------------
-class MovimientoInventario:
-    def __init__(self, producto_codigo: str, tipo: TipoMovimiento, cantidad: int):
-        self.producto_codigo = producto_codigo
-        self.tipo = tipo
-        self.cantidad = cantidad
-        self.fecha = datetime.now()
-    
-    def __str__(self):
-        return f"[{self.fecha.strftime('%Y-%m-%d %H:%M')}] {self.tipo.value}: {self.cantidad} unidades - Producto: {self.producto_codigo}"
-    
-    def to_dict(self):
-        return {
-            'producto_codigo': self.producto_codigo,
-            'tipo': self.tipo.value,
-            'cantidad': self.cantidad,
-            'fecha': self.fecha.strftime('%Y-%m-%d %H:%M:%S')
-        }
+class OperacionCancelada(Exception):
+    pass
 
 # -------------------------------
-# Clase base Producto
-# -------------------------------
-class Producto:
-    STOCK_MINIMO_DEFAULT = 5
-    
-    def __init__(self, codigo: str, nombre: str, precio: float, stock: int = 0, stock_minimo: int = STOCK_MINIMO_DEFAULT):
-        self._validar_datos(codigo, nombre, precio, stock, stock_minimo)
-        self._codigo = codigo
-        self._nombre = nombre
-        self._precio = precio
-        self._stock = stock
-        self._stock_minimo = stock_minimo
-        self._activo = True
-    
-    @staticmethod
-    def _validar_datos(codigo: str, nombre: str, precio: float, stock: int, stock_minimo: int):
-        if not codigo or not codigo.strip():
-            raise ValueError("El código no puede estar vacío")
-        if not nombre or not nombre.strip():
-            raise ValueError("El nombre no puede estar vacío")
-        if precio < 0:
-            raise ValueError("El precio no puede ser negativo")
-        if stock < 0:
-            raise ValueError("El stock no puede ser negativo")
-        if stock_minimo < 0:
-            raise ValueError("El stock mínimo no puede ser negativo")
-    
-    @property
-    def codigo(self) -> str:
-        return self._codigo
-    
-    @property
-    def nombre(self) -> str:
-        return self._nombre
-    
-    @property
-    def precio(self) -> float:
-        return self._precio
-    
-    @precio.setter
-    def precio(self, nuevo_precio: float):
-        if nuevo_precio < 0:
-            raise ValueError("El precio no puede ser negativo")
-        self._precio = nuevo_precio
-    
-    @property
-    def stock(self) -> int:
-        return self._stock
-    
-    @stock.setter
-    def stock(self, cantidad: int):
-        if cantidad < 0:
-            raise ValueError("El stock no puede ser negativo")
-        self._stock = cantidad
-    
-    @property
-    def stock_minimo(self) -> int:
-        return self._stock_minimo
-    
-    @property
-    def activo(self) -> bool:
-        return self._activo
-    
-    def tiene_stock_bajo(self) -> bool:
-        return self._stock <= self._stock_minimo
-    
-    def to_dict(self):
-        return {
-            'codigo': self._codigo,
-            'nombre': self._nombre,
-            'precio': self._precio,
-            'stock': self._stock,
-            'stock_minimo': self._stock_minimo,
-            'activo': self._activo
-        }
-    
-    @classmethod
-    def from_dict(cls, data: dict):
-        producto = cls(
-            codigo=data['codigo'],
-            nombre=data['nombre'],
-            precio=float(data['precio']),
-            stock=int(data['stock']),
-            stock_minimo=int(data['stock_minimo'])
-        )
-        producto._activo = bool(data['activo'])
-        return producto
-
-# -------------------------------
-# Clase abstracta para reportes
-# -------------------------------
-class Reporte(ABC):
-    def __init__(self, productos: List[Producto]):
-        self.productos = productos
-    
-    @abstractmethod
-    def generar(self) -> str:
-        pass
-
-class ReporteInventario(Reporte):
-    def generar(self) -> str:
-        lineas = [
-            "=" * 80,
-            "TECHNOVA - REPORTE DE INVENTARIO COMPLETO".center(80),
-            "=" * 80,
-            f"Fecha: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}",
-            f"Total de productos: {len(self.productos)}",
-            "-" * 80,
-            ""
-        ]
-        
-        if not self.productos:
-            lineas.append("No hay productos registrados")
-        else:
-            for producto in self.productos:
-                estado = "ACTIVO" if producto.activo else "INACTIVO"
-                alerta = " ⚠️ STOCK BAJO" if producto.tiene_stock_bajo() else ""
-                lineas.append(f"[{estado}] {producto.codigo} - {producto.nombre}")
-                lineas.append(f"  Precio: S/. {producto.precio:.2f} | Stock: {producto.stock}{alerta}")
-                lineas.append("")
-        
-        lineas.append("=" * 80)
-        return "\n".join(lineas)
-
-class ReporteStockBajo(Reporte):
-    def generar(self) -> str:
-        productos_bajo_stock = [p for p in self.productos if p.tiene_stock_bajo() and p.activo]
-        
-        lineas = [
-            "=" * 80,
-            "TECHNOVA - ⚠️  REPORTE DE STOCK BAJO ⚠️".center(80),
-            "=" * 80,
-            f"Fecha: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}",
-            f"Productos con stock bajo: {len(productos_bajo_stock)}",
-            "-" * 80,
-            ""
-        ]
-        
-        if not productos_bajo_stock:
-            lineas.append("✓ Todos los productos tienen stock adecuado")
-        else:
-            for producto in productos_bajo_stock:
-                deficit = producto.stock_minimo - producto.stock
-                lineas.append(f"{producto.nombre}")
-                lineas.append(f"  Stock actual: {producto.stock} | Mínimo: {producto.stock_minimo} | Faltan: {deficit}")
-                lineas.append("")
-        
-        lineas.append("=" * 80)
-        return "\n".join(lineas)
-
-# -------------------------------
-# Clase Inventario
+# Interfaz Gráfica con Tkinter
 # -------------------------------
-class Inventario:
-    def __init__(self):
-        self._productos: List[Producto] = []
-        self._historial_movimientos: List[MovimientoInventario] = []
-    
-    @property
-    def productos(self) -> List[Producto]:
-        return self._productos.copy()
-    
-    @property
-    def productos_activos(self) -> List[Producto]:
-        return [p for p in self._productos if p.activo]
-    
-    def registrar_producto(self, producto: Producto) -> None:
-        if self._buscar_producto_por_codigo(producto.codigo):
-            raise ValueError(f"Ya existe un producto con el código '{producto.codigo}'")
-        self._productos.append(producto)
-    
-    def entrada_stock(self, codigo: str, cantidad: int) -> None:
-        if cantidad <= 0:
-            raise ValueError("La cantidad debe ser mayor a cero")
-        
-        producto = self.buscar_producto(codigo)
-        producto.stock += cantidad
-        
-        movimiento = MovimientoInventario(codigo, TipoMovimiento.ENTRADA, cantidad)
-        self._historial_movimientos.append(movimiento)
-    
-    def salida_stock(self, codigo: str, cantidad: int) -> None:
-        if cantidad <= 0:
-            raise ValueError("La cantidad debe ser mayor a cero")
-        
-        producto = self.buscar_producto(codigo)
-        
-        if producto.stock < cantidad:
-            raise ValueError(f"Stock insuficiente. Disponible: {producto.stock}, Solicitado: {cantidad}")
-        
-        producto.stock -= cantidad
-        
-        movimiento = MovimientoInventario(codigo, TipoMovimiento.SALIDA, cantidad)
-        self._historial_movimientos.append(movimiento)
-    
-    def buscar_producto(self, codigo: str) -> Producto:
-        producto = self._buscar_producto_por_codigo(codigo)
-        if not producto:
-            raise ValueError(f"Producto con código '{codigo}' no encontrado")
-        return producto
-    
-    def _buscar_producto_por_codigo(self, codigo: str) -> Optional[Producto]:
-        for producto in self._productos:
-            if producto.codigo == codigo:
-                return producto
-        return None
-    
-    def obtener_historial(self, ultimos: int = 20) -> List[MovimientoInventario]:
-        return self._historial_movimientos[-ultimos:]
-    
-    def exportar_csv(self, ruta_archivo: str) -> None:
-        """Exporta todos los productos a un archivo CSV"""
-        try:
-            with open(ruta_archivo, 'w', newline='', encoding='utf-8') as archivo:
-                campos = ['codigo', 'nombre', 'precio', 'stock', 'stock_minimo', 'activo']
-                escritor = csv.DictWriter(archivo, fieldnames=campos)
-                
-                escritor.writeheader()
-                for producto in self._productos:
-                    escritor.writerow(producto.to_dict())
-        except Exception as e:
-            raise Exception(f"Error al exportar CSV: {str(e)}")
+class SistemaInventarioGUI:
+    DIRECTORIO_DATOS = os.path.join(os.path.dirname(os.path.abspath(__file__)), "datos_technova")
+    # Con más productos activos que esto, la tabla solo crea las filas visibles
+    UMBRAL_TABLA_VIRTUAL = 2000
+    # Pausa de escritura tras la que se aplica la búsqueda por nombre
+    RETARDO_BUSQUEDA_MS = 150
     
-    def importar_csv(self, ruta_archivo: str, modo_importacion: str = 'agregar') -> tuple[int, int]:
+    def __init__(self, root, inventario: Optional[Inventario] = None, metricas: Optional[MetricasInventario] = None):
         """
-        Importa productos desde un archivo CSV
-        modos: 'agregar', 'reemplazar', 'actualizar'
+        inventario: permite usar otro almacenamiento (p. ej. InventarioSQLite); por defecto, InventarioMapeado con diario
+        metricas: si se indica, se miden las operaciones del inventario, el refresco de la tabla y los
+        reportes, y al cerrar se guardan en formato Prometheus en DIRECTORIO_DATOS/metricas.prom
         """
-        productos_importados = 0
-        productos_actualizados = 0
-        
-        try:
-            with open(ruta_archivo, 'r', encoding='utf-8') as archivo:
-                lector = csv.DictReader(archivo)
-                
-                if modo_importacion == 'reemplazar':
-                    self._productos.clear()
-                
-                for fila in lector:
-                    try:
-                        # Convertir tipos de datos
-                        codigo = fila['codigo'].strip()
-                        nombre = fila['nombre'].strip()
-                        precio = float(fila['precio'])
-                        stock = int(fila['stock'])
-                        stock_minimo = int(fila.get('stock_minimo', 5))
-                        activo = fila.get('activo', 'True').lower() in ['true', '1', 'yes', 'si']
-                        
-                        producto_existente = self._buscar_producto_por_codigo(codigo)
-                        
-                        if producto_existente:
-                            if modo_importacion in ['actualizar', 'agregar']:
-                                # Actualizar producto existente
-                                producto_existente._nombre = nombre
-                                producto_existente._precio = precio
-                                producto_existente._stock = stock
-                                producto_existente._stock_minimo = stock_minimo
-                                producto_existente._activo = activo
-                                productos_actualizados += 1
-                        else:
-                            # Crear nuevo producto
-                            producto = Producto(
-                                codigo=codigo,
-                                nombre=nombre,
-                                precio=precio,
-                                stock=stock,
-                                stock_minimo=stock_minimo
-                            )
-                            producto._activo = activo
-                            self._productos.append(producto)
-                            productos_importados += 1
-                            
-                    except (ValueError, KeyError) as e:
-                        print(f"Error al procesar fila: {fila} - Error: {e}")
-                        continue
-                        
-        except FileNotFoundError:
-            raise Exception(f"Archivo no encontrado: {ruta_archivo}")
-        except Exception as e:
-            raise Exception(f"Error al importar CSV: {str(e)}")
-        
-        return productos_importados, productos_actualizados
-    
-    def exportar_txt(self, ruta_archivo: str, tipo_reporte: str = 'inventario') -> None:
-        """Exporta reporte a archivo TXT"""
-        try:
-            if tipo_reporte == 'inventario':
-                reporte = ReporteInventario(self.productos_activos)
-                contenido = reporte.generar()
-            elif tipo_reporte == 'stock_bajo':
-                reporte = ReporteStockBajo(self.productos_activos)
-                contenido = reporte.generar()
-            elif tipo_reporte == 'historial':
-                historial = self.obtener_historial(100)  # Últimos 100 movimientos
-                contenido = "=" * 80 + "\n"
-                contenido += "TECHNOVA - HISTORIAL DE MOVIMIENTOS".center(80) + "\n"
-                contenido += "=" * 80 + "\n\n"
-                
-                if not historial:
-                    contenido += "No hay movimientos registrados"
-                else:
-                    for mov in reversed(historial):
-                        contenido += str(mov) + "\n"
-                
-                contenido += "\n" + "=" * 80
-            else:
-                contenido = f"Reporte generado el: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n\n"
-                for producto in self.productos_activos:
-                    contenido += f"{producto.codigo} | {producto.nombre} | S/. {producto.precio:.2f} | Stock: {producto.stock}\n"
-            
-            with open(ruta_archivo, 'w', encoding='utf-8') as archivo:
-                archivo.write(contenido)
-                
-        except Exception as e:
-            raise Exception(f"Error al exportar TXT: {str(e)}")
-    
-    def exportar_json(self, ruta_archivo: str) -> None:
-        """Exporta todos los datos a JSON"""
-        try:
-            datos = {
-                'productos': [p.to_dict() for p in self._productos],
-                'movimientos': [m.to_dict() for m in self._historial_movimientos],
-                'fecha_exportacion': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
-                'empresa': 'TechNova Solutions S.A.'
-            }
-            
-            with open(ruta_archivo, 'w', encoding='utf-8') as archivo:
-                json.dump(datos, archivo, indent=2, ensure_ascii=False)
-                
-        except Exception as e:
-            raise Exception(f"Error al exportar JSON: {str(e)}")
-    
-    def importar_json(self, ruta_archivo: str) -> tuple[int, int]:
-        """Importa datos desde JSON"""
-        productos_importados = 0
-        
-        try:
-            with open(ruta_archivo, 'r', encoding='utf-8') as archivo:
-                datos = json.load(archivo)
-            
-            # Importar productos
-            if 'productos' in datos:
-                for producto_data in datos['productos']:
-                    try:
-                        producto = Producto.from_dict(producto_data)
-                        # Verificar si ya existe
-                        if not self._buscar_producto_por_codigo(producto.codigo):
-                            self._productos.append(producto)
-                            productos_importados += 1
-                    except Exception as e:
-                        print(f"Error al importar producto: {producto_data} - Error: {e}")
-                        continue
-            
-            # Importar movimientos (opcional)
-            if 'movimientos' in datos:
-                for mov_data in datos['movimientos']:
-                    try:
-                        movimiento = MovimientoInventario(
-                            producto_codigo=mov_data['producto_codigo'],
-                            tipo=TipoMovimiento(mov_data['tipo']),
-                            cantidad=int(mov_data['cantidad'])
-                        )
-                        # Asignar fecha si existe
-                        if 'fecha' in mov_data:
-                            movimiento.fecha = datetime.strptime(mov_data['fecha'], '%Y-%m-%d %H:%M:%S')
-                        self._historial_movimientos.append(movimiento)
-                    except Exception as e:
-                        print(f"Error al importar movimiento: {mov_data} - Error: {e}")
-                        continue
-                        
-        except FileNotFoundError:
-            raise Exception(f"Archivo no encontrado: {ruta_archivo}")
-        except json.JSONDecodeError:
-            raise Exception("Error: El archivo JSON no tiene un formato válido")
-        except Exception as e:
-            raise Exception(f"Error al importar JSON: {str(e)}")
-        
-        return productos_importados, 0
-
-# -------------------------------
-# Interfaz Gráfica con Tkinter
-# -------------------------------
-class SistemaInventarioGUI:
-    def __init__(self, root):
         self.root = root
         self.root.title("TechNova - Sistema de Gestión de Inventario")
         self.root.geometry("1100x750")
         self.root.configure(bg="#f0f0f0")
         
         self.empresa_nombre = "TechNova Solutions S.A."
-        self.inventario = Inventario()
-        self._cargar_datos_iniciales()
+        if inventario is None:
+            # El catálogo de la instantánea se abre con mmap y el historial se copia en columnas
+            # sin indexarlo: el arranque no depende de su tamaño
+            inventario = InventarioMapeado(historial_compacto=True)
+            inventario.usar_diario(DiarioInventario(self.DIRECTORIO_DATOS, catalogo_binario=True))
+        self.inventario = inventario
+        self.metricas = metricas
+        if metricas:
+            self.inventario.activar_metricas(metricas)
+            metricas.instrumentar(self, ('actualizar_tabla',), 'gui_')
+        # Solo la primera ejecución carga los productos de ejemplo
+        if not self.inventario.total_productos:
+            self._cargar_datos_iniciales()
+        self.root.protocol("WM_DELETE_WINDOW", self.cerrar)
+        
+        # Estado de la tabla: las filas se piden por páginas (al inventario o a los resultados de la búsqueda)
+        self._resultados_busqueda: List[Producto] = []
+        self._total_vista = 0
+        self._codigos_pintados: set = set()
+        self._vista_sucia = True
+        self._codigos_modificados: set = set()
+        self._modo_virtual = False
+        self._inicio_virtual = 0
+        self._busqueda_pendiente = None
+        self._busqueda = ""
+        self.inventario.agregar_observador(self._al_cambiar_producto)
         
         # Estilo
         self.style = ttk.Style()
@@ -449,6 +100,14 @@ class SistemaInventarioGUI:
         for producto in productos_iniciales:
             self.inventario.registrar_producto(producto)
     
+    def cerrar(self):
+        """Guarda en disco los datos pendientes antes de cerrar la ventana"""
+        if self.metricas:
+            os.makedirs(self.DIRECTORIO_DATOS, exist_ok=True)
+            self.metricas.exportar_prometheus(os.path.join(self.DIRECTORIO_DATOS, "metricas.prom"))
+        self.inventario.cerrar()
+        self.root.destroy()
+    
     def crear_interfaz(self):
         # Frame principal
         main_frame = tk.Frame(self.root, bg="#f0f0f0")
@@ -504,6 +163,12 @@ class SistemaInventarioGUI:
         tk.Button(export_frame, text="📄 Exportar TXT", bg="#8e44ad", fg="white",
                  font=("Arial", 9, "bold"), width=12, command=self.exportar_txt).pack(side=tk.LEFT, padx=2)
         
+        tk.Button(export_frame, text="🗂️ Exportar JSON", bg="#d35400", fg="white",
+                 font=("Arial", 9, "bold"), width=12, command=self.exportar_json).pack(side=tk.LEFT, padx=2)
+        
+        tk.Button(export_frame, text="🗂️ Importar JSON", bg="#c0392b", fg="white",
+                 font=("Arial", 9, "bold"), width=12, command=self.importar_json).pack(side=tk.LEFT, padx=2)
+        
         tk.Button(export_frame, text="🔄 Actualizar", bg="#f39c12", fg="white",
                  font=("Arial", 9, "bold"), width=12, command=self.actualizar_tabla).pack(side=tk.LEFT, padx=2)
         
@@ -511,9 +176,19 @@ class SistemaInventarioGUI:
         tabla_container = tk.Frame(main_frame, bg="#f0f0f0")
         tabla_container.pack(fill=tk.BOTH, expand=True, pady=10)
         
-        # Título de la tabla
-        tk.Label(tabla_container, text="📦 INVENTARIO DE PRODUCTOS TECHNOBA", 
-                font=("Arial", 12, "bold"), bg="#f0f0f0", fg="#2c3e50").pack(anchor="w", pady=(0, 5))
+        # Título de la tabla y búsqueda por nombre
+        titulo_frame = tk.Frame(tabla_container, bg="#f0f0f0")
+        titulo_frame.pack(fill=tk.X, pady=(0, 5))
+        
+        tk.Label(titulo_frame, text="📦 INVENTARIO DE PRODUCTOS TECHNOBA", 
+                font=("Arial", 12, "bold"), bg="#f0f0f0", fg="#2c3e50").pack(side=tk.LEFT)
+        
+        self.var_busqueda = tk.StringVar()
+        self.var_busqueda.trace_add("write", self._al_escribir_busqueda)
+        tk.Entry(titulo_frame, textvariable=self.var_busqueda, width=30,
+                 font=("Arial", 10)).pack(side=tk.RIGHT)
+        tk.Label(titulo_frame, text="🔍 Buscar:", 
+                font=("Arial", 10), bg="#f0f0f0").pack(side=tk.RIGHT, padx=(0, 5))
         
         # Tabla de productos
         tabla_frame = tk.Frame(tabla_container, bg="white", relief=tk.SUNKEN, borderwidth=1)
@@ -537,12 +212,21 @@ class SistemaInventarioGUI:
         self.tabla.column("Stock Mín", width=120)
         self.tabla.column("Estado", width=120)
         
+        # Colorear filas con stock bajo
+        self.tabla.tag_configure("bajo", background="#ffcccc")
+        
         # Scrollbar
-        scrollbar = ttk.Scrollbar(tabla_frame, orient=tk.VERTICAL, command=self.tabla.yview)
-        self.tabla.configure(yscroll=scrollbar.set)
+        self.scrollbar = ttk.Scrollbar(tabla_frame, orient=tk.VERTICAL, command=self.tabla.yview)
+        self.tabla.configure(yscroll=self.scrollbar.set)
+        
+        # En modo virtual el desplazamiento lo gestiona _desplazar_virtual
+        self.tabla.bind("<MouseWheel>", self._rueda_virtual)
+        self.tabla.bind("<Button-4>", self._rueda_virtual)
+        self.tabla.bind("<Button-5>", self._rueda_virtual)
+        self.tabla.bind("<Configure>", lambda evento: self._pintar_filas_virtuales() if self._modo_virtual else None)
         
         self.tabla.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
-        scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+        self.scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
         
         # Frame de información
         info_frame = tk.Frame(main_frame, bg="#2c3e50", relief=tk.FLAT, borderwidth=0)
@@ -556,6 +240,10 @@ class SistemaInventarioGUI:
                                       font=("Arial", 11, "bold"), bg="#2c3e50", fg="#ff6b6b")
         self.lbl_stock_bajo.pack(side=tk.LEFT, padx=20, pady=10)
         
+        self.lbl_valor = tk.Label(info_frame, text="Valor inventario: S/. 0.00", 
+                                 font=("Arial", 11, "bold"), bg="#2c3e50", fg="#2ecc71")
+        self.lbl_valor.pack(side=tk.LEFT, padx=20, pady=10)
+        
         # Pie de página
         footer_frame = tk.Frame(main_frame, bg="#34495e", height=30)
         footer_frame.pack(fill=tk.X, pady=(5, 0))
@@ -564,6 +252,87 @@ class SistemaInventarioGUI:
         tk.Label(footer_frame, text=f"© 2024 {self.empresa_nombre} - Todos los derechos reservados", 
                 font=("Arial", 9), bg="#34495e", fg="#bdc3c7").pack(pady=5)
     
+    def _ejecutar_en_segundo_plano(self, titulo: str, tarea: Callable, al_terminar: Callable):
+        """
+        Ejecuta tarea(progreso, cancelado) en un hilo con una ventana modal de progreso;
+        al_terminar(resultado) corre en el hilo principal. progreso(hecho, total) admite total=None.
+        """
+        cola: queue.Queue = queue.Queue()
+        cancelado = threading.Event()
+        # Una búsqueda pendiente leería el inventario durante la tarea: se aplica antes
+        if self._busqueda_pendiente:
+            self.root.after_cancel(self._busqueda_pendiente)
+            self._aplicar_busqueda()
+        
+        ventana = tk.Toplevel(self.root)
+        ventana.title(f"TechNova - {titulo}")
+        ventana.geometry("400x160")
+        ventana.configure(bg="#f0f0f0")
+        ventana.transient(self.root)
+        # Modal: mientras el hilo usa el inventario no se puede modificar desde la GUI
+        ventana.grab_set()
+        ventana.protocol("WM_DELETE_WINDOW", cancelado.set)
+        
+        tk.Label(ventana, text=titulo, font=("Arial", 12, "bold"), bg="#f0f0f0").pack(pady=(15, 5))
+        barra = ttk.Progressbar(ventana, length=340, mode="indeterminate")
+        barra.pack(pady=5)
+        barra.start(10)
+        lbl_estado = tk.Label(ventana, text="Iniciando...", font=("Arial", 9), bg="#f0f0f0")
+        lbl_estado.pack()
+        btn_cancelar = tk.Button(ventana, text="✗ Cancelar", bg="#95a5a6", fg="white",
+                                 font=("Arial", 10), command=cancelado.set)
+        btn_cancelar.pack(pady=10)
+        
+        def progreso(hecho: int, total: Optional[int] = None):
+            if cancelado.is_set():
+                raise OperacionCancelada()
+            cola.put(('progreso', hecho, total))
+        
+        def trabajar():
+            try:
+                cola.put(('fin', tarea(progreso, cancelado)))
+            except Exception as e:
+                cola.put(('error', e))
+        
+        def revisar_cola():
+            try:
+                while True:
+                    mensaje = cola.get_nowait()
+                    if mensaje[0] == 'progreso':
+                        _, hecho, total = mensaje
+                        if total:
+                            if str(barra.cget("mode")) != "determinate":
+                                barra.stop()
+                                barra.configure(mode="determinate", maximum=total)
+                            barra.configure(value=hecho)
+                            lbl_estado.config(text=f"{hecho:,} de {total:,}")
+                        else:
+                            lbl_estado.config(text=f"Procesados: {hecho:,}")
+                    else:
+                        ventana.grab_release()
+                        ventana.destroy()
+                        if cancelado.is_set():
+                            messagebox.showinfo(f"TechNova - {titulo}", "Operación cancelada")
+                        elif mensaje[0] == 'error':
+                            messagebox.showerror(f"TechNova - {titulo}", str(mensaje[1]))
+                        else:
+                            al_terminar(mensaje[1])
+                        return
+            except queue.Empty:
+                pass
+            if cancelado.is_set():
+                btn_cancelar.config(state=tk.DISABLED, text="Cancelando...")
+            self.root.after(100, revisar_cola)
+        
+        threading.Thread(target=trabajar, name=f"tarea-{titulo}", daemon=True).start()
+        self.root.after(100, revisar_cola)
+    
+    @staticmethod
+    def _borrar_si_cancelado(ruta_archivo: str, cancelado: threading.Event):
+        """Una exportación cancelada no debe dejar un archivo a medio escribir"""
+        if cancelado.is_set() and os.path.exists(ruta_archivo):
+            os.remove(ruta_archivo)
+    
     def exportar_csv(self):
         """Exporta el inventario a archivo CSV"""
         try:
@@ -575,12 +344,23 @@ class SistemaInventarioGUI:
             )
             
             if ruta_archivo:
-                self.inventario.exportar_csv(ruta_archivo)
-                messagebox.showinfo("TechNova - Exportación Exitosa", 
-                    f"✅ Inventario exportado correctamente\n\n"
-                    f"Archivo: {os.path.basename(ruta_archivo)}\n"
-                    f"Ubicación: {os.path.dirname(ruta_archivo)}\n"
-                    f"Productos exportados: {len(self.inventario.productos)}")
+                total = self.inventario.total_productos
+                
+                def tarea(progreso, cancelado):
+                    try:
+                        self.inventario.exportar_csv(ruta_archivo, lambda escritos: progreso(escritos, total))
+                    finally:
+                        self._borrar_si_cancelado(ruta_archivo, cancelado)
+                    return total
+                
+                def al_terminar(exportados):
+                    messagebox.showinfo("TechNova - Exportación Exitosa", 
+                        f"✅ Inventario exportado correctamente\n\n"
+                        f"Archivo: {os.path.basename(ruta_archivo)}\n"
+                        f"Ubicación: {os.path.dirname(ruta_archivo)}\n"
+                        f"Productos exportados: {exportados}")
+                
+                self._ejecutar_en_segundo_plano("Exportando CSV", tarea, al_terminar)
                 
         except Exception as e:
             messagebox.showerror("TechNova - Error de Exportación", str(e))
@@ -617,24 +397,45 @@ class SistemaInventarioGUI:
                           variable=modo_var, value="reemplazar", bg="#f0f0f0").pack(anchor="w", padx=20, pady=5)
             
             def ejecutar_importacion():
-                try:
-                    productos_importados, productos_actualizados = self.inventario.importar_csv(
-                        ruta_archivo, modo_var.get())
+                modo = modo_var.get()
+                ventana_opciones.destroy()
+                
+                def tarea(progreso, cancelado):
+                    # El archivo se lee en un inventario auxiliar y se fusiona en el real también desde el hilo
+                    auxiliar = Inventario()
+                    rechazadas = 0
+                    
+                    def al_avanzar(filas, importados, actualizados, errores):
+                        nonlocal rechazadas
+                        rechazadas = errores
+                        progreso(filas)
                     
-                    ventana_opciones.destroy()
+                    _, repetidos = auxiliar.importar_csv(
+                        ruta_archivo, 'reemplazar' if modo == 'reemplazar' else 'actualizar',
+                        callback_progreso=al_avanzar)
+                    if cancelado.is_set():
+                        raise OperacionCancelada()
+                    productos_importados, productos_actualizados = self.inventario.fusionar(auxiliar, modo)
+                    # Ya fusionado: un cancelar a esta altura no deshace nada, se informa lo importado
+                    cancelado.clear()
+                    # Los códigos repetidos dentro del archivo cuentan como actualizaciones
+                    return productos_importados, productos_actualizados + repetidos, rechazadas
+                
+                def al_terminar(resultado):
+                    productos_importados, productos_actualizados, rechazadas = resultado
                     
                     mensaje = f"✅ Importación completada\n\n"
                     if productos_importados > 0:
                         mensaje += f"Nuevos productos: {productos_importados}\n"
                     if productos_actualizados > 0:
                         mensaje += f"Productos actualizados: {productos_actualizados}\n"
+                    if rechazadas > 0:
+                        mensaje += f"Filas rechazadas: {rechazadas}\n"
                     
                     messagebox.showinfo("TechNova - Importación Exitosa", mensaje)
                     self.actualizar_tabla()
-                    
-                except Exception as e:
-                    ventana_opciones.destroy()
-                    messagebox.showerror("TechNova - Error de Importación", str(e))
+                
+                self._ejecutar_en_segundo_plano("Importando CSV", tarea, al_terminar)
             
             tk.Button(ventana_opciones, text="✓ Importar", bg="#27ae60", fg="white",
                      font=("Arial", 10, "bold"), command=ejecutar_importacion).pack(pady=20)
@@ -645,13 +446,79 @@ class SistemaInventarioGUI:
         except Exception as e:
             messagebox.showerror("TechNova - Error de Importación", str(e))
     
+    def exportar_json(self):
+        """Exporta productos y movimientos a archivo JSON"""
+        try:
+            ruta_archivo = filedialog.asksaveasfilename(
+                defaultextension=".json",
+                filetypes=[("Archivos JSON", "*.json"), ("JSON Lines (historial grande)", "*.jsonl"),
+                           ("Todos los archivos", "*.*")],
+                title="Exportar datos a JSON",
+                initialfile=f"inventario_technova_{datetime.now().strftime('%Y%m%d')}.json"
+            )
+            
+            if ruta_archivo:
+                def tarea(progreso, cancelado):
+                    try:
+                        if ruta_archivo.endswith('.jsonl'):
+                            self.inventario.exportar_jsonl(ruta_archivo, progreso)
+                        else:
+                            self.inventario.exportar_json(ruta_archivo, progreso)
+                    finally:
+                        self._borrar_si_cancelado(ruta_archivo, cancelado)
+                
+                def al_terminar(_):
+                    messagebox.showinfo("TechNova - Exportación Exitosa", 
+                        f"✅ Datos exportados correctamente\n\n"
+                        f"Archivo: {os.path.basename(ruta_archivo)}\n"
+                        f"Ubicación: {os.path.dirname(ruta_archivo)}")
+                
+                self._ejecutar_en_segundo_plano("Exportando JSON", tarea, al_terminar)
+                
+        except Exception as e:
+            messagebox.showerror("TechNova - Error de Exportación", str(e))
+    
+    def importar_json(self):
+        """Importa productos nuevos y movimientos desde archivo JSON"""
+        try:
+            ruta_archivo = filedialog.askopenfilename(
+                filetypes=[("Archivos JSON", "*.json *.jsonl"), ("Todos los archivos", "*.*")],
+                title="Importar datos desde JSON"
+            )
+            
+            if not ruta_archivo:
+                return
+            
+            def tarea(progreso, cancelado):
+                auxiliar = Inventario()
+                if ruta_archivo.endswith('.jsonl'):
+                    auxiliar.importar_jsonl(ruta_archivo, progreso)
+                else:
+                    auxiliar.importar_json(ruta_archivo)
+                if cancelado.is_set():
+                    raise OperacionCancelada()
+                productos_importados, _ = self.inventario.fusionar(auxiliar, 'nuevos', incluir_movimientos=True)
+                cancelado.clear()
+                return productos_importados
+            
+            def al_terminar(productos_importados):
+                messagebox.showinfo("TechNova - Importación Exitosa",
+                    f"✅ Importación completada\n\n"
+                    f"Nuevos productos: {productos_importados}")
+                self.actualizar_tabla()
+            
+            self._ejecutar_en_segundo_plano("Importando JSON", tarea, al_terminar)
+            
+        except Exception as e:
+            messagebox.showerror("TechNova - Error de Importación", str(e))
+    
     def exportar_txt(self):
         """Exporta reportes a archivo TXT"""
         try:
             # Ventana de selección de tipo de reporte
             ventana_tipo = tk.Toplevel(self.root)
             ventana_tipo.title("Exportar a TXT")
-            ventana_tipo.geometry("400x300")
+            ventana_tipo.geometry("400x330")
             ventana_tipo.configure(bg="#f0f0f0")
             
             tk.Label(ventana_tipo, text="Seleccionar tipo de reporte", 
@@ -662,6 +529,7 @@ class SistemaInventarioGUI:
             opciones = [
                 ("📋 Reporte de Inventario Completo", "inventario"),
                 ("⚠️ Reporte de Stock Bajo", "stock_bajo"),
+                ("💰 Reporte de Valor de Inventario", "valor"),
                 ("📜 Historial de Movimientos", "historial"),
                 ("📄 Listado Simple", "simple")
             ]
@@ -681,15 +549,24 @@ class SistemaInventarioGUI:
                         initialfile=nombre_archivo
                     )
                     
+                    tipo_reporte = tipo_var.get()
+                    ventana_tipo.destroy()
+                    
                     if ruta_archivo:
-                        self.inventario.exportar_txt(ruta_archivo, tipo_var.get())
-                        messagebox.showinfo("TechNova - Exportación Exitosa", 
-                            f"✅ Reporte exportado correctamente\n\n"
-                            f"Archivo: {os.path.basename(ruta_archivo)}\n"
-                            f"Tipo: {tipo_var.get()}\n"
-                            f"Ubicación: {os.path.dirname(ruta_archivo)}")
+                        def tarea(progreso, cancelado):
+                            try:
+                                self.inventario.exportar_txt(ruta_archivo, tipo_reporte, progreso)
+                            finally:
+                                self._borrar_si_cancelado(ruta_archivo, cancelado)
                         
-                    ventana_tipo.destroy()
+                        def al_terminar(_):
+                            messagebox.showinfo("TechNova - Exportación Exitosa", 
+                                f"✅ Reporte exportado correctamente\n\n"
+                                f"Archivo: {os.path.basename(ruta_archivo)}\n"
+                                f"Tipo: {tipo_reporte}\n"
+                                f"Ubicación: {os.path.dirname(ruta_archivo)}")
+                        
+                        self._ejecutar_en_segundo_plano("Exportando TXT", tarea, al_terminar)
                     
                 except Exception as e:
                     messagebox.showerror("TechNova - Error de Exportación", str(e))
@@ -703,39 +580,140 @@ class SistemaInventarioGUI:
         except Exception as e:
             messagebox.showerror("TechNova - Error", str(e))
     
-    def actualizar_tabla(self):
-        # Limpiar tabla
-        for item in self.tabla.get_children():
-            self.tabla.delete(item)
-        
-        # Llenar tabla
-        productos = self.inventario.productos_activos
-        stock_bajo_count = 0
-        
+    def _al_cambiar_producto(self, producto: Optional[Producto]):
+        """Observador del inventario: anota qué filas hay que repintar en el próximo refresco"""
+        pintado = producto is not None and producto.codigo in self._codigos_pintados
+        if producto is None or self._busqueda or producto.activo != pintado or (self._modo_virtual and not pintado):
+            # Cambió qué productos se muestran: hay que reconstruir la vista
+            self._vista_sucia = True
+        else:
+            self._codigos_modificados.add(producto.codigo)
+    
+    @staticmethod
+    def _valores_fila(producto: Producto) -> tuple:
+        estado = "✓ Normal"
+        tag = ""
+        
+        if producto.tiene_stock_bajo():
+            estado = "⚠️ Stock Bajo"
+            tag = "bajo"
+        
+        return (
+            producto.codigo,
+            producto.nombre,
+            f"S/. {producto.precio:.2f}",
+            producto.stock,
+            producto.stock_minimo,
+            estado
+        ), (tag,)
+    
+    def _configurar_modo_tabla(self, virtual: bool):
+        if virtual == self._modo_virtual:
+            return
+        self._modo_virtual = virtual
+        self._inicio_virtual = 0
+        if virtual:
+            self.scrollbar.configure(command=self._desplazar_virtual)
+            self.tabla.configure(yscroll="")
+        else:
+            self.scrollbar.configure(command=self.tabla.yview)
+            self.tabla.configure(yscroll=self.scrollbar.set)
+    
+    def _filas_visibles(self) -> int:
+        alto_fila = int(self.style.lookup("Treeview", "rowheight") or 20)
+        alto = self.tabla.winfo_height()
+        if alto <= 1:
+            # La ventana aún no se ha dibujado
+            return int(self.tabla.cget("height"))
+        # Se descuenta una fila para el encabezado
+        return max(1, alto // alto_fila - 1)
+    
+    def _pintar_filas_virtuales(self):
+        """Muestra solo las filas que caben en la tabla a partir de _inicio_virtual"""
+        total = self._total_vista
+        filas = self._filas_visibles()
+        self._inicio_virtual = inicio = max(0, min(self._inicio_virtual, total - filas))
+        self._pintar_filas(self._pagina_vista(inicio, filas))
+        
+        if total:
+            self.scrollbar.set(inicio / total, min(1.0, (inicio + filas) / total))
+        else:
+            self.scrollbar.set(0.0, 1.0)
+    
+    def _desplazar_virtual(self, accion, cantidad, unidad=None):
+        """Recibe los comandos de la scrollbar ('moveto' o 'scroll') en modo virtual"""
+        if accion == 'moveto':
+            self._inicio_virtual = int(float(cantidad) * self._total_vista)
+        elif accion == 'scroll':
+            paso = int(cantidad)
+            self._inicio_virtual += paso * self._filas_visibles() if unidad == 'pages' else paso
+        self._pintar_filas_virtuales()
+    
+    def _rueda_virtual(self, evento):
+        if not self._modo_virtual:
+            return None
+        paso = -3 if evento.num == 4 or evento.delta > 0 else 3
+        self._desplazar_virtual('scroll', paso, 'units')
+        return "break"
+    
+    def _al_escribir_busqueda(self, *args):
+        # Se espera a que el usuario deje de escribir para no rehacer la vista en cada tecla
+        if self._busqueda_pendiente:
+            self.root.after_cancel(self._busqueda_pendiente)
+        self._busqueda_pendiente = self.root.after(self.RETARDO_BUSQUEDA_MS, self._aplicar_busqueda)
+    
+    def _aplicar_busqueda(self):
+        self._busqueda_pendiente = None
+        self._busqueda = self.var_busqueda.get().strip()
+        self._vista_sucia = True
+        self._inicio_virtual = 0
+        self.actualizar_tabla()
+    
+    def _pagina_vista(self, inicio: int, cantidad: int) -> List[Producto]:
+        """
+        Productos activos de las posiciones [inicio, inicio + cantidad): de los resultados
+        de la búsqueda (en orden de relevancia) si hay texto, o pedidos al inventario, que
+        solo arma los de la página
+        """
+        if self._busqueda:
+            return self._resultados_busqueda[inicio:inicio + cantidad]
+        return self.inventario.pagina_activos(inicio, cantidad)
+    
+    def _pintar_filas(self, productos: List[Producto]):
+        self.tabla.delete(*self.tabla.get_children())
         for producto in productos:
-            estado = "✓ Normal"
-            tag = ""
-            
-            if producto.tiene_stock_bajo():
-                estado = "⚠️ Stock Bajo"
-                tag = "bajo"
-                stock_bajo_count += 1
+            valores, tags = self._valores_fila(producto)
+            self.tabla.insert("", tk.END, iid=producto.codigo, values=valores, tags=tags)
+        self._codigos_pintados = {producto.codigo for producto in productos}
+    
+    def actualizar_tabla(self):
+        if self._vista_sucia:
+            # Reconstruir la vista: solo cuando cambia qué productos se muestran
+            if self._busqueda:
+                self._resultados_busqueda = [p for p in self.inventario.buscar_por_nombre(self._busqueda) if p.activo]
+                self._total_vista = len(self._resultados_busqueda)
+            else:
+                self._resultados_busqueda = []
+                self._total_vista = self.inventario.total_activos
+            self._vista_sucia = False
+            self._configurar_modo_tabla(self._total_vista > self.UMBRAL_TABLA_VIRTUAL)
             
-            self.tabla.insert("", tk.END, values=(
-                producto.codigo,
-                producto.nombre,
-                f"S/. {producto.precio:.2f}",
-                producto.stock,
-                producto.stock_minimo,
-                estado
-            ), tags=(tag,))
-        
-        # Colorear filas con stock bajo
-        self.tabla.tag_configure("bajo", background="#ffcccc")
-        
-        # Actualizar información
-        self.lbl_total.config(text=f"Total productos: {len(productos)}")
-        self.lbl_stock_bajo.config(text=f"Productos con stock bajo: {stock_bajo_count}")
+            if self._modo_virtual:
+                self._pintar_filas_virtuales()
+            else:
+                self._pintar_filas(self._pagina_vista(0, self._total_vista))
+        else:
+            # Repintar solo las filas creadas cuyo producto cambió
+            for codigo in self._codigos_modificados:
+                if self.tabla.exists(codigo):
+                    valores, tags = self._valores_fila(self.inventario.buscar_producto(codigo))
+                    self.tabla.item(codigo, values=valores, tags=tags)
+        self._codigos_modificados.clear()
+        
+        # Actualizar información (agregados mantenidos por el inventario)
+        self.lbl_total.config(text=f"Total productos: {self.inventario.total_activos}")
+        self.lbl_stock_bajo.config(text=f"Productos con stock bajo: {self.inventario.total_stock_bajo}")
+        self.lbl_valor.config(text=f"Valor inventario: S/. {self.inventario.valor_total:,.2f}")
     
     def ventana_agregar_producto(self):
         ventana = tk.Toplevel(self.root)
@@ -964,32 +942,24 @@ class SistemaInventarioGUI:
                                                font=("Courier", 9), wrap=tk.WORD)
         text_area.pack(fill=tk.BOTH, expand=True)
         
-        def mostrar_inventario():
-            reporte = ReporteInventario(self.inventario.productos_activos)
+        def mostrar_reporte(reporte: Reporte):
             text_area.delete(1.0, tk.END)
-            text_area.insert(1.0, reporte.generar())
+            with self.metricas.medir(f"gui_reporte_{type(reporte).__name__}") if self.metricas else nullcontext():
+                for bloque in reporte.bloques():
+                    text_area.insert(tk.END, bloque)
+        
+        def mostrar_inventario():
+            mostrar_reporte(ReporteInventario(self.inventario.productos_activos))
         
         def mostrar_stock_bajo():
-            reporte = ReporteStockBajo(self.inventario.productos_activos)
-            text_area.delete(1.0, tk.END)
-            text_area.insert(1.0, reporte.generar())
+            mostrar_reporte(ReporteStockBajo(self.inventario.productos_stock_bajo))
         
         def mostrar_historial():
-            historial = self.inventario.obtener_historial(20)
-            text_area.delete(1.0, tk.END)
-            
-            texto = "=" * 80 + "\n"
-            texto += "TECHNOVA - HISTORIAL DE MOVIMIENTOS (últimos 20)".center(80) + "\n"
-            texto += "=" * 80 + "\n\n"
-            
-            if not historial:
-                texto += "No hay movimientos registrados"
-            else:
-                for mov in reversed(historial):
-                    texto += str(mov) + "\n"
-            
-            texto += "\n" + "=" * 80
-            text_area.insert(1.0, texto)
+            mostrar_reporte(ReporteHistorial(self.inventario.obtener_historial(20),
+                                             "TECHNOVA - HISTORIAL DE MOVIMIENTOS (últimos 20)"))
+        
+        def mostrar_consumo():
+            mostrar_reporte(self.inventario.reporte_consumo())
         
         def exportar_reporte():
             contenido = text_area.get(1.0, tk.END)
@@ -1028,6 +998,9 @@ class SistemaInventarioGUI:
         tk.Button(btn_frame, text="📜 Historial Movimientos", bg="#9b59b6", fg="white",
                  command=mostrar_historial, **btn_reportes_style).pack(side=tk.LEFT, padx=5)
         
+        tk.Button(btn_frame, text="📈 Consumo", bg="#e67e22", fg="white",
+                 command=mostrar_consumo, **btn_reportes_style).pack(side=tk.LEFT, padx=5)
+        
         tk.Button(btn_frame, text="💾 Guardar Reporte", bg="#27ae60", fg="white",
                  command=exportar_reporte, **btn_reportes_style).pack(side=tk.LEFT, padx=5)
         
@@ -1039,7 +1012,9 @@ class SistemaInventarioGUI:
 # -------------------------------
 def main():
     root = tk.Tk()
-    app = SistemaInventarioGUI(root)
+    # TECHNOVA_METRICAS=1 activa la medición de operaciones (se guarda al cerrar la ventana)
+    metricas = MetricasInventario() if os.environ.get('TECHNOVA_METRICAS') else None
+    app = SistemaInventarioGUI(root, metricas=metricas)
     root.mainloop()
 
 if __name__ == "__main__":
@@ -0,0 +1,156 @@
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional
+import threading
+from contextlib import contextmanager
+
+from modelo_inventario import MovimientoInventario, Producto
+from rankings_inventario import ListaOrdenada
+from nucleo_inventario import Inventario
+
+# -------------------------------
+# Inventario para uso desde varios hilos
+# -------------------------------
+class InventarioConcurrente(Inventario):
+    """
+    Inventario en memoria seguro para varios hilos. Cada código cae en una de `franjas`
+    cerraduras; los agregados, el historial y los índices usan una cerradura común.
+    Las operaciones masivas toman todas las franjas.
+    """
+    
+    def __init__(self, historial_compacto: bool = False, franjas: int = 64):
+        if franjas <= 0:
+            raise ValueError("La cantidad de franjas debe ser mayor a cero")
+        super().__init__(historial_compacto)
+        self._franjas = [threading.Lock() for _ in range(franjas)]
+        self._comun = threading.RLock()
+    
+    def _franja(self, codigo: str) -> threading.Lock:
+        return self._franjas[hash(codigo) % len(self._franjas)]
+    
+    @contextmanager
+    def _bloqueando_todo(self):
+        # Siempre en el mismo orden para que dos hilos no se bloqueen mutuamente
+        for franja in self._franjas:
+            franja.acquire()
+        try:
+            yield
+        finally:
+            for franja in reversed(self._franjas):
+                franja.release()
+    
+    def _anotar(self, operacion: str, **datos) -> None:
+        # La instantánea no se toma aquí (el hilo puede tener una franja): ver _snapshot_si_toca
+        self._diario.registrar(operacion, **datos)
+    
+    def _snapshot_si_toca(self) -> None:
+        """Se llama sin franjas tomadas; la instantánea se escribe con todas, sin cambios en curso"""
+        if self._diario and self._diario.necesita_snapshot():
+            with self._bloqueando_todo():
+                if self._diario.necesita_snapshot():
+                    self._diario.escribir_snapshot(self)
+    
+    @property
+    def productos_stock_bajo(self) -> List[Producto]:
+        with self._comun:
+            return super().productos_stock_bajo
+    
+    def _antes_de_cambiar(self, producto: Producto) -> None:
+        with self._comun:
+            super()._antes_de_cambiar(producto)
+    
+    def _despues_de_cambiar(self, producto: Producto) -> None:
+        with self._comun:
+            super()._despues_de_cambiar(producto)
+    
+    def _agregar_producto(self, producto: Producto) -> None:
+        with self._comun:
+            super()._agregar_producto(producto)
+    
+    def _agregar_movimiento(self, movimiento: MovimientoInventario) -> None:
+        with self._comun:
+            super()._agregar_movimiento(movimiento)
+    
+    def _sumar_estadisticas_lote(self, aceptados: List[tuple], epoch: int) -> None:
+        # registrar_movimientos aplica el lote con las franjas, sin el común: se toma aquí
+        with self._comun:
+            super()._sumar_estadisticas_lote(aceptados, epoch)
+    
+    def _indexar_lote(self, inicio: int, aceptados: List[tuple], epoch: int) -> None:
+        with self._comun:
+            super()._indexar_lote(inicio, aceptados, epoch)
+    
+    def _ponerse_al_dia(self) -> None:
+        with self._comun:
+            super()._ponerse_al_dia()
+    
+    def _orden_por_valor(self) -> ListaOrdenada:
+        # Los pendientes se anotan bajo el común (_despues_de_cambiar); se corrigen igual
+        with self._comun:
+            return super()._orden_por_valor()
+    
+    def _limpiar_productos(self) -> None:
+        with self._bloqueando_todo(), self._comun:
+            super()._limpiar_productos()
+    
+    def avanzar_marca_exportacion(self, marca: int) -> None:
+        with self._comun:
+            super().avanzar_marca_exportacion(marca)
+    
+    def cambios_desde(self, marca: int) -> tuple[List[Producto], List[str]]:
+        with self._comun:
+            return super().cambios_desde(marca)
+    
+    def estadisticas_producto(self, codigo: str, ahora: Optional[datetime] = None) -> Optional[dict]:
+        with self._comun:
+            return super().estadisticas_producto(codigo, ahora)
+    
+    def estadisticas_movimientos(self, ahora: Optional[datetime] = None) -> Dict[str, dict]:
+        with self._comun:
+            return super().estadisticas_movimientos(ahora)
+    
+    def buscar_por_nombre(self, nombre: str, limite: Optional[int] = None) -> List[Producto]:
+        with self._comun:
+            return super().buscar_por_nombre(nombre, limite)
+    
+    def registrar_producto(self, producto: Producto) -> None:
+        with self._franja(producto.codigo):
+            super().registrar_producto(producto)
+        self._snapshot_si_toca()
+    
+    def entrada_stock(self, codigo: str, cantidad: int) -> None:
+        with self._franja(codigo):
+            super().entrada_stock(codigo, cantidad)
+        self._snapshot_si_toca()
+    
+    def salida_stock(self, codigo: str, cantidad: int) -> None:
+        with self._franja(codigo):
+            super().salida_stock(codigo, cantidad)
+        self._snapshot_si_toca()
+    
+    def actualizar_precio(self, codigo: str, nuevo_precio: float) -> None:
+        with self._franja(codigo):
+            super().actualizar_precio(codigo, nuevo_precio)
+        self._snapshot_si_toca()
+    
+    def cambiar_estado(self, codigo: str, activo: bool) -> None:
+        with self._franja(codigo):
+            super().cambiar_estado(codigo, activo)
+        self._snapshot_si_toca()
+    
+    def registrar_movimientos(self, movimientos: Iterable[tuple],
+                              inicio: int = 1) -> tuple[int, List[tuple[int, str]]]:
+        with self._bloqueando_todo():
+            return super().registrar_movimientos(movimientos, inicio)
+    
+    def _incorporar_producto(self, codigo: str, nombre: str, precio: float, stock: int, stock_minimo: int,
+                             activo: bool, actualizar_existentes: bool) -> Optional[bool]:
+        # El común también cubre el cambio de nombre en el índice de nombres
+        with self._franja(codigo), self._comun:
+            resultado = super()._incorporar_producto(codigo, nombre, precio, stock, stock_minimo,
+                                                     activo, actualizar_existentes)
+        self._snapshot_si_toca()
+        return resultado
+    
+    def _incorporar_movimiento(self, movimiento: MovimientoInventario) -> None:
+        super()._incorporar_movimiento(movimiento)
+        self._snapshot_si_toca()
@@ -0,0 +1,185 @@
+from typing import Dict, Iterator, List, Optional
+from itertools import islice
+
+from modelo_inventario import Producto
+from instantanea_binaria import InstantaneaBinaria
+from nucleo_inventario import Inventario
+
+# -------------------------------
+# Inventario sobre una instantánea binaria (arranque inmediato)
+# -------------------------------
+class CatalogoMapeado:
+    """
+    Índice por código de InventarioMapeado: los productos de la instantánea se arman
+    la primera vez que se piden y desde entonces se devuelve siempre el mismo objeto
+    (así sus cambios se conservan); los registrados después viven en un dict aparte.
+    """
+    # Filas por bloque de pagina_activos
+    BLOQUE = 4096
+    
+    def __init__(self, instantanea: Optional[InstantaneaBinaria] = None):
+        self._instantanea = instantanea
+        self._cargados: Dict[str, Producto] = {}
+        self._cargados_por_fila: Dict[int, Producto] = {}
+        self._bloques_cargados: set = set()
+        self._nuevos: Dict[str, Producto] = {}
+    
+    def _cargar(self, fila: int, codigo: str) -> Producto:
+        producto = self._cargados.get(codigo)
+        if producto is None:
+            producto = self._cargados[codigo] = self._cargados_por_fila[fila] = self._instantanea.producto(fila)
+            self._bloques_cargados.add(fila // self.BLOQUE)
+        return producto
+    
+    def get(self, codigo: str, defecto: Optional[Producto] = None) -> Optional[Producto]:
+        producto = self._cargados.get(codigo) or self._nuevos.get(codigo)
+        if producto is None and self._instantanea is not None:
+            fila = self._instantanea.buscar_fila(codigo)
+            if fila is not None:
+                producto = self._cargar(fila, codigo)
+        return producto if producto is not None else defecto
+    
+    def __getitem__(self, codigo: str) -> Producto:
+        producto = self.get(codigo)
+        if producto is None:
+            raise KeyError(codigo)
+        return producto
+    
+    def __setitem__(self, codigo: str, producto: Producto) -> None:
+        self._nuevos[codigo] = producto
+    
+    def __contains__(self, codigo: str) -> bool:
+        return (codigo in self._cargados or codigo in self._nuevos
+                or (self._instantanea is not None and self._instantanea.buscar_fila(codigo) is not None))
+    
+    def __len__(self) -> int:
+        return (len(self._instantanea) if self._instantanea is not None else 0) + len(self._nuevos)
+    
+    def __iter__(self) -> Iterator[str]:
+        if self._instantanea is not None:
+            for fila in range(len(self._instantanea)):
+                yield self._instantanea.codigo(fila)
+        yield from self._nuevos
+    
+    def productos(self) -> Iterator[Producto]:
+        """Todos los productos en orden de registro (arma los que falten)"""
+        instantanea = self._instantanea
+        if instantanea is not None:
+            for fila in range(len(instantanea)):
+                yield self._cargar(fila, instantanea.codigo(fila))
+        yield from self._nuevos.values()
+    
+    def nombres(self) -> Iterator[tuple]:
+        """(codigo, nombre) de todos los productos sin armar los que no se cargaron"""
+        instantanea = self._instantanea
+        if instantanea is not None:
+            for fila in range(len(instantanea)):
+                codigo = instantanea.codigo(fila)
+                producto = self._cargados.get(codigo)
+                yield codigo, producto._nombre if producto else instantanea.nombre(fila)
+        for producto in self._nuevos.values():
+            yield producto._codigo, producto._nombre
+    
+    def pagina_activos(self, inicio: int, cantidad: int) -> List[Producto]:
+        """Productos activos en las posiciones [inicio, inicio + cantidad), armando solo los de la página"""
+        pagina = []
+        instantanea = self._instantanea
+        if cantidad <= 0:
+            return pagina
+        if instantanea is not None:
+            por_fila = self._cargados_por_fila
+            for bloque in range(0, len(instantanea), self.BLOQUE):
+                fin = min(bloque + self.BLOQUE, len(instantanea))
+                # Sin productos armados en el bloque, la columna activo de la instantánea está al día
+                if inicio and bloque // self.BLOQUE not in self._bloques_cargados:
+                    activos = instantanea.activos_entre(bloque, fin)
+                    if activos <= inicio:
+                        inicio -= activos
+                        continue
+                for fila in range(bloque, fin):
+                    producto = por_fila.get(fila)
+                    if not (producto._activo if producto is not None else instantanea.activo(fila)):
+                        continue
+                    if inicio:
+                        inicio -= 1
+                        continue
+                    pagina.append(producto or self._cargar(fila, instantanea.codigo(fila)))
+                    if len(pagina) == cantidad:
+                        return pagina
+        pagina += islice((p for p in self._nuevos.values() if p._activo), inicio, inicio + cantidad - len(pagina))
+        return pagina
+    
+    def clear(self) -> None:
+        if self._instantanea is not None:
+            self._instantanea.cerrar()
+            self._instantanea = None
+        self._cargados.clear()
+        self._cargados_por_fila.clear()
+        self._bloques_cargados.clear()
+        self._nuevos.clear()
+
+class VistaProductosMapeados:
+    """Reemplazo de la lista _productos de Inventario sobre un CatalogoMapeado"""
+    
+    def __init__(self, catalogo: CatalogoMapeado):
+        self._catalogo = catalogo
+    
+    def __iter__(self) -> Iterator[Producto]:
+        return self._catalogo.productos()
+    
+    def __len__(self) -> int:
+        return len(self._catalogo)
+    
+    def copy(self) -> List[Producto]:
+        return list(self._catalogo.productos())
+    
+    def append(self, producto: Producto) -> None:
+        self._catalogo[producto.codigo] = producto
+    
+    def clear(self) -> None:
+        self._catalogo.clear()
+
+class InventarioMapeado(Inventario):
+    """
+    Inventario en memoria que arranca desde una InstantaneaBinaria sin leerla: los productos
+    se arman al pedirlos y los agregados salen de la cabecera.
+    """
+    
+    def __init__(self, ruta_instantanea: Optional[str] = None, historial_compacto: bool = False):
+        super().__init__(historial_compacto)
+        self._adjuntar(None)
+        if ruta_instantanea:
+            self._cargar_catalogo(ruta_instantanea)
+    
+    def _adjuntar(self, instantanea: Optional[InstantaneaBinaria]) -> None:
+        self._indice_codigos = CatalogoMapeado(instantanea)
+        self._productos = VistaProductosMapeados(self._indice_codigos)
+        self._indice_nombres.limpiar()
+        if instantanea is not None:
+            self._valor_total = instantanea.valor_total
+            self._total_activos = instantanea.total_activos
+            self._codigos_stock_bajo = dict.fromkeys(instantanea.codigo(fila) for fila in instantanea.filas_stock_bajo())
+    
+    def _nombres_catalogo(self) -> Iterator[tuple]:
+        return self._indice_codigos.nombres()
+    
+    def _cargar_catalogo(self, ruta_archivo: str) -> None:
+        if self.total_productos:
+            raise ValueError("La instantánea binaria solo se carga en un inventario vacío")
+        self._adjuntar(InstantaneaBinaria(ruta_archivo))
+        self._notificar(None)
+    
+    def pagina_activos(self, inicio: int, cantidad: int) -> List[Producto]:
+        return self._indice_codigos.pagina_activos(inicio, cantidad)
+    
+    def _incorporar_producto(self, codigo: str, nombre: str, precio: float, stock: int, stock_minimo: int,
+                             activo: bool, actualizar_existentes: bool) -> Optional[bool]:
+        # Una fila idéntica a la de la instantánea se omite sin armar el producto
+        catalogo = self._indice_codigos
+        if (catalogo._instantanea is not None and codigo not in catalogo._cargados
+                and codigo not in catalogo._nuevos):
+            fila = catalogo._instantanea.buscar_fila(codigo)
+            if fila is not None and (not actualizar_existentes or
+                                     catalogo._instantanea.contenido(fila) == (nombre, precio, stock, stock_minimo, activo)):
+                return None
+        return super()._incorporar_producto(codigo, nombre, precio, stock, stock_minimo, activo, actualizar_existentes)
@@ -0,0 +1,253 @@
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional
+import os
+import zlib
+from itertools import chain
+import heapq
+
+from modelo_inventario import MovimientoInventario, Producto
+from rankings_inventario import clasificar_abc
+from nucleo_inventario import (Reporte, ReporteInventario, ReporteStockBajo, ReporteValorInventario, ReporteHistorial,
+                               ReporteConsumo, ReporteListadoSimple, Inventario, contexto_procesos)
+
+# Los procesos de InventarioParticionado importan este módulo (sin tkinter) para correr _trabajador_particion
+
+# -------------------------------
+# Inventario repartido en varios procesos
+# -------------------------------
+def _trabajador_particion(conexion, historial_compacto: bool) -> None:
+    """Bucle de un proceso de InventarioParticionado: ejecuta (método, argumentos) sobre su Inventario"""
+    inventario = Inventario(historial_compacto)
+    while True:
+        mensaje = conexion.recv()
+        if mensaje is None:
+            break
+        nombre, argumentos = mensaje
+        try:
+            atributo = getattr(inventario, nombre)
+            conexion.send((True, atributo(*argumentos) if callable(atributo) else atributo))
+        except Exception as e:
+            conexion.send((False, e))
+    conexion.close()
+
+class InventarioParticionado:
+    """
+    Reparte los productos entre `particiones` procesos según el CRC32 del código. Las consultas
+    generales van a todos a la vez; los productos devueltos son copias.
+    """
+    
+    def __init__(self, particiones: Optional[int] = None, historial_compacto: bool = False):
+        particiones = particiones or os.cpu_count() or 1
+        if particiones <= 0:
+            raise ValueError("La cantidad de particiones debe ser mayor a cero")
+        contexto = contexto_procesos()
+        self._conexiones = []
+        self._procesos = []
+        for _ in range(particiones):
+            local, remota = contexto.Pipe()
+            proceso = contexto.Process(target=_trabajador_particion, args=(remota, historial_compacto), daemon=True)
+            proceso.start()
+            remota.close()
+            self._conexiones.append(local)
+            self._procesos.append(proceso)
+        self._particion_por_codigo: Dict[str, int] = {}
+    
+    @property
+    def particiones(self) -> int:
+        return len(self._conexiones)
+    
+    def _particion(self, codigo: str) -> int:
+        # hash() de str cambia entre procesos; CRC32 es estable. Se recuerda por código
+        # porque repartir los lotes de registrar_movimientos lo pide en cada fila
+        particion = self._particion_por_codigo.get(codigo)
+        if particion is None:
+            particion = zlib.crc32(codigo.encode('utf-8')) % len(self._conexiones)
+            self._particion_por_codigo[codigo] = particion
+        return particion
+    
+    @staticmethod
+    def _respuesta(conexion):
+        correcto, resultado = conexion.recv()
+        if not correcto:
+            raise resultado
+        return resultado
+    
+    def _llamar(self, codigo: str, nombre: str, *argumentos):
+        conexion = self._conexiones[self._particion(codigo)]
+        conexion.send((nombre, argumentos))
+        return self._respuesta(conexion)
+    
+    def _difundir(self, nombre: str, *argumentos) -> list:
+        """Envía la operación a todas las particiones y devuelve sus resultados en orden"""
+        for conexion in self._conexiones:
+            conexion.send((nombre, argumentos))
+        resultados = []
+        error = None
+        # Se leen todas las respuestas aunque alguna falle, para no desfasar las conexiones
+        for conexion in self._conexiones:
+            try:
+                resultados.append(self._respuesta(conexion))
+            except Exception as e:
+                error = error or e
+        if error:
+            raise error
+        return resultados
+    
+    def cerrar(self) -> None:
+        for conexion in self._conexiones:
+            try:
+                conexion.send(None)
+            except (BrokenPipeError, OSError):
+                pass
+        for proceso in self._procesos:
+            proceso.join()
+        for conexion in self._conexiones:
+            conexion.close()
+        self._conexiones = []
+        self._procesos = []
+    
+    # --- Operaciones de un producto ---
+    def registrar_producto(self, producto: Producto) -> None:
+        self._llamar(producto.codigo, 'registrar_producto', producto)
+    
+    def entrada_stock(self, codigo: str, cantidad: int) -> None:
+        self._llamar(codigo, 'entrada_stock', codigo, cantidad)
+    
+    def salida_stock(self, codigo: str, cantidad: int) -> None:
+        self._llamar(codigo, 'salida_stock', codigo, cantidad)
+    
+    def actualizar_precio(self, codigo: str, nuevo_precio: float) -> None:
+        self._llamar(codigo, 'actualizar_precio', codigo, nuevo_precio)
+    
+    def cambiar_estado(self, codigo: str, activo: bool) -> None:
+        self._llamar(codigo, 'cambiar_estado', codigo, activo)
+    
+    def buscar_producto(self, codigo: str) -> Producto:
+        return self._llamar(codigo, 'buscar_producto', codigo)
+    
+    def historial_producto(self, codigo: str, ultimos: Optional[int] = None) -> List[MovimientoInventario]:
+        return self._llamar(codigo, 'historial_producto', codigo, ultimos)
+    
+    # --- Movimientos por lotes ---
+    def registrar_movimientos(self, movimientos: Iterable[tuple],
+                              inicio: int = 1) -> tuple[int, List[tuple[int, str]]]:
+        """Igual que Inventario.registrar_movimientos; cada partición valida y aplica su parte"""
+        partes = [[] for _ in self._conexiones]
+        numeros = [[] for _ in self._conexiones]
+        rechazados: List[tuple[int, str]] = []
+        particion = self._particion
+        for numero, registro in enumerate(movimientos, inicio):
+            try:
+                i = particion(str(registro[0]))
+            except (TypeError, IndexError, KeyError):
+                rechazados.append((numero, "Se esperaba (codigo, tipo, cantidad)"))
+                continue
+            partes[i].append(registro)
+            numeros[i].append(numero)
+        
+        con_datos = [i for i, parte in enumerate(partes) if parte]
+        for i in con_datos:
+            self._conexiones[i].send(('registrar_movimientos', (partes[i],)))
+        aplicados = 0
+        for i in con_datos:
+            aplicados_parte, rechazados_parte = self._respuesta(self._conexiones[i])
+            aplicados += aplicados_parte
+            # La partición numera desde 1: se traduce al número de fila del lote original
+            rechazados.extend((numeros[i][numero - 1], motivo) for numero, motivo in rechazados_parte)
+        rechazados.sort()
+        return aplicados, rechazados
+    
+    # --- Consultas sobre todas las particiones ---
+    @property
+    def productos(self) -> List[Producto]:
+        return [p for parte in self._difundir('productos') for p in parte]
+    
+    @property
+    def productos_activos(self) -> List[Producto]:
+        return [p for parte in self._difundir('productos_activos') for p in parte]
+    
+    def pagina_activos(self, inicio: int, cantidad: int) -> List[Producto]:
+        # Mismo orden que productos_activos: solo se piden las particiones que caen en la página
+        pagina = []
+        for conexion, activos in zip(self._conexiones, self._difundir('total_activos')):
+            if inicio < activos and len(pagina) < cantidad:
+                conexion.send(('pagina_activos', (inicio, cantidad - len(pagina))))
+                pagina += self._respuesta(conexion)
+            inicio = max(0, inicio - activos)
+        return pagina
+    
+    @property
+    def productos_stock_bajo(self) -> List[Producto]:
+        return [p for parte in self._difundir('productos_stock_bajo') for p in parte]
+    
+    @property
+    def total_productos(self) -> int:
+        return sum(self._difundir('total_productos'))
+    
+    @property
+    def valor_total(self) -> float:
+        return sum(self._difundir('valor_total'))
+    
+    @property
+    def total_activos(self) -> int:
+        return sum(self._difundir('total_activos'))
+    
+    @property
+    def total_stock_bajo(self) -> int:
+        return sum(self._difundir('total_stock_bajo'))
+    
+    def buscar_por_nombre(self, nombre: str, limite: Optional[int] = None) -> List[Producto]:
+        encontrados = [p for parte in self._difundir('buscar_por_nombre', nombre, limite) for p in parte]
+        return encontrados[:limite] if limite else encontrados
+    
+    def obtener_historial(self, ultimos: int = 20) -> List[MovimientoInventario]:
+        # Cada partición devuelve sus últimos; se mezclan por fecha (cada parte ya viene ordenada)
+        partes = self._difundir('obtener_historial', ultimos)
+        return list(heapq.merge(*partes, key=lambda m: m.fecha))[-ultimos:]
+    
+    def movimientos_entre(self, desde: Optional[datetime] = None, hasta: Optional[datetime] = None,
+                          codigo: Optional[str] = None) -> List[MovimientoInventario]:
+        if codigo is not None:
+            return self._llamar(codigo, 'movimientos_entre', desde, hasta, codigo)
+        partes = self._difundir('movimientos_entre', desde, hasta)
+        return list(heapq.merge(*partes, key=lambda m: m.fecha))
+    
+    def estadisticas_producto(self, codigo: str, ahora: Optional[datetime] = None) -> Optional[dict]:
+        return self._llamar(codigo, 'estadisticas_producto', codigo, ahora)
+    
+    def top_productos(self, cantidad: int = 10, criterio: str = 'valor') -> List[Producto]:
+        clave = Inventario._clave_ranking(criterio)
+        # Los primeros globales están entre los primeros de cada partición
+        partes = self._difundir('top_productos', cantidad, criterio)
+        return heapq.nsmallest(cantidad, chain.from_iterable(partes), key=clave)
+    
+    def pagina_ranking(self, pagina: int = 1, tamano: int = 50, criterio: str = 'valor') -> List[Producto]:
+        if pagina < 1 or tamano <= 0:
+            raise ValueError("La página empieza en 1 y el tamaño debe ser mayor a cero")
+        inicio = (pagina - 1) * tamano
+        return self.top_productos(inicio + tamano, criterio)[inicio:]
+    
+    def clasificacion_abc(self, umbrales: tuple[float, float] = (0.80, 0.95)) -> Dict[str, List[str]]:
+        return clasificar_abc(list(chain.from_iterable(self._difundir('_valores_activos'))), umbrales)
+    
+    def estadisticas_movimientos(self, ahora: Optional[datetime] = None) -> Dict[str, dict]:
+        # Cada código vive en una sola partición: basta con unir los resultados
+        ahora = ahora or datetime.now()
+        estadisticas = {}
+        for parte in self._difundir('estadisticas_movimientos', ahora):
+            estadisticas.update(parte)
+        return estadisticas
+    
+    def reporte(self, tipo_reporte: str = 'inventario') -> Reporte:
+        """Reporte armado con los datos de todas las particiones (mismos tipos que exportar_txt)"""
+        if tipo_reporte == 'inventario':
+            return ReporteInventario(self.productos_activos)
+        if tipo_reporte == 'stock_bajo':
+            return ReporteStockBajo(self.productos_stock_bajo)
+        if tipo_reporte == 'valor':
+            return ReporteValorInventario(self.productos_activos, self.valor_total)
+        if tipo_reporte == 'historial':
+            return ReporteHistorial(self.obtener_historial(100))
+        if tipo_reporte == 'consumo':
+            return ReporteConsumo.ordenado(self.productos_activos, self.estadisticas_movimientos())
+        return ReporteListadoSimple(self.productos_activos)
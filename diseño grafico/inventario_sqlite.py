@@ -0,0 +1,589 @@
+from datetime import datetime
+from typing import Callable, Dict, Iterable, Iterator, List, Optional
+import csv
+import json
+import sqlite3
+import weakref
+from itertools import islice
+from contextlib import contextmanager
+
+from conversion_csv import ErrorFilaCSV
+from modelo_inventario import TipoMovimiento, MovimientoInventario, Producto
+from diario_inventario import DiarioInventario
+from nucleo_inventario import EstadisticasProducto, Inventario
+
+# -------------------------------
+# Inventario con almacenamiento SQLite
+# -------------------------------
+class InventarioSQLite(Inventario):
+    """
+    Inventario cuyos productos y movimientos viven en una base SQLite (modo WAL),
+    con consultas indexadas. Mantiene la misma interfaz que Inventario.
+    """
+    ESQUEMA = """
+        CREATE TABLE IF NOT EXISTS productos (
+            codigo TEXT PRIMARY KEY,
+            nombre TEXT NOT NULL,
+            precio REAL NOT NULL,
+            stock INTEGER NOT NULL,
+            stock_minimo INTEGER NOT NULL,
+            activo INTEGER NOT NULL
+        );
+        CREATE INDEX IF NOT EXISTS idx_productos_activos ON productos(codigo) WHERE activo = 1;
+        CREATE INDEX IF NOT EXISTS idx_productos_stock_bajo ON productos(codigo) WHERE activo = 1 AND stock <= stock_minimo;
+        CREATE INDEX IF NOT EXISTS idx_productos_valor ON productos(precio * stock DESC, codigo) WHERE activo = 1;
+        CREATE TABLE IF NOT EXISTS movimientos (
+            id INTEGER PRIMARY KEY,
+            codigo TEXT NOT NULL,
+            tipo TEXT NOT NULL,
+            cantidad INTEGER NOT NULL,
+            fecha INTEGER NOT NULL
+        );
+        CREATE INDEX IF NOT EXISTS idx_movimientos_codigo ON movimientos(codigo, id);
+        CREATE INDEX IF NOT EXISTS idx_movimientos_fecha ON movimientos(fecha, id);
+        CREATE INDEX IF NOT EXISTS idx_movimientos_codigo_fecha ON movimientos(codigo, fecha, id);
+        CREATE TABLE IF NOT EXISTS agregados (
+            id INTEGER PRIMARY KEY CHECK (id = 1),
+            total_productos INTEGER NOT NULL,
+            total_activos INTEGER NOT NULL,
+            valor_total REAL NOT NULL,
+            total_stock_bajo INTEGER NOT NULL
+        );
+    """
+    # Mantienen la fila de agregados; las cargas masivas los quitan (ver _carga_masiva)
+    TRIGGERS_AGREGADOS = {
+        'agregados_al_insertar': """
+            CREATE TRIGGER IF NOT EXISTS agregados_al_insertar AFTER INSERT ON productos BEGIN
+                UPDATE agregados SET total_productos = total_productos + 1,
+                    total_activos = total_activos + NEW.activo,
+                    valor_total = valor_total + NEW.activo * NEW.precio * NEW.stock,
+                    total_stock_bajo = total_stock_bajo + (NEW.activo = 1 AND NEW.stock <= NEW.stock_minimo);
+            END""",
+        'agregados_al_borrar': """
+            CREATE TRIGGER IF NOT EXISTS agregados_al_borrar AFTER DELETE ON productos BEGIN
+                UPDATE agregados SET total_productos = total_productos - 1,
+                    total_activos = total_activos - OLD.activo,
+                    valor_total = valor_total - OLD.activo * OLD.precio * OLD.stock,
+                    total_stock_bajo = total_stock_bajo - (OLD.activo = 1 AND OLD.stock <= OLD.stock_minimo);
+            END""",
+        'agregados_al_actualizar': """
+            CREATE TRIGGER IF NOT EXISTS agregados_al_actualizar
+            AFTER UPDATE OF precio, stock, stock_minimo, activo ON productos BEGIN
+                UPDATE agregados SET total_activos = total_activos + NEW.activo - OLD.activo,
+                    valor_total = valor_total + NEW.activo * NEW.precio * NEW.stock - OLD.activo * OLD.precio * OLD.stock,
+                    total_stock_bajo = total_stock_bajo + (NEW.activo = 1 AND NEW.stock <= NEW.stock_minimo)
+                                                        - (OLD.activo = 1 AND OLD.stock <= OLD.stock_minimo);
+            END""",
+    }
+    SQL_RECALCULAR_AGREGADOS = """
+        INSERT OR REPLACE INTO agregados (id, total_productos, total_activos, valor_total, total_stock_bajo)
+        SELECT 1, COUNT(*), COALESCE(SUM(activo), 0), COALESCE(SUM(activo * precio * stock), 0),
+               COALESCE(SUM(activo = 1 AND stock <= stock_minimo), 0)
+        FROM productos"""
+    COLUMNAS = "codigo, nombre, precio, stock, stock_minimo, activo"
+    SQL_INSERTAR_PRODUCTO = f"INSERT INTO productos ({COLUMNAS}) VALUES (?, ?, ?, ?, ?, ?)"
+    SQL_UPSERT_PRODUCTO = SQL_INSERTAR_PRODUCTO + """
+        ON CONFLICT(codigo) DO UPDATE SET nombre = excluded.nombre, precio = excluded.precio,
+            stock = excluded.stock, stock_minimo = excluded.stock_minimo, activo = excluded.activo"""
+    SQL_INSERTAR_MOVIMIENTO = "INSERT INTO movimientos (codigo, tipo, cantidad, fecha) VALUES (?, ?, ?, ?)"
+    
+    def __init__(self, ruta_bd: str = ':memory:'):
+        super().__init__()
+        # La GUI usa la conexión desde un hilo de trabajo mientras la ventana está bloqueada
+        self._conexion = sqlite3.connect(ruta_bd, check_same_thread=False)
+        self._conexion.execute("PRAGMA journal_mode=WAL")
+        self._conexion.execute("PRAGMA synchronous=NORMAL")
+        self._conexion.executescript(self.ESQUEMA)
+        # Mapa de identidad: mientras alguien tenga un Producto, buscar_producto devuelve el mismo objeto
+        self._cargados = weakref.WeakValueDictionary()
+        # Bases anteriores a la tabla de agregados: se calculan una vez
+        with self._conexion:
+            if self._conexion.execute("SELECT 1 FROM agregados").fetchone() is None:
+                self._conexion.execute(self.SQL_RECALCULAR_AGREGADOS)
+            for sql in self.TRIGGERS_AGREGADOS.values():
+                self._conexion.execute(sql)
+        # Las estadísticas de cada producto se leen de la tabla la primera vez que se piden;
+        # tras estadisticas_movimientos están todas en memoria
+        self._estadisticas_completas = False
+    
+    @contextmanager
+    def _carga_masiva(self):
+        """
+        Quita los triggers de agregados mientras dura una carga masiva y recalcula la fila
+        una vez al terminar. Va dentro de la transacción: si la carga falla, el rollback
+        devuelve los triggers.
+        """
+        if not self._conexion.in_transaction:
+            self._conexion.execute("BEGIN")
+        for nombre in self.TRIGGERS_AGREGADOS:
+            self._conexion.execute(f"DROP TRIGGER IF EXISTS {nombre}")
+        yield
+        self._conexion.execute(self.SQL_RECALCULAR_AGREGADOS)
+        for sql in self.TRIGGERS_AGREGADOS.values():
+            self._conexion.execute(sql)
+    
+    def _nombres_catalogo(self) -> Iterator[tuple]:
+        # El índice de nombres vive en memoria (solo códigos y nombres)
+        return self._conexion.execute("SELECT codigo, nombre FROM productos ORDER BY rowid")
+    
+    def _producto_desde_fila(self, fila: tuple) -> Producto:
+        codigo, nombre, precio, stock, stock_minimo, activo = fila
+        producto = self._cargados.get(codigo)
+        if producto is None:
+            producto = Producto(codigo, nombre, precio, stock, stock_minimo)
+            self._cargados[codigo] = producto
+        else:
+            producto._nombre = nombre
+            producto._precio = precio
+            producto._stock = stock
+            producto._stock_minimo = stock_minimo
+        producto._activo = bool(activo)
+        return producto
+    
+    def _consultar_productos(self, condicion: str = "", parametros: tuple = ()) -> Iterator[Producto]:
+        # ORDER BY rowid conserva el orden de registro, como la lista de Inventario
+        cursor = self._conexion.execute(f"SELECT {self.COLUMNAS} FROM productos {condicion} ORDER BY rowid", parametros)
+        return (self._producto_desde_fila(fila) for fila in cursor)
+    
+    @staticmethod
+    def _movimiento_desde_fila(fila: tuple) -> MovimientoInventario:
+        codigo, tipo, cantidad, fecha = fila
+        return MovimientoInventario(codigo, TipoMovimiento(tipo), cantidad, MovimientoInventario.fecha_desde_epoch(fecha))
+    
+    @staticmethod
+    def _fila_producto(producto: Producto) -> tuple:
+        return (producto.codigo, producto.nombre, producto.precio, producto.stock,
+                producto.stock_minimo, int(producto.activo))
+    
+    @property
+    def productos(self) -> List[Producto]:
+        return list(self._consultar_productos())
+    
+    @property
+    def productos_activos(self) -> List[Producto]:
+        return list(self._consultar_productos("WHERE activo = 1"))
+    
+    def pagina_activos(self, inicio: int, cantidad: int) -> List[Producto]:
+        cursor = self._conexion.execute(
+            f"SELECT {self.COLUMNAS} FROM productos WHERE activo = 1 ORDER BY rowid LIMIT ? OFFSET ?", (cantidad, inicio))
+        return [self._producto_desde_fila(fila) for fila in cursor]
+    
+    @property
+    def productos_stock_bajo(self) -> List[Producto]:
+        return list(self._consultar_productos("WHERE activo = 1 AND stock <= stock_minimo"))
+    
+    # Los totales salen de la fila de agregados que mantienen los triggers, sin recorrer productos
+    def _agregado(self, columna: str):
+        return self._conexion.execute(f"SELECT {columna} FROM agregados").fetchone()[0]
+    
+    @property
+    def valor_total(self) -> float:
+        return self._agregado("valor_total")
+    
+    @property
+    def total_activos(self) -> int:
+        return self._agregado("total_activos")
+    
+    @property
+    def total_productos(self) -> int:
+        return self._agregado("total_productos")
+    
+    @property
+    def total_stock_bajo(self) -> int:
+        return self._agregado("total_stock_bajo")
+    
+    def _iterar_productos(self) -> Iterator[Producto]:
+        return self._consultar_productos()
+    
+    def _iterar_movimientos(self) -> Iterator[MovimientoInventario]:
+        cursor = self._conexion.execute("SELECT codigo, tipo, cantidad, fecha FROM movimientos ORDER BY id")
+        return (self._movimiento_desde_fila(fila) for fila in cursor)
+    
+    # Rankings: el orden por valor lo mantiene SQLite en idx_productos_valor (misma expresión y
+    # condición que las consultas); el de déficit recorre solo idx_productos_stock_bajo
+    ORDEN_RANKING = {
+        'valor': ("WHERE activo = 1", "precio * stock DESC, codigo"),
+        'deficit': ("WHERE activo = 1 AND stock <= stock_minimo", "stock - stock_minimo, codigo"),
+    }
+    
+    def _consultar_ranking(self, criterio: str, limite: int = -1, desplazamiento: int = 0) -> Iterator[Producto]:
+        if criterio not in self.ORDEN_RANKING:
+            raise ValueError(f"Criterio de ranking desconocido: '{criterio}' (use 'valor' o 'deficit')")
+        condicion, orden = self.ORDEN_RANKING[criterio]
+        cursor = self._conexion.execute(
+            f"SELECT {self.COLUMNAS} FROM productos {condicion} ORDER BY {orden} LIMIT ? OFFSET ?",
+            (limite, desplazamiento))
+        return (self._producto_desde_fila(fila) for fila in cursor)
+    
+    def top_productos(self, cantidad: int = 10, criterio: str = 'valor') -> List[Producto]:
+        return list(self._consultar_ranking(criterio, cantidad))
+    
+    def pagina_ranking(self, pagina: int = 1, tamano: int = 50, criterio: str = 'valor') -> List[Producto]:
+        if pagina < 1 or tamano <= 0:
+            raise ValueError("La página empieza en 1 y el tamaño debe ser mayor a cero")
+        return list(self._consultar_ranking(criterio, tamano, (pagina - 1) * tamano))
+    
+    def iterar_ranking_valor(self) -> Iterator[Producto]:
+        return self._consultar_ranking('valor')
+    
+    def _valores_activos(self) -> List[tuple]:
+        return self._conexion.execute("SELECT precio * stock, codigo FROM productos WHERE activo = 1").fetchall()
+    
+    def cerrar(self) -> None:
+        self._conexion.close()
+    
+    def usar_diario(self, diario: DiarioInventario) -> int:
+        raise ValueError("InventarioSQLite ya guarda sus datos en disco; no usa diario")
+    
+    def registrar_producto(self, producto: Producto) -> None:
+        try:
+            with self._conexion:
+                self._conexion.execute(self.SQL_INSERTAR_PRODUCTO, self._fila_producto(producto))
+        except sqlite3.IntegrityError:
+            raise ValueError(f"Ya existe un producto con el código '{producto.codigo}'")
+        self._cargados[producto.codigo] = producto
+        self._indice_nombres.agregar(producto.codigo, producto.nombre)
+        self._marcar_cambio(producto.codigo)
+        self._notificar(producto)
+    
+    def _refrescar_cargado(self, codigo: str) -> None:
+        """Relee la copia en memoria del producto, si alguien la tiene, y avisa a los observadores"""
+        if codigo in self._cargados:
+            producto = self._buscar_producto_por_codigo(codigo)
+            if producto:
+                self._notificar(producto)
+    
+    def _registrar_movimiento(self, codigo: str, tipo: TipoMovimiento, cantidad: int,
+                              sql_stock: str, parametros: tuple) -> None:
+        epoch = MovimientoInventario.fecha_a_epoch(datetime.now())
+        with self._conexion:
+            cursor = self._conexion.execute(sql_stock, parametros)
+            if cursor.rowcount == 0:
+                # No se actualizó: o el producto no existe o no alcanza el stock
+                producto = self.buscar_producto(codigo)
+                raise ValueError(f"Stock insuficiente. Disponible: {producto.stock}, Solicitado: {cantidad}")
+            self._conexion.execute(self.SQL_INSERTAR_MOVIMIENTO, (codigo, tipo.value, cantidad, epoch))
+        
+        self._sumar_estadistica(codigo, tipo, cantidad, epoch)
+        self._marcar_cambio(codigo)
+        self._refrescar_cargado(codigo)
+    
+    def entrada_stock(self, codigo: str, cantidad: int) -> None:
+        if cantidad <= 0:
+            raise ValueError("La cantidad debe ser mayor a cero")
+        self._registrar_movimiento(codigo, TipoMovimiento.ENTRADA, cantidad,
+                                   "UPDATE productos SET stock = stock + ? WHERE codigo = ?",
+                                   (cantidad, codigo))
+    
+    def salida_stock(self, codigo: str, cantidad: int) -> None:
+        if cantidad <= 0:
+            raise ValueError("La cantidad debe ser mayor a cero")
+        self._registrar_movimiento(codigo, TipoMovimiento.SALIDA, cantidad,
+                                   "UPDATE productos SET stock = stock - ? WHERE codigo = ? AND stock >= ?",
+                                   (cantidad, codigo, cantidad))
+    
+    def _stocks_de(self, codigos: Iterable[str]) -> Dict[str, int]:
+        return dict(self._conexion.execute(
+            "SELECT codigo, stock FROM productos WHERE codigo IN (SELECT value FROM json_each(?))",
+            (json.dumps(list(codigos)),)))
+    
+    def _aplicar_movimientos(self, aceptados: List[tuple], netos: Dict[str, int], fecha: datetime) -> None:
+        # Un UPDATE por producto y todos los movimientos con executemany, en una sola transacción
+        epoch = MovimientoInventario.fecha_a_epoch(fecha)
+        with self._conexion:
+            self._conexion.executemany("UPDATE productos SET stock = stock + ? WHERE codigo = ?",
+                                       ((neto, codigo) for codigo, neto in netos.items()))
+            self._conexion.executemany(self.SQL_INSERTAR_MOVIMIENTO,
+                                       ((codigo, tipo.value, cantidad, epoch) for _, codigo, tipo, cantidad in aceptados))
+        self._sumar_estadisticas_lote(aceptados, epoch)
+        for codigo in netos:
+            self._marcar_cambio(codigo)
+            self._refrescar_cargado(codigo)
+    
+    def _actualizar_columna(self, codigo: str, columna: str, valor) -> None:
+        with self._conexion:
+            cursor = self._conexion.execute(f"UPDATE productos SET {columna} = ? WHERE codigo = ?", (valor, codigo))
+        if cursor.rowcount == 0:
+            raise ValueError(f"Producto con código '{codigo}' no encontrado")
+        self._marcar_cambio(codigo)
+        self._refrescar_cargado(codigo)
+    
+    def actualizar_precio(self, codigo: str, nuevo_precio: float) -> None:
+        if nuevo_precio < 0:
+            raise ValueError("El precio no puede ser negativo")
+        self._actualizar_columna(codigo, 'precio', nuevo_precio)
+    
+    def cambiar_estado(self, codigo: str, activo: bool) -> None:
+        self._actualizar_columna(codigo, 'activo', int(activo))
+    
+    def _buscar_producto_por_codigo(self, codigo: str) -> Optional[Producto]:
+        return next(self._consultar_productos("WHERE codigo = ?", (codigo,)), None)
+    
+    def _productos_por_codigos(self, codigos: List[str]) -> List[Producto]:
+        # Una sola consulta; el resultado conserva el orden de relevancia de los códigos
+        productos = {p.codigo: p for p in self._consultar_productos(
+            "WHERE codigo IN (SELECT value FROM json_each(?))", (json.dumps(codigos),))}
+        return [productos[codigo] for codigo in codigos]
+    
+    def _agregar_producto(self, producto: Producto) -> None:
+        with self._conexion:
+            self._conexion.execute(self.SQL_INSERTAR_PRODUCTO, self._fila_producto(producto))
+        self._cargados[producto.codigo] = producto
+        self._indice_nombres.agregar(producto.codigo, producto.nombre)
+        self._marcar_cambio(producto.codigo)
+        self._notificar(producto)
+    
+    def _borrar_productos(self) -> None:
+        """DELETE de todos los productos, dejando sus lápidas en el registro de cambios"""
+        for (codigo,) in self._conexion.execute("SELECT codigo FROM productos"):
+            self._marcar_cambio(codigo)
+        self._conexion.execute("DELETE FROM productos")
+    
+    def _limpiar_productos(self) -> None:
+        with self._conexion:
+            self._borrar_productos()
+        self._cargados.clear()
+        self._indice_nombres.limpiar()
+        self._notificar(None)
+    
+    def _agregar_movimiento(self, movimiento: MovimientoInventario) -> None:
+        epoch = MovimientoInventario.fecha_a_epoch(movimiento.fecha)
+        with self._conexion:
+            self._conexion.execute(self.SQL_INSERTAR_MOVIMIENTO, (
+                movimiento.producto_codigo, movimiento.tipo.value, movimiento.cantidad, epoch))
+        self._sumar_estadistica(movimiento.producto_codigo, movimiento.tipo, movimiento.cantidad, epoch)
+    
+    # Solo se suman los movimientos de productos cuyas estadísticas ya están en memoria;
+    # los demás quedan en la tabla y se leen cuando se piden
+    def _sumar_estadistica(self, codigo: str, tipo: TipoMovimiento, cantidad: int, epoch: int) -> None:
+        if self._estadisticas_completas or codigo in self._estadisticas:
+            super()._sumar_estadistica(codigo, tipo, cantidad, epoch)
+    
+    def _sumar_estadisticas_lote(self, aceptados: List[tuple], epoch: int) -> None:
+        if not self._estadisticas_completas:
+            aceptados = [fila for fila in aceptados if fila[1] in self._estadisticas]
+        super()._sumar_estadisticas_lote(aceptados, epoch)
+    
+    def _leer_estadisticas(self, condicion: str = "", parametros: tuple = ()) -> None:
+        """Calcula desde la tabla las estadísticas de los productos que aún no están en memoria"""
+        tipos = {tipo.value: tipo for tipo in TipoMovimiento}
+        nuevas: Dict[str, EstadisticasProducto] = {}
+        cursor = self._conexion.execute(
+            f"SELECT codigo, tipo, cantidad, fecha FROM movimientos {condicion} ORDER BY fecha, id", parametros)
+        for codigo, tipo, cantidad, fecha in cursor:
+            if codigo in self._estadisticas:
+                continue
+            estadisticas = nuevas.get(codigo)
+            if estadisticas is None:
+                estadisticas = nuevas[codigo] = EstadisticasProducto()
+            estadisticas.registrar(tipos[tipo], cantidad, fecha)
+        self._estadisticas.update(nuevas)
+    
+    def estadisticas_producto(self, codigo: str, ahora: Optional[datetime] = None) -> Optional[dict]:
+        if not self._estadisticas_completas and codigo not in self._estadisticas:
+            # idx_movimientos_codigo_fecha: solo las filas del producto, ya en orden
+            self._leer_estadisticas("WHERE codigo = ?", (codigo,))
+        return super().estadisticas_producto(codigo, ahora)
+    
+    def estadisticas_movimientos(self, ahora: Optional[datetime] = None) -> Dict[str, dict]:
+        if not self._estadisticas_completas:
+            self._leer_estadisticas()
+            self._estadisticas_completas = True
+        return super().estadisticas_movimientos(ahora)
+    
+    # Orden por fecha (y por id a igual fecha), como el índice de Inventario; los índices
+    # idx_movimientos_fecha e idx_movimientos_codigo_fecha evitan ordenar la tabla
+    def obtener_historial(self, ultimos: int = 20) -> List[MovimientoInventario]:
+        cursor = self._conexion.execute(
+            "SELECT codigo, tipo, cantidad, fecha FROM movimientos ORDER BY fecha DESC, id DESC LIMIT ?", (ultimos,))
+        return [self._movimiento_desde_fila(fila) for fila in reversed(cursor.fetchall())]
+    
+    def historial_producto(self, codigo: str, ultimos: Optional[int] = None) -> List[MovimientoInventario]:
+        cursor = self._conexion.execute(
+            "SELECT codigo, tipo, cantidad, fecha FROM movimientos WHERE codigo = ? "
+            "ORDER BY fecha DESC, id DESC LIMIT ?",
+            (codigo, ultimos if ultimos else -1))
+        return [self._movimiento_desde_fila(fila) for fila in reversed(cursor.fetchall())]
+    
+    def movimientos_entre(self, desde: Optional[datetime] = None, hasta: Optional[datetime] = None,
+                          codigo: Optional[str] = None) -> List[MovimientoInventario]:
+        condiciones = []
+        parametros = []
+        if codigo is not None:
+            condiciones.append("codigo = ?")
+            parametros.append(codigo)
+        if desde:
+            condiciones.append("fecha >= ?")
+            parametros.append(MovimientoInventario.fecha_a_epoch(desde))
+        if hasta:
+            condiciones.append("fecha <= ?")
+            parametros.append(MovimientoInventario.fecha_a_epoch(hasta))
+        condicion = "WHERE " + " AND ".join(condiciones) if condiciones else ""
+        cursor = self._conexion.execute(
+            f"SELECT codigo, tipo, cantidad, fecha FROM movimientos {condicion} ORDER BY fecha, id", parametros)
+        return [self._movimiento_desde_fila(fila) for fila in cursor]
+    
+    def _cargar_lote(self, filas: List[tuple], modo_importacion: str) -> tuple[int, int]:
+        """Inserta o actualiza un lote de filas de productos con executemany; devuelve (nuevos, actualizados)"""
+        # En 'reemplazar' los códigos repetidos se omiten, como en Inventario; 'nuevos' nunca actualiza
+        solo_nuevos = modo_importacion in ('reemplazar', 'nuevos')
+        sql = self.SQL_INSERTAR_PRODUCTO + " ON CONFLICT(codigo) DO NOTHING" if solo_nuevos else self.SQL_UPSERT_PRODUCTO
+        
+        # Una sola consulta por lote para saber qué códigos ya existían y con qué datos
+        existentes = {fila[0]: fila for fila in self._conexion.execute(
+            f"SELECT {self.COLUMNAS} FROM productos WHERE codigo IN (SELECT value FROM json_each(?))",
+            (json.dumps([fila[0] for fila in filas]),))}
+        nuevos = 0
+        actualizados = 0
+        # Solo se escriben las filas nuevas o que cambian algo; las idénticas no se tocan
+        a_escribir = []
+        for fila in filas:
+            actual = existentes.get(fila[0])
+            if actual is not None:
+                if solo_nuevos or actual == fila:
+                    continue
+                actualizados += 1
+            else:
+                nuevos += 1
+            existentes[fila[0]] = fila
+            a_escribir.append(fila)
+            self._indice_nombres.agregar(fila[0], fila[1])
+            self._marcar_cambio(fila[0])
+        self._conexion.executemany(sql, a_escribir)
+        return nuevos, actualizados
+    
+    def _incorporar_filas_csv(self, filas: List[tuple], modo_importacion: str) -> tuple[int, int]:
+        return self._cargar_lote([(codigo, nombre, precio, stock, stock_minimo, int(activo))
+                                  for codigo, nombre, precio, stock, stock_minimo, activo in filas], modo_importacion)
+    
+    def importar_csv_paralelo(self, ruta_archivo: str, modo_importacion: str = 'agregar',
+                              procesos: Optional[int] = None, ruta_errores: Optional[str] = None,
+                              callback_progreso: Optional[Callable[[int, int, int, int], None]] = None) -> tuple[int, int]:
+        marca = self.marca_cambios
+        # Todo en una sola transacción, como importar_csv
+        with self._conexion, self._carga_masiva():
+            resultado = super().importar_csv_paralelo(ruta_archivo, modo_importacion, procesos,
+                                                      ruta_errores, callback_progreso)
+        self._refrescar_todos_cargados(marca)
+        return resultado
+    
+    def _refrescar_todos_cargados(self, marca: int) -> None:
+        """
+        Las copias en memoria pueden haber quedado desactualizadas tras una carga masiva.
+        Si no hubo cambios desde `marca` (todas las filas eran iguales) no se toca nada.
+        """
+        if self.marca_cambios == marca:
+            return
+        for codigo in list(self._cargados.keys()):
+            if self._buscar_producto_por_codigo(codigo) is None:
+                self._cargados.pop(codigo, None)
+        self._notificar(None)
+    
+    def _incorporar_producto(self, codigo: str, nombre: str, precio: float, stock: int, stock_minimo: int,
+                             activo: bool, actualizar_existentes: bool) -> Optional[bool]:
+        # Se construye el Producto solo para validar los datos
+        Producto(codigo, nombre, precio, stock, stock_minimo)
+        with self._conexion:
+            nuevos, actualizados = self._cargar_lote([(codigo, nombre, precio, stock, stock_minimo, int(activo))],
+                                                     'actualizar' if actualizar_existentes else 'nuevos')
+        if not (nuevos or actualizados):
+            return None
+        self._refrescar_cargado(codigo)
+        return True if nuevos else False
+    
+    def fusionar(self, otro: Inventario, modo_importacion: str = 'agregar',
+                 incluir_movimientos: bool = False) -> tuple[int, int]:
+        productos_importados = 0
+        productos_actualizados = 0
+        marca = self.marca_cambios
+        
+        with self._conexion, self._carga_masiva():
+            if modo_importacion == 'reemplazar':
+                self._borrar_productos()
+                self._cargados.clear()
+                self._indice_nombres.limpiar()
+            
+            filas = (self._fila_producto(p) for p in otro._iterar_productos())
+            for lote in iter(lambda: list(islice(filas, 10000)), []):
+                nuevos, actualizados = self._cargar_lote(lote, modo_importacion)
+                productos_importados += nuevos
+                productos_actualizados += actualizados
+            
+            if incluir_movimientos:
+                self._conexion.executemany(self.SQL_INSERTAR_MOVIMIENTO, (
+                    (m.producto_codigo, m.tipo.value, m.cantidad, MovimientoInventario.fecha_a_epoch(m.fecha))
+                    for m in otro._iterar_movimientos()))
+        
+        self._refrescar_todos_cargados(marca)
+        return productos_importados, productos_actualizados
+    
+    def importar_csv(self, ruta_archivo: str, modo_importacion: str = 'agregar',
+                     tamano_lote: int = 10000, ruta_errores: Optional[str] = None,
+                     callback_progreso: Optional[Callable[[int, int, int, int], None]] = None) -> tuple[int, int]:
+        """
+        Importa productos desde CSV con executemany por lotes, en una sola transacción.
+        Mismos modos, archivo de errores y callback que Inventario.importar_csv.
+        """
+        if tamano_lote <= 0:
+            raise ValueError("El tamaño de lote debe ser mayor a cero")
+        
+        productos_importados = 0
+        productos_actualizados = 0
+        filas_procesadas = 0
+        errores = 0
+        archivo_errores = None
+        marca = self.marca_cambios
+        
+        try:
+            with open(ruta_archivo, 'r', newline='', encoding='utf-8') as archivo, self._conexion:
+                lector = csv.reader(archivo)
+                encabezado = next(lector, None)
+                if encabezado is None:
+                    return 0, 0
+                convertir = self._compilar_conversor_csv(encabezado)
+                
+                if ruta_errores:
+                    archivo_errores = open(ruta_errores, 'w', newline='', encoding='utf-8')
+                    escritor_errores = csv.writer(archivo_errores)
+                    escritor_errores.writerow(['fila', 'campo', 'motivo'] + encabezado)
+                
+                with self._carga_masiva():
+                    if modo_importacion == 'reemplazar':
+                        self._borrar_productos()
+                        self._cargados.clear()
+                        self._indice_nombres.limpiar()
+                    
+                    for lote in iter(lambda: list(islice(lector, tamano_lote)), []):
+                        filas_validas = []
+                        for fila in lote:
+                            filas_procesadas += 1
+                            if not fila:
+                                continue
+                            try:
+                                codigo, nombre, precio, stock, stock_minimo, activo = convertir(fila)
+                            except ErrorFilaCSV as e:
+                                errores += 1
+                                if archivo_errores:
+                                    escritor_errores.writerow([filas_procesadas + 1, e.campo, e.motivo] + fila)
+                                continue
+                            filas_validas.append((codigo, nombre, precio, stock, stock_minimo, int(activo)))
+                        
+                        nuevos, actualizados = self._cargar_lote(filas_validas, modo_importacion)
+                        productos_importados += nuevos
+                        productos_actualizados += actualizados
+                        
+                        if callback_progreso:
+                            callback_progreso(filas_procesadas, productos_importados, productos_actualizados, errores)
+                        
+        except FileNotFoundError:
+            raise Exception(f"Archivo no encontrado: {ruta_archivo}")
+        except Exception as e:
+            raise Exception(f"Error al importar CSV: {str(e)}")
+        finally:
+            if archivo_errores:
+                archivo_errores.close()
+        
+        if not ruta_errores:
+            self._avisar_rechazadas(ruta_archivo, errores)
+        self._refrescar_todos_cargados(marca)
+        return productos_importados, productos_actualizados
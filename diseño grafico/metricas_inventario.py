@@ -0,0 +1,174 @@
+from typing import Callable, Dict, Iterable
+import os
+import threading
+import functools
+import math
+import time
+from contextlib import contextmanager
+from bisect import bisect_left
+
+# -------------------------------
+# Métricas de operaciones (opcionales)
+# -------------------------------
+class HistogramaLatencias:
+    """
+    Histograma de latencias con cubetas logarítmico-lineales (al estilo HDR): cada
+    potencia de dos entre 64 ns y ~68 s se divide en `SUBCUBETAS` partes iguales, así
+    el error relativo de cualquier valor es como mucho 1/SUBCUBETAS.
+    """
+    SUBCUBETAS = 4
+    # Límites superiores en nanosegundos, compartidos por todos los histogramas (4 = SUBCUBETAS)
+    LIMITES_NS = [64] + [(1 << exponente) + (1 << exponente) * i // 4
+                         for exponente in range(6, 36) for i in range(1, 5)]
+    
+    __slots__ = ('cuentas', 'total', 'suma_ns', 'maximo_ns')
+    
+    def __init__(self):
+        # Una cubeta más para lo que supera el último límite
+        self.cuentas = [0] * (len(self.LIMITES_NS) + 1)
+        self.total = 0
+        self.suma_ns = 0
+        self.maximo_ns = 0
+    
+    def registrar(self, duracion_ns: int) -> None:
+        self.cuentas[bisect_left(self.LIMITES_NS, duracion_ns)] += 1
+        self.total += 1
+        self.suma_ns += duracion_ns
+        if duracion_ns > self.maximo_ns:
+            self.maximo_ns = duracion_ns
+    
+    def percentil(self, p: float) -> int:
+        """Límite superior (ns) de la cubeta donde cae el percentil p (0-100)"""
+        if not self.total:
+            return 0
+        objetivo = max(1, math.ceil(self.total * p / 100))
+        acumulado = 0
+        for i, cuenta in enumerate(self.cuentas):
+            acumulado += cuenta
+            if acumulado >= objetivo:
+                return min(self.LIMITES_NS[i], self.maximo_ns) if i < len(self.LIMITES_NS) else self.maximo_ns
+        return self.maximo_ns
+
+class MetricasInventario:
+    """
+    Llamadas, errores y latencias por operación. instrumentar() envuelve los métodos de un
+    objeto; sin instrumentar no cuesta nada. Se exporta en formato de texto de Prometheus.
+    """
+    
+    def __init__(self, prefijo: str = 'technova'):
+        self.prefijo = prefijo
+        self._llamadas: Dict[str, int] = {}
+        self._errores: Dict[str, int] = {}
+        self._latencias: Dict[str, HistogramaLatencias] = {}
+        self._lock = threading.Lock()
+    
+    def registrar(self, operacion: str, duracion_ns: int, error: bool = False) -> None:
+        with self._lock:
+            self._llamadas[operacion] = self._llamadas.get(operacion, 0) + 1
+            if error:
+                self._errores[operacion] = self._errores.get(operacion, 0) + 1
+            histograma = self._latencias.get(operacion)
+            if histograma is None:
+                histograma = self._latencias[operacion] = HistogramaLatencias()
+            histograma.registrar(duracion_ns)
+    
+    @contextmanager
+    def medir(self, operacion: str):
+        """Mide el bloque; si lanza una excepción, cuenta además un error"""
+        inicio = time.perf_counter_ns()
+        try:
+            yield
+        except BaseException:
+            self.registrar(operacion, time.perf_counter_ns() - inicio, True)
+            raise
+        self.registrar(operacion, time.perf_counter_ns() - inicio)
+    
+    def envolver(self, operacion: str, funcion: Callable) -> Callable:
+        registrar = self.registrar
+        reloj = time.perf_counter_ns
+        
+        @functools.wraps(funcion)
+        def medida(*args, **kwargs):
+            inicio = reloj()
+            try:
+                resultado = funcion(*args, **kwargs)
+            except BaseException:
+                registrar(operacion, reloj() - inicio, True)
+                raise
+            registrar(operacion, reloj() - inicio)
+            return resultado
+        
+        medida.__wrapped_metricas__ = True
+        return medida
+    
+    def instrumentar(self, objeto, nombres: Iterable[str], prefijo_operacion: str = '') -> None:
+        """Reemplaza en `objeto` cada método de `nombres` por su versión medida"""
+        for nombre in nombres:
+            metodo = getattr(objeto, nombre)
+            if getattr(metodo, '__wrapped_metricas__', False):
+                continue
+            setattr(objeto, nombre, self.envolver(prefijo_operacion + nombre, metodo))
+    
+    @staticmethod
+    def desinstrumentar(objeto, nombres: Iterable[str]) -> None:
+        for nombre in nombres:
+            if getattr(getattr(objeto, nombre, None), '__wrapped_metricas__', False):
+                delattr(objeto, nombre)
+    
+    def reiniciar(self) -> None:
+        with self._lock:
+            self._llamadas.clear()
+            self._errores.clear()
+            self._latencias.clear()
+    
+    def instantanea(self) -> Dict[str, dict]:
+        """{operacion: {llamadas, errores, total_s, media_us, p50_us, p90_us, p99_us, max_us}}"""
+        with self._lock:
+            resultado = {}
+            for operacion, histograma in sorted(self._latencias.items()):
+                resultado[operacion] = {
+                    'llamadas': self._llamadas[operacion],
+                    'errores': self._errores.get(operacion, 0),
+                    'total_s': histograma.suma_ns / 1e9,
+                    'media_us': histograma.suma_ns / histograma.total / 1000,
+                    'p50_us': histograma.percentil(50) / 1000,
+                    'p90_us': histograma.percentil(90) / 1000,
+                    'p99_us': histograma.percentil(99) / 1000,
+                    'max_us': histograma.maximo_ns / 1000,
+                }
+            return resultado
+    
+    def texto_prometheus(self) -> str:
+        """Métricas en el formato de texto de Prometheus (histograma en segundos por operación)"""
+        nombre = f"{self.prefijo}_operacion"
+        lineas = [
+            f"# HELP {nombre}_llamadas_total Llamadas por operación",
+            f"# TYPE {nombre}_llamadas_total counter",
+        ]
+        with self._lock:
+            operaciones = sorted(self._latencias)
+            for operacion in operaciones:
+                lineas.append(f'{nombre}_llamadas_total{{operacion="{operacion}"}} {self._llamadas[operacion]}')
+            lineas.append(f"# HELP {nombre}_errores_total Llamadas que terminaron en excepción")
+            lineas.append(f"# TYPE {nombre}_errores_total counter")
+            for operacion in operaciones:
+                lineas.append(f'{nombre}_errores_total{{operacion="{operacion}"}} {self._errores.get(operacion, 0)}')
+            lineas.append(f"# HELP {nombre}_segundos Latencia por operación")
+            lineas.append(f"# TYPE {nombre}_segundos histogram")
+            for operacion in operaciones:
+                histograma = self._latencias[operacion]
+                acumulado = 0
+                for limite, cuenta in zip(HistogramaLatencias.LIMITES_NS, histograma.cuentas):
+                    acumulado += cuenta
+                    lineas.append(f'{nombre}_segundos_bucket{{operacion="{operacion}",le="{limite / 1e9:.9g}"}} {acumulado}')
+                lineas.append(f'{nombre}_segundos_bucket{{operacion="{operacion}",le="+Inf"}} {histograma.total}')
+                lineas.append(f'{nombre}_segundos_sum{{operacion="{operacion}"}} {histograma.suma_ns / 1e9:.9f}')
+                lineas.append(f'{nombre}_segundos_count{{operacion="{operacion}"}} {histograma.total}')
+        return '\n'.join(lineas) + '\n'
+    
+    def exportar_prometheus(self, ruta_archivo: str) -> None:
+        """Escribe el texto de Prometheus de forma atómica (útil para el textfile collector de node_exporter)"""
+        ruta_temporal = ruta_archivo + '.tmp'
+        with open(ruta_temporal, 'w', encoding='utf-8') as archivo:
+            archivo.write(self.texto_prometheus())
+        os.replace(ruta_temporal, ruta_archivo)
@@ -0,0 +1,134 @@
+from datetime import datetime
+from typing import Optional
+from enum import Enum
+
+# -------------------------------
+# Enumeración para tipos de movimiento
+# -------------------------------
+class TipoMovimiento(Enum):
+    ENTRADA = "Entrada"
+    SALIDA = "Salida"
+
+# -------------------------------
+# Clase para registrar movimientos de inventario
+# -------------------------------
+class MovimientoInventario:
+    __slots__ = ('producto_codigo', 'tipo', 'cantidad', 'fecha')
+    
+    def __init__(self, producto_codigo: str, tipo: TipoMovimiento, cantidad: int, fecha: Optional[datetime] = None):
+        self.producto_codigo = producto_codigo
+        self.tipo = tipo
+        self.cantidad = cantidad
+        self.fecha = fecha or datetime.now()
+    
+    def __str__(self):
+        return f"[{self.fecha.strftime('%Y-%m-%d %H:%M')}] {self.tipo.value}: {self.cantidad} unidades - Producto: {self.producto_codigo}"
+    
+    @staticmethod
+    def fecha_a_epoch(fecha: datetime) -> int:
+        """Convierte una fecha local a microsegundos desde epoch"""
+        return round(fecha.timestamp() * 1_000_000)
+    
+    @staticmethod
+    def fecha_desde_epoch(epoch_us: int) -> datetime:
+        segundos, microsegundos = divmod(epoch_us, 1_000_000)
+        return datetime.fromtimestamp(segundos).replace(microsecond=microsegundos)
+    
+    def to_dict(self):
+        return {
+            'producto_codigo': self.producto_codigo,
+            'tipo': self.tipo.value,
+            'cantidad': self.cantidad,
+            'fecha': self.fecha.strftime('%Y-%m-%d %H:%M:%S')
+        }
+
+# -------------------------------
+# Clase base Producto
+# -------------------------------
+class Producto:
+    __slots__ = ('_codigo', '_nombre', '_precio', '_stock', '_stock_minimo', '_activo', '__weakref__')
+    
+    STOCK_MINIMO_DEFAULT = 5
+    
+    def __init__(self, codigo: str, nombre: str, precio: float, stock: int = 0, stock_minimo: int = STOCK_MINIMO_DEFAULT):
+        self._validar_datos(codigo, nombre, precio, stock, stock_minimo)
+        self._codigo = codigo
+        self._nombre = nombre
+        self._precio = precio
+        self._stock = stock
+        self._stock_minimo = stock_minimo
+        self._activo = True
+    
+    @staticmethod
+    def _validar_datos(codigo: str, nombre: str, precio: float, stock: int, stock_minimo: int):
+        if not codigo or not codigo.strip():
+            raise ValueError("El código no puede estar vacío")
+        if not nombre or not nombre.strip():
+            raise ValueError("El nombre no puede estar vacío")
+        if precio < 0:
+            raise ValueError("El precio no puede ser negativo")
+        if stock < 0:
+            raise ValueError("El stock no puede ser negativo")
+        if stock_minimo < 0:
+            raise ValueError("El stock mínimo no puede ser negativo")
+    
+    @property
+    def codigo(self) -> str:
+        return self._codigo
+    
+    @property
+    def nombre(self) -> str:
+        return self._nombre
+    
+    @property
+    def precio(self) -> float:
+        return self._precio
+    
+    @precio.setter
+    def precio(self, nuevo_precio: float):
+        if nuevo_precio < 0:
+            raise ValueError("El precio no puede ser negativo")
+        self._precio = nuevo_precio
+    
+    @property
+    def stock(self) -> int:
+        return self._stock
+    
+    @stock.setter
+    def stock(self, cantidad: int):
+        if cantidad < 0:
+            raise ValueError("El stock no puede ser negativo")
+        self._stock = cantidad
+    
+    @property
+    def stock_minimo(self) -> int:
+        return self._stock_minimo
+    
+    @property
+    def activo(self) -> bool:
+        return self._activo
+    
+    def tiene_stock_bajo(self) -> bool:
+        return self._stock <= self._stock_minimo
+    
+    def to_dict(self):
+        return {
+            'codigo': self._codigo,
+            'nombre': self._nombre,
+            'precio': self._precio,
+            'stock': self._stock,
+            'stock_minimo': self._stock_minimo,
+            'activo': self._activo
+        }
+    
+    @classmethod
+    def from_dict(cls, data: dict):
+        producto = cls(
+            codigo=data['codigo'],
+            nombre=data['nombre'],
+            precio=float(data['precio']),
+            stock=int(data['stock']),
+            stock_minimo=int(data['stock_minimo'])
+        )
+        producto._activo = bool(data['activo'])
+        return producto
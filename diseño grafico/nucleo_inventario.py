@@ -0,0 +1,1774 @@
+from abc import ABC, abstractmethod
+from datetime import datetime
+from typing import Callable, Dict, Iterable, Iterator, List, Optional
+import csv
+import os
+import json
+import multiprocessing
+import struct
+import math
+from itertools import chain, islice
+from collections import defaultdict, deque
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from array import array
+from bisect import bisect_left, bisect_right
+import heapq
+
+from conversion_csv import ErrorFilaCSV, compilar_conversor_csv, convertir_trozo_csv
+from indice_nombres import IndiceNombresDiferido
+from modelo_inventario import TipoMovimiento, MovimientoInventario, Producto
+from rankings_inventario import ListaOrdenada, clasificar_abc
+from instantanea_binaria import InstantaneaBinaria
+from diario_inventario import DiarioInventario
+from metricas_inventario import MetricasInventario
+
+# -------------------------------
+# Historial compacto de movimientos (columnas en arrays)
+# -------------------------------
+class HistorialCompacto:
+    """
+    Guarda los movimientos como columnas: id entero del código (internado),
+    tipo como byte, cantidad y fecha como epoch en microsegundos (int64).
+    Se comporta como una lista de MovimientoInventario de solo anexar.
+    """
+    _TIPOS = list(TipoMovimiento)
+    _ID_TIPO = {tipo: i for i, tipo in enumerate(_TIPOS)}
+    
+    def __init__(self, movimientos: Iterable[MovimientoInventario] = ()):
+        self._codigos: List[str] = []
+        self._id_por_codigo: Dict[str, int] = {}
+        self._ids = array('i')
+        self._tipos = array('b')
+        self._cantidades = array('q')
+        self._fechas = array('q')
+        for movimiento in movimientos:
+            self.append(movimiento)
+    
+    def _id_codigo(self, codigo: str) -> int:
+        id_codigo = self._id_por_codigo.get(codigo)
+        if id_codigo is None:
+            id_codigo = len(self._codigos)
+            self._codigos.append(codigo)
+            self._id_por_codigo[codigo] = id_codigo
+        return id_codigo
+    
+    def append(self, movimiento: MovimientoInventario) -> None:
+        self._ids.append(self._id_codigo(movimiento.producto_codigo))
+        self._tipos.append(self._ID_TIPO[movimiento.tipo])
+        self._cantidades.append(movimiento.cantidad)
+        self._fechas.append(MovimientoInventario.fecha_a_epoch(movimiento.fecha))
+    
+    def extend(self, movimientos: Iterable[MovimientoInventario]) -> None:
+        for movimiento in movimientos:
+            self.append(movimiento)
+    
+    def clear(self) -> None:
+        self.__init__()
+    
+    def _materializar(self, i: int) -> MovimientoInventario:
+        return MovimientoInventario(self._codigos[self._ids[i]], self._TIPOS[self._tipos[i]], self._cantidades[i],
+                                    MovimientoInventario.fecha_desde_epoch(self._fechas[i]))
+    
+    def __len__(self) -> int:
+        return len(self._ids)
+    
+    def __getitem__(self, indice):
+        if isinstance(indice, slice):
+            return [self._materializar(i) for i in range(*indice.indices(len(self)))]
+        if indice < 0:
+            indice += len(self)
+        if not 0 <= indice < len(self):
+            raise IndexError("Índice de movimiento fuera de rango")
+        return self._materializar(indice)
+    
+    def __iter__(self) -> Iterator[MovimientoInventario]:
+        for i in range(len(self)):
+            yield self._materializar(i)
+
+    # Archivo binario de las columnas, para la instantánea del diario (orden de bytes de la máquina)
+    MAGIA = b'TNVHISTO'
+    VERSION = 1
+    # magia, versión, movimientos, códigos, bytes de los códigos
+    CABECERA = struct.Struct('=8sI4x3q')
+
+    def escribir(self, ruta_archivo: str) -> None:
+        """Guarda las columnas de forma atómica (archivo temporal y reemplazo)"""
+        texto = bytearray()
+        desplazamientos = array('Q', [0])
+        for codigo in self._codigos:
+            texto += codigo.encode('utf-8')
+            desplazamientos.append(len(texto))
+        ruta_temporal = ruta_archivo + '.tmp'
+        with open(ruta_temporal, 'wb') as archivo:
+            archivo.write(self.CABECERA.pack(self.MAGIA, self.VERSION, len(self), len(self._codigos), len(texto)))
+            for columna in (self._ids, self._tipos, self._cantidades, self._fechas, desplazamientos):
+                archivo.write(columna.tobytes())
+            archivo.write(texto)
+            archivo.flush()
+            os.fsync(archivo.fileno())
+        os.replace(ruta_temporal, ruta_archivo)
+
+    @classmethod
+    def leer(cls, ruta_archivo: str) -> 'HistorialCompacto':
+        """Carga un historial guardado con escribir: las columnas se copian enteras, sin armar movimientos"""
+        with open(ruta_archivo, 'rb') as archivo:
+            datos = archivo.read()
+        if len(datos) < cls.CABECERA.size:
+            raise ValueError(f"Historial incompleto: {ruta_archivo}")
+        magia, version, cantidad, total_codigos, bytes_texto = cls.CABECERA.unpack_from(datos)
+        if magia != cls.MAGIA or version != cls.VERSION:
+            raise ValueError(f"{ruta_archivo} no es un historial de movimientos (versión {cls.VERSION})")
+        historial = cls()
+        posicion = cls.CABECERA.size
+        columnas = []
+        for columna, largo in ((historial._ids, cantidad), (historial._tipos, cantidad),
+                               (historial._cantidades, cantidad), (historial._fechas, cantidad),
+                               (array('Q'), total_codigos + 1)):
+            fin = posicion + largo * columna.itemsize
+            columna.frombytes(datos[posicion:fin])
+            columnas.append(columna)
+            posicion = fin
+        if posicion + bytes_texto != len(datos) or any(len(columna) != cantidad for columna in columnas[:4]):
+            raise ValueError(f"Historial incompleto: {ruta_archivo}")
+        desplazamientos = columnas[4]
+        historial._codigos = [str(datos[posicion + desplazamientos[i]:posicion + desplazamientos[i + 1]], 'utf-8')
+                              for i in range(total_codigos)]
+        historial._id_por_codigo = {codigo: i for i, codigo in enumerate(historial._codigos)}
+        return historial
+
+# -------------------------------
+# Índices por fecha y por producto sobre el historial
+# -------------------------------
+class IndiceMovimientos:
+    """
+    Posiciones del historial ordenadas por fecha (epoch en µs), en general y por producto.
+    Los movimientos que llegan fuera de orden se mezclan todos juntos en la siguiente consulta.
+    """
+    
+    def __init__(self):
+        self._fechas = array('q')
+        self._posiciones = array('q')
+        self._por_producto: Dict[str, tuple] = {}
+        # (epoch, posición, código) de los que llegaron fuera de orden, aún sin mezclar
+        self._pendientes: List[tuple] = []
+    
+    def agregar(self, posicion: int, codigo: str, epoch: int) -> None:
+        fechas = self._fechas
+        if fechas and fechas[-1] > epoch:
+            self._pendientes.append((epoch, posicion, codigo))
+            return
+        fechas.append(epoch)
+        self._posiciones.append(posicion)
+        columnas = self._por_producto.get(codigo)
+        if columnas is None:
+            columnas = self._por_producto[codigo] = (array('q'), array('q'))
+        columnas[0].append(epoch)
+        columnas[1].append(posicion)
+    
+    @staticmethod
+    def _mezclar(fechas: array, posiciones: array, pendientes: List[tuple]) -> None:
+        # Las posiciones crecen con el orden de llegada, así que (fecha, posición) es el orden
+        # del índice: solo se rehace la cola desde la fecha del pendiente más antiguo
+        inicio = bisect_right(fechas, pendientes[0][0])
+        cola = list(heapq.merge(zip(fechas[inicio:], posiciones[inicio:]), pendientes))
+        del fechas[inicio:], posiciones[inicio:]
+        fechas.extend(epoch for epoch, _ in cola)
+        posiciones.extend(posicion for _, posicion in cola)
+    
+    def mezclar_pendientes(self) -> None:
+        pendientes = self._pendientes
+        if not pendientes:
+            return
+        pendientes.sort()
+        por_producto: Dict[str, List[tuple]] = defaultdict(list)
+        for epoch, posicion, codigo in pendientes:
+            por_producto[codigo].append((epoch, posicion))
+        self._mezclar(self._fechas, self._posiciones, [(epoch, posicion) for epoch, posicion, _ in pendientes])
+        for codigo, lista in por_producto.items():
+            columnas = self._por_producto.get(codigo)
+            if columnas is None:
+                columnas = self._por_producto[codigo] = (array('q'), array('q'))
+            self._mezclar(columnas[0], columnas[1], lista)
+        pendientes.clear()
+    
+    def limpiar(self) -> None:
+        self.__init__()
+    
+    def posiciones(self, codigo: Optional[str] = None, desde: Optional[datetime] = None,
+                   hasta: Optional[datetime] = None, ultimos: Optional[int] = None) -> array:
+        """Posiciones en orden de fecha, con desde <= fecha <= hasta; con `ultimos`, solo las más recientes"""
+        self.mezclar_pendientes()
+        if codigo is None:
+            fechas, posiciones = self._fechas, self._posiciones
+        else:
+            columnas = self._por_producto.get(codigo)
+            if columnas is None:
+                return array('q')
+            fechas, posiciones = columnas
+        inicio = bisect_left(fechas, MovimientoInventario.fecha_a_epoch(desde)) if desde else 0
+        fin = bisect_right(fechas, MovimientoInventario.fecha_a_epoch(hasta)) if hasta else len(fechas)
+        if ultimos:
+            inicio = max(inicio, fin - ultimos)
+        return posiciones[inicio:fin]
+
+# -------------------------------
+# Estadísticas en línea de los movimientos de un producto
+# -------------------------------
+_LN2 = math.log(2)
+
+class EstadisticasProducto:
+    """
+    Resumen de los movimientos de un producto que se actualiza en O(1): entradas, salidas,
+    media y varianza de las salidas (Welford), último movimiento y tasa de consumo por día
+    con decaimiento exponencial de vida media VIDA_MEDIA_DIAS.
+    """
+    VIDA_MEDIA_DIAS = 7.0
+    
+    __slots__ = ('entradas', 'unidades_entrada', 'salidas', 'unidades_salida', 'media_salida', '_m2',
+                 '_ultimo_epoch', '_tasa', '_epoch_tasa')
+    
+    def __init__(self):
+        self.entradas = 0
+        self.unidades_entrada = 0
+        self.salidas = 0
+        self.unidades_salida = 0
+        self.media_salida = 0.0
+        self._m2 = 0.0
+        self._ultimo_epoch: Optional[int] = None
+        # Tasa de consumo tal como estaba en _epoch_tasa (la salida más reciente)
+        self._tasa = 0.0
+        self._epoch_tasa: Optional[int] = None
+    
+    def registrar(self, tipo: TipoMovimiento, cantidad: int, epoch: int) -> None:
+        """Suma un movimiento; los que llegan con fecha anterior (importados) también valen"""
+        if self._ultimo_epoch is None or epoch > self._ultimo_epoch:
+            self._ultimo_epoch = epoch
+        if tipo is TipoMovimiento.ENTRADA:
+            self.entradas += 1
+            self.unidades_entrada += cantidad
+            return
+        
+        self.salidas += 1
+        self.unidades_salida += cantidad
+        delta = cantidad - self.media_salida
+        self.media_salida += delta / self.salidas
+        self._m2 += delta * (cantidad - self.media_salida)
+        self._sumar_tasa(cantidad, epoch)
+    
+    def registrar_salidas(self, cantidades: List[int], epoch: int) -> None:
+        """
+        Suma varias salidas con la misma fecha (un lote de registrar_movimientos) de una vez:
+        media y varianza del grupo combinadas con las acumuladas (fórmula de Chan)
+        """
+        if self._ultimo_epoch is None or epoch > self._ultimo_epoch:
+            self._ultimo_epoch = epoch
+        n = len(cantidades)
+        unidades = sum(cantidades)
+        media = unidades / n
+        m2 = sum((cantidad - media) ** 2 for cantidad in cantidades) if n > 1 else 0.0
+        total = self.salidas + n
+        delta = media - self.media_salida
+        self._m2 += m2 + delta * delta * self.salidas * n / total
+        self.media_salida += delta * n / total
+        self.salidas = total
+        self.unidades_salida += unidades
+        self._sumar_tasa(unidades, epoch)
+    
+    def _sumar_tasa(self, cantidad: int, epoch: int) -> None:
+        aporte = cantidad * _LN2 / self.VIDA_MEDIA_DIAS
+        if self._epoch_tasa is None:
+            self._tasa = aporte
+            self._epoch_tasa = epoch
+            return
+        tau_us = self.VIDA_MEDIA_DIAS / _LN2 * 86_400_000_000
+        if epoch >= self._epoch_tasa:
+            self._tasa = self._tasa * math.exp((self._epoch_tasa - epoch) / tau_us) + aporte
+            self._epoch_tasa = epoch
+        else:
+            # Salida anterior a la última: su aporte ya decayó hasta _epoch_tasa
+            self._tasa += aporte * math.exp((epoch - self._epoch_tasa) / tau_us)
+    
+    @property
+    def varianza_salida(self) -> float:
+        """Varianza muestral de las cantidades de salida (0 con menos de dos salidas)"""
+        return self._m2 / (self.salidas - 1) if self.salidas > 1 else 0.0
+    
+    @property
+    def desviacion_salida(self) -> float:
+        return math.sqrt(self.varianza_salida)
+    
+    @property
+    def ultimo_movimiento(self) -> Optional[datetime]:
+        return MovimientoInventario.fecha_desde_epoch(self._ultimo_epoch) if self._ultimo_epoch is not None else None
+    
+    def tasa_consumo(self, ahora: Optional[datetime] = None) -> float:
+        """Unidades/día consumidas recientemente, decaída hasta `ahora` (por defecto, el momento actual)"""
+        if self._epoch_tasa is None:
+            return 0.0
+        transcurrido = MovimientoInventario.fecha_a_epoch(ahora or datetime.now()) - self._epoch_tasa
+        return self._tasa * math.exp(-max(transcurrido, 0) * _LN2 / (self.VIDA_MEDIA_DIAS * 86_400_000_000))
+    
+    def to_dict(self, ahora: Optional[datetime] = None) -> dict:
+        ultimo = self.ultimo_movimiento
+        return {
+            'entradas': self.entradas,
+            'unidades_entrada': self.unidades_entrada,
+            'salidas': self.salidas,
+            'unidades_salida': self.unidades_salida,
+            'media_salida': self.media_salida,
+            'varianza_salida': self.varianza_salida,
+            'ultimo_movimiento': ultimo.strftime('%Y-%m-%d %H:%M:%S') if ultimo else None,
+            'tasa_consumo': self.tasa_consumo(ahora),
+        }
+
+# -------------------------------
+# Clase abstracta para reportes
+# -------------------------------
+class Reporte(ABC):
+    def __init__(self, productos: Iterable[Producto], total: Optional[int] = None):
+        """
+        productos: lista o iterable de un solo recorrido (p. ej. un generador sobre el almacén)
+        total: cantidad ya conocida; obligatoria si productos no admite len()
+        """
+        self.productos = productos
+        self._total = total
+    
+    @property
+    def total(self) -> int:
+        return self._total if self._total is not None else len(self.productos)
+    
+    @abstractmethod
+    def generar_lineas(self) -> Iterator[str]:
+        """Produce el reporte línea por línea, sin construirlo completo en memoria"""
+        pass
+    
+    def generar(self) -> str:
+        return "\n".join(self.generar_lineas())
+    
+    def bloques(self, lineas_por_bloque: int = 1000) -> Iterator[str]:
+        """Agrupa las líneas en bloques de texto; concatenados equivalen a generar()"""
+        lineas = self.generar_lineas()
+        separador = ""
+        while True:
+            bloque = list(islice(lineas, lineas_por_bloque))
+            if not bloque:
+                return
+            yield separador + "\n".join(bloque)
+            separador = "\n"
+    
+    def escribir(self, archivo, callback_progreso: Optional[Callable[[int], None]] = None) -> None:
+        """
+        Escribe el reporte por bloques en un archivo de texto abierto
+        callback_progreso: se llama con las líneas escritas después de cada bloque
+        """
+        saltos = 0
+        for bloque in self.bloques():
+            archivo.write(bloque)
+            if callback_progreso:
+                # Los bloques van separados por un salto: las líneas son los saltos más una
+                saltos += bloque.count("\n")
+                callback_progreso(saltos + 1)
+
+class ReporteInventario(Reporte):
+    def generar_lineas(self) -> Iterator[str]:
+        yield "=" * 80
+        yield "TECHNOVA - REPORTE DE INVENTARIO COMPLETO".center(80)
+        yield "=" * 80
+        yield f"Fecha: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}"
+        yield f"Total de productos: {self.total}"
+        yield "-" * 80
+        yield ""
+        
+        hay_productos = False
+        for producto in self.productos:
+            hay_productos = True
+            estado = "ACTIVO" if producto.activo else "INACTIVO"
+            alerta = " ⚠️ STOCK BAJO" if producto.tiene_stock_bajo() else ""
+            yield f"[{estado}] {producto.codigo} - {producto.nombre}"
+            yield f"  Precio: S/. {producto.precio:.2f} | Stock: {producto.stock}{alerta}"
+            yield ""
+        
+        if not hay_productos:
+            yield "No hay productos registrados"
+        
+        yield "=" * 80
+
+class ReporteStockBajo(Reporte):
+    def generar_lineas(self) -> Iterator[str]:
+        if self._total is None:
+            productos_bajo_stock = [p for p in self.productos if p.tiene_stock_bajo() and p.activo]
+            cantidad = len(productos_bajo_stock)
+        else:
+            # El llamador ya conoce la cantidad: se filtra sobre la marcha
+            productos_bajo_stock = (p for p in self.productos if p.tiene_stock_bajo() and p.activo)
+            cantidad = self._total
+        
+        yield "=" * 80
+        yield "TECHNOVA - ⚠️  REPORTE DE STOCK BAJO ⚠️".center(80)
+        yield "=" * 80
+        yield f"Fecha: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}"
+        yield f"Productos con stock bajo: {cantidad}"
+        yield "-" * 80
+        yield ""
+        
+        hay_productos = False
+        for producto in productos_bajo_stock:
+            hay_productos = True
+            deficit = producto.stock_minimo - producto.stock
+            yield f"{producto.nombre}"
+            yield f"  Stock actual: {producto.stock} | Mínimo: {producto.stock_minimo} | Faltan: {deficit}"
+            yield ""
+        
+        if not hay_productos:
+            yield "✓ Todos los productos tienen stock adecuado"
+        
+        yield "=" * 80
+
+class ReporteValorInventario(Reporte):
+    def __init__(self, productos: Iterable[Producto], valor_total: Optional[float] = None,
+                 total: Optional[int] = None, ordenados: bool = False):
+        """
+        valor_total: total ya calculado (Inventario.valor_total) para no recorrer los productos
+        ordenados: los productos ya vienen activos y de mayor a menor valor (Inventario.iterar_ranking_valor);
+        se recorren de a uno sin ordenarlos, con su clase ABC. Requiere valor_total y total
+        """
+        super().__init__(productos, total)
+        self.valor_total = valor_total
+        self.ordenados = ordenados
+    
+    def generar_lineas(self) -> Iterator[str]:
+        if self.ordenados:
+            productos_activos = self.productos
+            cantidad = self.total
+            valor_total = self.valor_total
+        else:
+            # El orden por valor necesita todos los productos; las líneas salen de a una
+            productos_activos = [p for p in self.productos if p.activo]
+            productos_activos.sort(key=lambda p: p.precio * p.stock, reverse=True)
+            cantidad = len(productos_activos)
+            valor_total = self.valor_total if self.valor_total is not None else sum(p.precio * p.stock for p in productos_activos)
+        
+        yield "=" * 80
+        yield "TECHNOVA - REPORTE DE VALOR DE INVENTARIO".center(80)
+        yield "=" * 80
+        yield f"Fecha: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}"
+        yield f"Productos activos: {cantidad}"
+        yield f"Valor total del inventario: S/. {valor_total:,.2f}"
+        yield "-" * 80
+        yield ""
+        
+        if cantidad:
+            yield "Detalle por producto:"
+            acumulado = 0.0
+            for producto in productos_activos:
+                valor_producto = producto.precio * producto.stock
+                linea = f"{producto.nombre}: {producto.stock} unidades × S/. {producto.precio:.2f} = S/. {valor_producto:,.2f}"
+                if self.ordenados:
+                    # Clase ABC por el valor acumulado antes del producto (80% / 95%)
+                    clase = 'A' if acumulado < 0.80 * valor_total else 'B' if acumulado < 0.95 * valor_total else 'C'
+                    acumulado += valor_producto
+                    yield f"  [{clase}] {linea}"
+                else:
+                    yield f"  {linea}"
+        
+        yield "=" * 80
+
+class ReporteHistorial(Reporte):
+    def __init__(self, movimientos: List[MovimientoInventario], titulo: str = "TECHNOVA - HISTORIAL DE MOVIMIENTOS"):
+        """movimientos: en orden cronológico; el reporte los muestra del más reciente al más antiguo"""
+        super().__init__([], len(movimientos))
+        self.movimientos = movimientos
+        self.titulo = titulo
+    
+    def generar_lineas(self) -> Iterator[str]:
+        yield "=" * 80
+        yield self.titulo.center(80)
+        yield "=" * 80
+        yield ""
+        
+        if not self.movimientos:
+            yield "No hay movimientos registrados"
+        else:
+            for mov in reversed(self.movimientos):
+                yield str(mov)
+            yield ""
+        
+        yield "=" * 80
+
+class ReporteConsumo(Reporte):
+    def __init__(self, productos: Iterable[Producto], estadisticas: Dict[str, dict], total: Optional[int] = None):
+        """estadisticas: código -> EstadisticasProducto.to_dict(); los productos sin entrada no tienen movimientos"""
+        super().__init__(productos, total)
+        self.estadisticas = estadisticas
+    
+    @classmethod
+    def ordenado(cls, productos: Iterable[Producto], estadisticas: Dict[str, dict]) -> 'ReporteConsumo':
+        """Reporte con los productos de mayor tasa de consumo primero"""
+        sin_datos = {'tasa_consumo': 0.0}
+        return cls(sorted(productos, key=lambda p: estadisticas.get(p.codigo, sin_datos)['tasa_consumo'],
+                          reverse=True), estadisticas)
+    
+    def generar_lineas(self) -> Iterator[str]:
+        yield "=" * 80
+        yield "TECHNOVA - REPORTE DE CONSUMO".center(80)
+        yield "=" * 80
+        yield f"Fecha: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}"
+        yield f"Tasa de consumo con vida media de {EstadisticasProducto.VIDA_MEDIA_DIAS:g} días"
+        yield "-" * 80
+        yield ""
+        
+        for producto in self.productos:
+            datos = self.estadisticas.get(producto.codigo)
+            yield f"{producto.nombre} ({producto.codigo})"
+            if not datos:
+                yield "  Sin movimientos"
+            else:
+                desviacion = math.sqrt(datos['varianza_salida'])
+                yield (f"  Entradas: {datos['entradas']} ({datos['unidades_entrada']} u.) | "
+                       f"Salidas: {datos['salidas']} ({datos['unidades_salida']} u.)")
+                yield (f"  Salida media: {datos['media_salida']:.2f} ± {desviacion:.2f} u. | "
+                       f"Consumo: {datos['tasa_consumo']:.2f} u./día")
+                yield f"  Stock: {producto.stock} | Último movimiento: {datos['ultimo_movimiento']}"
+            yield ""
+        
+        yield "=" * 80
+
+class ReporteListadoSimple(Reporte):
+    def generar_lineas(self) -> Iterator[str]:
+        yield f"Reporte generado el: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}"
+        yield ""
+        for producto in self.productos:
+            yield f"{producto.codigo} | {producto.nombre} | S/. {producto.precio:.2f} | Stock: {producto.stock}"
+        # Cada línea del listado termina en salto de línea
+        yield ""
+
+# -------------------------------
+# Procesos de trabajo sin fork
+# -------------------------------
+def contexto_procesos():
+    """
+    Contexto de multiprocessing sin fork ('forkserver' o 'spawn'): el proceso tiene hilos vivos.
+    Los procesos vuelven a importar el script principal, que necesita `if __name__ == "__main__":`.
+    """
+    return multiprocessing.get_context(
+        'forkserver' if 'forkserver' in multiprocessing.get_all_start_methods() else 'spawn')
+
+# -------------------------------
+# Clase Inventario
+# -------------------------------
+class Inventario:
+    VALORES_VERDADEROS = frozenset(['true', '1', 'yes', 'si'])
+    # Métodos que activar_metricas mide: búsquedas, movimientos, importaciones y exportaciones
+    OPERACIONES_MEDIDAS = (
+        'buscar_producto', 'buscar_por_nombre', 'registrar_producto',
+        'entrada_stock', 'salida_stock', 'registrar_movimientos',
+        'actualizar_precio', 'cambiar_estado', 'obtener_historial', 'historial_producto',
+        'importar_csv', 'exportar_csv', 'importar_json', 'exportar_json',
+        'importar_jsonl', 'exportar_jsonl', 'importar_movimientos_csv', 'exportar_txt',
+        'importar_csv_paralelo',
+    )
+    # Bytes aproximados de cada trozo que importar_csv_paralelo reparte entre los procesos
+    TAMANO_TROZO_CSV = 16 * 1024 * 1024
+    # Desde este tamaño de catálogo top_productos arma y conserva el orden por valor (ver _orden_por_valor)
+    UMBRAL_ORDEN_VALOR = 50_000
+    
+    def __init__(self, historial_compacto: bool = False):
+        """historial_compacto: guarda los movimientos en columnas (HistorialCompacto) en lugar de una lista"""
+        self._productos: List[Producto] = []
+        self._historial_movimientos = HistorialCompacto() if historial_compacto else []
+        # Índice por fecha y por producto; cubre las posiciones menores que _indexados, como _estadisticas
+        self._indice_movimientos = IndiceMovimientos()
+        self._indexados = 0
+        # Índice por código para búsquedas O(1); debe mantenerse junto a _productos
+        self._indice_codigos: Dict[str, Producto] = {}
+        # Índice de texto para buscar_por_nombre: se arma en la primera búsqueda y desde
+        # entonces se actualiza al agregar y al renombrar
+        self._indice_nombres = IndiceNombresDiferido(self._nombres_catalogo)
+        self._diario: Optional[DiarioInventario] = None
+        # Agregados de productos activos, actualizados en cada cambio (ver _antes_de_cambiar)
+        self._valor_total = 0.0
+        self._total_activos = 0
+        # Códigos con stock bajo en el orden en que entraron (dict como conjunto ordenado)
+        self._codigos_stock_bajo: Dict[str, None] = {}
+        self._observadores: List[Callable[[Optional[Producto]], None]] = []
+        # Exportación incremental: código -> número de su último cambio (si ya no existe, es una lápida)
+        self._numero_cambio = 0
+        self._cambios: Dict[str, int] = {}
+        self._marca_exportacion = 0
+        # Estadísticas en línea por código, actualizadas con cada movimiento del historial
+        self._estadisticas: Dict[str, EstadisticasProducto] = {}
+        # Orden por valor de los activos para rankings: se arma al primer uso y luego solo se
+        # corrigen los códigos cambiados desde la consulta anterior (_pendientes_orden)
+        self._orden_valor: Optional[ListaOrdenada] = None
+        self._claves_orden: Dict[str, tuple] = {}
+        self._pendientes_orden: set = set()
+    
+    @property
+    def productos(self) -> List[Producto]:
+        return self._productos.copy()
+    
+    @property
+    def productos_activos(self) -> List[Producto]:
+        return [p for p in self._productos if p.activo]
+    
+    def pagina_activos(self, inicio: int, cantidad: int) -> List[Producto]:
+        """Los productos activos en las posiciones [inicio, inicio + cantidad) de productos_activos"""
+        return list(islice((p for p in self._productos if p._activo), inicio, inicio + cantidad))
+    
+    @property
+    def productos_stock_bajo(self) -> List[Producto]:
+        return [self._indice_codigos[codigo] for codigo in self._codigos_stock_bajo]
+    
+    def agregar_observador(self, observador: Callable[[Optional[Producto]], None]) -> None:
+        """
+        Registra una función que se llama con cada producto agregado o modificado,
+        o con None cuando cambia todo el catálogo (p. ej. al reemplazarlo)
+        """
+        self._observadores.append(observador)
+    
+    def _notificar(self, producto: Optional[Producto]) -> None:
+        for observador in self._observadores:
+            observador(producto)
+    
+    @property
+    def total_productos(self) -> int:
+        return len(self._productos)
+    
+    @property
+    def valor_total(self) -> float:
+        return self._valor_total
+    
+    @property
+    def total_activos(self) -> int:
+        return self._total_activos
+    
+    @property
+    def total_stock_bajo(self) -> int:
+        return len(self._codigos_stock_bajo)
+    
+    def _antes_de_cambiar(self, producto: Producto) -> None:
+        """Retira el producto de los agregados; llamar antes de modificarlo"""
+        if producto._activo:
+            self._total_activos -= 1
+            self._valor_total -= producto._precio * producto._stock
+            self._codigos_stock_bajo.pop(producto._codigo, None)
+    
+    def _despues_de_cambiar(self, producto: Producto) -> None:
+        """Vuelve a sumar el producto a los agregados y avisa a los observadores; llamar después de modificarlo"""
+        self._sumar_agregados(producto)
+        self._marcar_cambio(producto._codigo)
+        if self._observadores:
+            self._notificar(producto)
+    
+    def _sumar_agregados(self, producto: Producto) -> None:
+        if producto._activo:
+            self._total_activos += 1
+            self._valor_total += producto._precio * producto._stock
+            if producto._stock <= producto._stock_minimo:
+                self._codigos_stock_bajo[producto._codigo] = None
+    
+    def _marcar_cambio(self, codigo: str) -> None:
+        self._numero_cambio += 1
+        self._cambios[codigo] = self._numero_cambio
+        if self._orden_valor is not None:
+            self._pendientes_orden.add(codigo)
+    
+    @property
+    def marca_cambios(self) -> int:
+        """
+        Número del último cambio registrado. Las marcas solo valen mientras viva el
+        objeto: tras reiniciar el programa hay que volver a hacer una exportación completa.
+        """
+        return self._numero_cambio
+    
+    @property
+    def marca_exportacion(self) -> int:
+        """Marca confirmada con avanzar_marca_exportacion; los cambios anteriores ya se descartaron"""
+        return self._marca_exportacion
+    
+    def avanzar_marca_exportacion(self, marca: int) -> None:
+        """Confirma que los cambios hasta `marca` ya se exportaron y deja de recordarlos"""
+        if not self._marca_exportacion <= marca <= self._numero_cambio:
+            raise ValueError(f"Marca fuera de rango: {marca} (válidas: {self._marca_exportacion} a {self._numero_cambio})")
+        self._cambios = {codigo: numero for codigo, numero in self._cambios.items() if numero > marca}
+        self._marca_exportacion = marca
+    
+    def cambios_desde(self, marca: int) -> tuple[List[Producto], List[str]]:
+        """(productos cambiados, códigos eliminados) después de `marca`"""
+        if marca < self._marca_exportacion:
+            raise ValueError(f"Los cambios anteriores a la marca {self._marca_exportacion} ya se descartaron")
+        cambiados = []
+        eliminados = []
+        for codigo, numero in list(self._cambios.items()):
+            if numero > marca:
+                producto = self._buscar_producto_por_codigo(codigo)
+                if producto:
+                    cambiados.append(producto)
+                else:
+                    eliminados.append(codigo)
+        return cambiados, eliminados
+    
+    # --- Rankings ---
+    # Clave de orden ascendente de cada criterio: el mayor valor (o déficit) primero y, a igualdad, el menor código
+    CLAVES_RANKING: Dict[str, Callable[[Producto], tuple]] = {
+        'valor': lambda p: (-(p._precio * p._stock), p._codigo),
+        'deficit': lambda p: (p._stock - p._stock_minimo, p._codigo),
+    }
+    
+    @classmethod
+    def _clave_ranking(cls, criterio: str) -> Callable[[Producto], tuple]:
+        """Función de clave del criterio; se resuelve antes de buscar candidatos para fallar siempre igual"""
+        clave = cls.CLAVES_RANKING.get(criterio)
+        if clave is None:
+            raise ValueError(f"Criterio de ranking desconocido: '{criterio}' (use 'valor' o 'deficit')")
+        return clave
+    
+    def _orden_por_valor(self) -> ListaOrdenada:
+        """Orden por valor de los productos activos, al día con los cambios desde la última consulta"""
+        pendientes = self._pendientes_orden
+        # Con muchos cambios (p. ej. tras reemplazar el catálogo) sale más barato rearmarlo
+        clave_valor = self._clave_ranking('valor')
+        if self._orden_valor is None or len(pendientes) > len(self._claves_orden) // 4:
+            self._claves_orden = {p._codigo: clave_valor(p) for p in self._iterar_productos() if p._activo}
+            self._orden_valor = ListaOrdenada(self._claves_orden.values())
+            pendientes.clear()
+            return self._orden_valor
+        orden = self._orden_valor
+        claves = self._claves_orden
+        for codigo in pendientes:
+            clave = claves.pop(codigo, None)
+            if clave is not None:
+                orden.quitar(clave)
+            producto = self._buscar_producto_por_codigo(codigo)
+            if producto is not None and producto._activo:
+                clave = claves[codigo] = clave_valor(producto)
+                orden.agregar(clave)
+        pendientes.clear()
+        return orden
+    
+    def top_productos(self, cantidad: int = 10, criterio: str = 'valor') -> List[Producto]:
+        """
+        Los `cantidad` productos activos de mayor valor (precio × stock) o de mayor déficit,
+        de mayor a menor. ValueError si el criterio no existe.
+        """
+        clave = self._clave_ranking(criterio)
+        if criterio == 'valor' and (self._orden_valor is not None or self.total_productos >= self.UMBRAL_ORDEN_VALOR):
+            return self._productos_por_codigos([codigo for _, codigo in self._orden_por_valor().tramo(0, cantidad)])
+        candidatos = self.productos_stock_bajo if criterio == 'deficit' else self.productos_activos
+        return heapq.nsmallest(cantidad, candidatos, key=clave)
+    
+    def pagina_ranking(self, pagina: int = 1, tamano: int = 50, criterio: str = 'valor') -> List[Producto]:
+        """Página `pagina` (desde 1) del ranking de top_productos; por valor arma y conserva el orden"""
+        if pagina < 1 or tamano <= 0:
+            raise ValueError("La página empieza en 1 y el tamaño debe ser mayor a cero")
+        self._clave_ranking(criterio)
+        inicio = (pagina - 1) * tamano
+        if criterio != 'valor':
+            return self.top_productos(inicio + tamano, criterio)[inicio:]
+        claves = self._orden_por_valor().tramo(inicio, inicio + tamano)
+        return self._productos_por_codigos([codigo for _, codigo in claves])
+    
+    def iterar_ranking_valor(self) -> Iterator[Producto]:
+        """Productos activos de mayor a menor valor; copia solo las claves del orden, no arma una lista de productos"""
+        for _, codigo in list(self._orden_por_valor()):
+            producto = self._buscar_producto_por_codigo(codigo)
+            if producto is not None:
+                yield producto
+    
+    def _valores_activos(self) -> List[tuple]:
+        return [(p._precio * p._stock, p._codigo) for p in self._iterar_productos() if p._activo]
+    
+    def clasificacion_abc(self, umbrales: tuple[float, float] = (0.80, 0.95)) -> Dict[str, List[str]]:
+        """
+        Códigos de los productos activos por clase ABC: A acumula el 80% del valor, B el
+        15% siguiente y C el resto (ver clasificar_abc); con selección parcial, sin ordenar
+        """
+        return clasificar_abc(self._valores_activos(), umbrales)
+    
+    def recalcular_agregados(self) -> None:
+        """Recalcula los agregados desde cero (corrige el error de redondeo acumulado en valor_total)"""
+        self._valor_total = 0.0
+        self._total_activos = 0
+        self._codigos_stock_bajo.clear()
+        for producto in self._productos:
+            self._sumar_agregados(producto)
+    
+    def _iterar_productos(self) -> Iterator[Producto]:
+        return iter(self._productos)
+    
+    def _iterar_movimientos(self) -> Iterator[MovimientoInventario]:
+        return iter(self._historial_movimientos)
+    
+    def _historial_en_columnas(self) -> HistorialCompacto:
+        """El historial como HistorialCompacto (el propio, si ya lo es), para guardarlo en binario"""
+        if isinstance(self._historial_movimientos, HistorialCompacto):
+            return self._historial_movimientos
+        return HistorialCompacto(self._iterar_movimientos())
+    
+    def cerrar(self) -> None:
+        """Libera los recursos de persistencia (diario)"""
+        if self._diario:
+            self._diario.cerrar()
+            self._diario = None
+    
+    def activar_metricas(self, metricas: Optional[MetricasInventario] = None) -> MetricasInventario:
+        """Empieza a medir las OPERACIONES_MEDIDAS de este inventario; devuelve las métricas usadas"""
+        metricas = metricas or MetricasInventario()
+        metricas.instrumentar(self, self.OPERACIONES_MEDIDAS)
+        return metricas
+    
+    def desactivar_metricas(self) -> None:
+        MetricasInventario.desinstrumentar(self, self.OPERACIONES_MEDIDAS)
+    
+    def usar_diario(self, diario: DiarioInventario) -> int:
+        """Restaura el estado guardado en el diario y registra en él los cambios siguientes"""
+        reaplicados = diario.restaurar(self)
+        self._diario = diario
+        return reaplicados
+    
+    def _anotar(self, operacion: str, **datos) -> None:
+        self._diario.registrar(operacion, **datos)
+        if self._diario.necesita_snapshot():
+            self._diario.escribir_snapshot(self)
+    
+    def guardar_instantanea(self, ruta_archivo: str) -> int:
+        """Guarda el catálogo como InstantaneaBinaria (ver InventarioMapeado); devuelve los productos guardados"""
+        return InstantaneaBinaria.escribir(ruta_archivo, self._iterar_productos())
+    
+    def _cargar_catalogo(self, ruta_archivo: str) -> None:
+        """Agrega todos los productos de una InstantaneaBinaria (InventarioMapeado la abre sin leerla)"""
+        if self.total_productos:
+            raise ValueError("La instantánea binaria solo se carga en un inventario vacío")
+        instantanea = InstantaneaBinaria(ruta_archivo)
+        try:
+            for fila in range(len(instantanea)):
+                self._agregar_producto(instantanea.producto(fila))
+        finally:
+            instantanea.cerrar()
+    
+    def _cargar_historial(self, ruta_archivo: str) -> None:
+        """
+        Anexa los movimientos de un historial binario (HistorialCompacto.escribir) sin
+        indexarlos: el índice por fecha y las estadísticas se completan en la primera consulta
+        """
+        historial = HistorialCompacto.leer(ruta_archivo)
+        if isinstance(self._historial_movimientos, HistorialCompacto) and not self._historial_movimientos:
+            self._historial_movimientos = historial
+        else:
+            self._historial_movimientos.extend(historial)
+    
+    def _ponerse_al_dia(self) -> None:
+        """Indexa y suma a las estadísticas los movimientos que quedaron sin indexar (ver _cargar_historial)"""
+        historial = self._historial_movimientos
+        agregar_al_indice = self._indice_movimientos.agregar
+        for posicion in range(self._indexados, len(historial)):
+            movimiento = historial[posicion]
+            epoch = MovimientoInventario.fecha_a_epoch(movimiento.fecha)
+            agregar_al_indice(posicion, movimiento.producto_codigo, epoch)
+            self._sumar_estadistica(movimiento.producto_codigo, movimiento.tipo, movimiento.cantidad, epoch)
+        self._indexados = len(historial)
+        # Bajo la cerradura común en InventarioConcurrente
+        self._indice_movimientos.mezclar_pendientes()
+    
+    def _aplicar_registro(self, registro: dict) -> None:
+        """Reaplica un registro del diario sin volver a anotarlo"""
+        operacion = registro['op']
+        if operacion in ('entrada', 'salida', 'movimiento'):
+            codigo = registro['codigo']
+            cantidad = registro['cantidad']
+            if operacion in ('entrada', 'salida'):
+                tipo = TipoMovimiento.ENTRADA if operacion == 'entrada' else TipoMovimiento.SALIDA
+                producto = self._indice_codigos[codigo]
+                self._antes_de_cambiar(producto)
+                producto._stock += cantidad if operacion == 'entrada' else -cantidad
+                self._despues_de_cambiar(producto)
+            else:
+                tipo = TipoMovimiento(registro['tipo'])
+            self._agregar_movimiento(MovimientoInventario(
+                codigo, tipo, cantidad, MovimientoInventario.fecha_desde_epoch(registro['fecha'])))
+        elif operacion == 'producto':
+            existente = self._indice_codigos.get(registro['codigo'])
+            if existente:
+                self._antes_de_cambiar(existente)
+                existente._nombre = registro['nombre']
+                self._indice_nombres.agregar(existente._codigo, existente._nombre)
+                existente._precio = registro['precio']
+                existente._stock = registro['stock']
+                existente._stock_minimo = registro['stock_minimo']
+                existente._activo = registro['activo']
+                self._despues_de_cambiar(existente)
+            else:
+                self._agregar_producto(Producto.from_dict(registro))
+        elif operacion == 'limpiar':
+            self._limpiar_productos()
+        else:
+            raise ValueError(f"Operación de diario desconocida: '{operacion}'")
+    
+    def registrar_producto(self, producto: Producto) -> None:
+        if self._buscar_producto_por_codigo(producto.codigo):
+            raise ValueError(f"Ya existe un producto con el código '{producto.codigo}'")
+        self._agregar_producto(producto)
+        if self._diario:
+            self._anotar('producto', **producto.to_dict())
+    
+    def entrada_stock(self, codigo: str, cantidad: int) -> None:
+        if cantidad <= 0:
+            raise ValueError("La cantidad debe ser mayor a cero")
+        
+        producto = self.buscar_producto(codigo)
+        self._antes_de_cambiar(producto)
+        producto.stock += cantidad
+        self._despues_de_cambiar(producto)
+        
+        movimiento = MovimientoInventario(codigo, TipoMovimiento.ENTRADA, cantidad)
+        self._agregar_movimiento(movimiento)
+        if self._diario:
+            self._anotar('entrada', codigo=codigo, cantidad=cantidad,
+                         fecha=MovimientoInventario.fecha_a_epoch(movimiento.fecha))
+    
+    def salida_stock(self, codigo: str, cantidad: int) -> None:
+        if cantidad <= 0:
+            raise ValueError("La cantidad debe ser mayor a cero")
+        
+        producto = self.buscar_producto(codigo)
+        
+        if producto.stock < cantidad:
+            raise ValueError(f"Stock insuficiente. Disponible: {producto.stock}, Solicitado: {cantidad}")
+        
+        self._antes_de_cambiar(producto)
+        producto.stock -= cantidad
+        self._despues_de_cambiar(producto)
+        
+        movimiento = MovimientoInventario(codigo, TipoMovimiento.SALIDA, cantidad)
+        self._agregar_movimiento(movimiento)
+        if self._diario:
+            self._anotar('salida', codigo=codigo, cantidad=cantidad,
+                         fecha=MovimientoInventario.fecha_a_epoch(movimiento.fecha))
+    
+    def registrar_movimientos(self, movimientos: Iterable[tuple],
+                              inicio: int = 1) -> tuple[int, List[tuple[int, str]]]:
+        """
+        Aplica en bloque registros (codigo, tipo, cantidad); tipo es un TipoMovimiento o su valor.
+        Cada producto se actualiza una vez con el neto del lote. Devuelve (aplicados, rechazados),
+        con rechazados como (número de fila, motivo); `inicio` numera la primera fila.
+        """
+        tipos = {tipo.value.lower(): tipo for tipo in TipoMovimiento}
+        rechazados: List[tuple[int, str]] = []
+        validos = []
+        agregar_valido = validos.append
+        for numero, registro in enumerate(movimientos, inicio):
+            try:
+                codigo, tipo, cantidad = registro
+            except (TypeError, ValueError):
+                rechazados.append((numero, "Se esperaba (codigo, tipo, cantidad)"))
+                continue
+            # Un código que no es texto no existe y, si no es hasheable, rompería la consulta de stock
+            if codigo.__class__ is not str:
+                rechazados.append((numero, f"Código no válido: {codigo!r}"))
+                continue
+            if tipo.__class__ is not TipoMovimiento:
+                tipo_convertido = tipos.get(str(tipo).strip().lower())
+                if tipo_convertido is None:
+                    rechazados.append((numero, f"Tipo de movimiento desconocido: '{tipo}'"))
+                    continue
+                tipo = tipo_convertido
+            if cantidad.__class__ is not int:
+                try:
+                    cantidad = int(cantidad)
+                except (TypeError, ValueError):
+                    rechazados.append((numero, f"Cantidad no válida: '{cantidad}'"))
+                    continue
+            if cantidad <= 0:
+                rechazados.append((numero, "La cantidad debe ser mayor a cero"))
+                continue
+            agregar_valido((numero, codigo, tipo, cantidad))
+        
+        # Una sola consulta de stock por lote; luego se simula el lote en memoria
+        stocks = self._stocks_de({fila[1] for fila in validos})
+        iniciales = stocks.copy()
+        aceptados = []
+        aceptar = aceptados.append
+        salida = TipoMovimiento.SALIDA
+        for fila in validos:
+            numero, codigo, tipo, cantidad = fila
+            stock = stocks.get(codigo)
+            if stock is None:
+                rechazados.append((numero, f"Producto con código '{codigo}' no encontrado"))
+            elif tipo is salida:
+                if stock < cantidad:
+                    rechazados.append((numero, f"Stock insuficiente. Disponible: {stock}, Solicitado: {cantidad}"))
+                    continue
+                stocks[codigo] = stock - cantidad
+                aceptar(fila)
+            else:
+                stocks[codigo] = stock + cantidad
+                aceptar(fila)
+        
+        if aceptados:
+            netos = {codigo: stock - iniciales[codigo] for codigo, stock in stocks.items() if stock != iniciales[codigo]}
+            self._aplicar_movimientos(aceptados, netos, datetime.now())
+        rechazados.sort()
+        return len(aceptados), rechazados
+    
+    def _stocks_de(self, codigos: Iterable[str]) -> Dict[str, int]:
+        """Stock actual de los códigos que existen"""
+        indice = self._indice_codigos
+        return {codigo: indice[codigo]._stock for codigo in codigos if codigo in indice}
+    
+    def _aplicar_movimientos(self, aceptados: List[tuple], netos: Dict[str, int], fecha: datetime) -> None:
+        """
+        Suma a cada producto su neto y anexa los movimientos; `aceptados` son filas
+        (número, codigo, tipo, cantidad) ya validadas por registrar_movimientos
+        """
+        for codigo, neto in netos.items():
+            producto = self._indice_codigos[codigo]
+            self._antes_de_cambiar(producto)
+            producto._stock += neto
+            self._despues_de_cambiar(producto)
+        
+        inicio = len(self._historial_movimientos)
+        self._historial_movimientos.extend(MovimientoInventario(codigo, tipo, cantidad, fecha)
+                                           for _, codigo, tipo, cantidad in aceptados)
+        epoch = MovimientoInventario.fecha_a_epoch(fecha)
+        self._indexar_lote(inicio, aceptados, epoch)
+        
+        if self._diario:
+            # Todo el lote en una sola escritura; la instantánea, si toca, se toma con el lote completo
+            self._diario.registrar_lote(('entrada' if tipo is TipoMovimiento.ENTRADA else 'salida',
+                                         {'codigo': codigo, 'cantidad': cantidad, 'fecha': epoch})
+                                        for _, codigo, tipo, cantidad in aceptados)
+            if self._diario.necesita_snapshot():
+                self._diario.escribir_snapshot(self)
+    
+    def importar_movimientos_csv(self, ruta_archivo: str, tamano_lote: int = 10000,
+                                 ruta_errores: Optional[str] = None,
+                                 callback_progreso: Optional[Callable[[int, int, int], None]] = None) -> tuple[int, int]:
+        """
+        Aplica los movimientos de un CSV (codigo, tipo, cantidad) por lotes con registrar_movimientos.
+        Los rechazados van a `ruta_errores` o, sin él, se resumen por consola. Devuelve (aplicados, rechazados).
+        """
+        if tamano_lote <= 0:
+            raise ValueError("El tamaño de lote debe ser mayor a cero")
+        
+        aplicados = 0
+        total_rechazados = 0
+        filas_procesadas = 0
+        archivo_errores = None
+        
+        try:
+            with open(ruta_archivo, 'r', newline='', encoding='utf-8') as archivo:
+                lector = csv.reader(archivo)
+                encabezado = next(lector, None)
+                if encabezado is None:
+                    return 0, 0
+                posiciones = {campo.strip(): i for i, campo in enumerate(encabezado)}
+                for campo in ('codigo', 'tipo', 'cantidad'):
+                    if campo not in posiciones:
+                        raise ValueError(f"Falta la columna obligatoria '{campo}'")
+                i_codigo, i_tipo, i_cantidad = posiciones['codigo'], posiciones['tipo'], posiciones['cantidad']
+                columnas_necesarias = max(i_codigo, i_tipo, i_cantidad) + 1
+                
+                if ruta_errores:
+                    archivo_errores = open(ruta_errores, 'w', newline='', encoding='utf-8')
+                    escritor_errores = csv.writer(archivo_errores)
+                    escritor_errores.writerow(['fila', 'motivo'] + encabezado)
+                
+                for lote in iter(lambda: list(islice(lector, tamano_lote)), []):
+                    # +2: el encabezado es la línea 1, así los números coinciden con el archivo
+                    primera_linea = filas_procesadas + 2
+                    # Las filas cortas pasan tal cual y registrar_movimientos las rechaza
+                    registros = [(fila[i_codigo].strip(), fila[i_tipo], fila[i_cantidad])
+                                 if len(fila) >= columnas_necesarias else fila for fila in lote]
+                    aplicados_lote, rechazados = self.registrar_movimientos(registros, primera_linea)
+                    aplicados += aplicados_lote
+                    filas_procesadas += len(lote)
+                    
+                    for numero, motivo in rechazados:
+                        fila = lote[numero - primera_linea]
+                        if not fila:
+                            continue
+                        total_rechazados += 1
+                        if archivo_errores:
+                            escritor_errores.writerow([numero, motivo] + fila)
+                    
+                    if callback_progreso:
+                        callback_progreso(filas_procesadas, aplicados, total_rechazados)
+        
+        except FileNotFoundError:
+            raise Exception(f"Archivo no encontrado: {ruta_archivo}")
+        except Exception as e:
+            raise Exception(f"Error al importar movimientos: {str(e)}")
+        finally:
+            if archivo_errores:
+                archivo_errores.close()
+        
+        if not ruta_errores:
+            self._avisar_rechazadas(ruta_archivo, total_rechazados)
+        return aplicados, total_rechazados
+    
+    def actualizar_precio(self, codigo: str, nuevo_precio: float) -> None:
+        producto = self.buscar_producto(codigo)
+        if nuevo_precio < 0:
+            raise ValueError("El precio no puede ser negativo")
+        self._antes_de_cambiar(producto)
+        producto.precio = nuevo_precio
+        self._despues_de_cambiar(producto)
+        if self._diario:
+            self._anotar('producto', **producto.to_dict())
+    
+    def cambiar_estado(self, codigo: str, activo: bool) -> None:
+        """Activa o desactiva un producto"""
+        producto = self.buscar_producto(codigo)
+        self._antes_de_cambiar(producto)
+        producto._activo = activo
+        self._despues_de_cambiar(producto)
+        if self._diario:
+            self._anotar('producto', **producto.to_dict())
+    
+    def buscar_producto(self, codigo: str) -> Producto:
+        producto = self._buscar_producto_por_codigo(codigo)
+        if not producto:
+            raise ValueError(f"Producto con código '{codigo}' no encontrado")
+        return producto
+    
+    def _buscar_producto_por_codigo(self, codigo: str) -> Optional[Producto]:
+        return self._indice_codigos.get(codigo)
+    
+    def _productos_por_codigos(self, codigos: List[str]) -> List[Producto]:
+        return [self._indice_codigos[codigo] for codigo in codigos]
+    
+    def buscar_por_nombre(self, nombre: str, limite: Optional[int] = None) -> List[Producto]:
+        """
+        Productos cuyo nombre contiene las palabras buscadas, sin distinguir mayúsculas ni
+        tildes, ordenados por relevancia (ver IndiceNombres.buscar)
+        """
+        return self._productos_por_codigos(self._indice_nombres.buscar(nombre, limite))
+    
+    def _nombres_catalogo(self) -> Iterator[tuple]:
+        """(codigo, nombre) de todo el catálogo, para armar el índice de nombres"""
+        return ((codigo, producto._nombre) for codigo, producto in self._indice_codigos.items())
+    
+    def _agregar_producto(self, producto: Producto) -> None:
+        """Agrega el producto a la lista y al índice por código"""
+        self._productos.append(producto)
+        self._indice_codigos[producto.codigo] = producto
+        self._indice_nombres.agregar(producto.codigo, producto.nombre)
+        self._despues_de_cambiar(producto)
+    
+    def _limpiar_productos(self) -> None:
+        """Elimina todos los productos de la lista y del índice"""
+        for codigo in self._indice_codigos:
+            self._marcar_cambio(codigo)
+        self._productos.clear()
+        self._indice_codigos.clear()
+        self._indice_nombres.limpiar()
+        self.recalcular_agregados()
+        self._notificar(None)
+    
+    def _indexar_lote(self, inicio: int, aceptados: List[tuple], epoch: int) -> None:
+        """Indexa el lote de _aplicar_movimientos, ya anexado al historial desde la posición `inicio`"""
+        if self._indexados != inicio:
+            # Hay movimientos anteriores sin indexar: el lote espera a _ponerse_al_dia
+            return
+        agregar_al_indice = self._indice_movimientos.agregar
+        for posicion, (_, codigo, _, _) in enumerate(aceptados, inicio):
+            agregar_al_indice(posicion, codigo, epoch)
+        self._sumar_estadisticas_lote(aceptados, epoch)
+        self._indexados = inicio + len(aceptados)
+    
+    def _agregar_movimiento(self, movimiento: MovimientoInventario) -> None:
+        posicion = len(self._historial_movimientos)
+        self._historial_movimientos.append(movimiento)
+        if self._indexados == posicion:
+            epoch = MovimientoInventario.fecha_a_epoch(movimiento.fecha)
+            self._indice_movimientos.agregar(posicion, movimiento.producto_codigo, epoch)
+            self._sumar_estadistica(movimiento.producto_codigo, movimiento.tipo, movimiento.cantidad, epoch)
+            self._indexados = posicion + 1
+    
+    def _sumar_estadistica(self, codigo: str, tipo: TipoMovimiento, cantidad: int, epoch: int) -> None:
+        estadisticas = self._estadisticas.get(codigo)
+        if estadisticas is None:
+            estadisticas = self._estadisticas[codigo] = EstadisticasProducto()
+        estadisticas.registrar(tipo, cantidad, epoch)
+    
+    def _sumar_estadisticas_lote(self, aceptados: List[tuple], epoch: int) -> None:
+        """Estadísticas de un lote de registrar_movimientos: las salidas de cada producto se suman juntas"""
+        salidas: Dict[str, List[int]] = defaultdict(list)
+        entrada = TipoMovimiento.ENTRADA
+        for _, codigo, tipo, cantidad in aceptados:
+            if tipo is entrada:
+                self._sumar_estadistica(codigo, tipo, cantidad, epoch)
+            else:
+                salidas[codigo].append(cantidad)
+        for codigo, cantidades in salidas.items():
+            estadisticas = self._estadisticas.get(codigo)
+            if estadisticas is None:
+                estadisticas = self._estadisticas[codigo] = EstadisticasProducto()
+            estadisticas.registrar_salidas(cantidades, epoch)
+    
+    def estadisticas_producto(self, codigo: str, ahora: Optional[datetime] = None) -> Optional[dict]:
+        """
+        Estadísticas en línea de los movimientos de un producto (ver EstadisticasProducto.to_dict),
+        o None si no tiene movimientos. No recorre el historial.
+        """
+        self._ponerse_al_dia()
+        estadisticas = self._estadisticas.get(codigo)
+        return estadisticas.to_dict(ahora) if estadisticas else None
+    
+    def estadisticas_movimientos(self, ahora: Optional[datetime] = None) -> Dict[str, dict]:
+        """Estadísticas en línea de todos los productos con movimientos, por código"""
+        self._ponerse_al_dia()
+        return {codigo: estadisticas.to_dict(ahora) for codigo, estadisticas in self._estadisticas.items()}
+    
+    def reporte_consumo(self) -> 'ReporteConsumo':
+        """ReporteConsumo de los productos activos, los de mayor tasa de consumo primero"""
+        return ReporteConsumo.ordenado(self.productos_activos, self.estadisticas_movimientos())
+    
+    def _incorporar_movimiento(self, movimiento: MovimientoInventario) -> None:
+        """Agrega al historial un movimiento importado (no modifica el stock)"""
+        self._agregar_movimiento(movimiento)
+        if self._diario:
+            self._anotar('movimiento', codigo=movimiento.producto_codigo, tipo=movimiento.tipo.value,
+                         cantidad=movimiento.cantidad, fecha=MovimientoInventario.fecha_a_epoch(movimiento.fecha))
+    
+    def _movimientos_en(self, posiciones: Iterable[int]) -> List[MovimientoInventario]:
+        historial = self._historial_movimientos
+        return [historial[i] for i in posiciones]
+    
+    def obtener_historial(self, ultimos: int = 20) -> List[MovimientoInventario]:
+        """Los `ultimos` movimientos más recientes, en orden de fecha"""
+        self._ponerse_al_dia()
+        return self._movimientos_en(self._indice_movimientos.posiciones(ultimos=ultimos))
+    
+    def historial_producto(self, codigo: str, ultimos: Optional[int] = None) -> List[MovimientoInventario]:
+        self._ponerse_al_dia()
+        return self._movimientos_en(self._indice_movimientos.posiciones(codigo, ultimos=ultimos))
+    
+    def movimientos_entre(self, desde: Optional[datetime] = None, hasta: Optional[datetime] = None,
+                          codigo: Optional[str] = None) -> List[MovimientoInventario]:
+        """Movimientos con desde <= fecha <= hasta (de uno o de todos los productos), en orden de fecha"""
+        self._ponerse_al_dia()
+        return self._movimientos_en(self._indice_movimientos.posiciones(codigo, desde, hasta))
+    
+    def exportar_csv(self, ruta_archivo: str, callback_progreso: Optional[Callable[[int], None]] = None,
+                     desde_marca: Optional[int] = None) -> int:
+        """
+        Exporta los productos a un archivo CSV; con `desde_marca`, solo los cambiados desde esa marca
+        (con lápidas para los borrados). Devuelve la marca que cubre el archivo.
+        """
+        # Se toma antes de leer: un cambio concurrente, a lo sumo, se exporta dos veces
+        marca = self.marca_cambios
+        try:
+            campos = ['codigo', 'nombre', 'precio', 'stock', 'stock_minimo', 'activo']
+            if desde_marca is None:
+                filas = (producto.to_dict() for producto in self._iterar_productos())
+            else:
+                cambiados, eliminados = self.cambios_desde(desde_marca)
+                campos.append('eliminado')
+                filas = chain((dict(producto.to_dict(), eliminado=False) for producto in cambiados),
+                              ({'codigo': codigo, 'eliminado': True} for codigo in eliminados))
+            
+            with open(ruta_archivo, 'w', newline='', encoding='utf-8') as archivo:
+                escritor = csv.DictWriter(archivo, fieldnames=campos)
+                
+                escritor.writeheader()
+                escritos = 0
+                for fila in filas:
+                    escritor.writerow(fila)
+                    escritos += 1
+                    if callback_progreso and escritos % 10000 == 0:
+                        callback_progreso(escritos)
+                if callback_progreso:
+                    callback_progreso(escritos)
+        except Exception as e:
+            raise Exception(f"Error al exportar CSV: {str(e)}")
+        return marca
+    
+    def _incorporar_producto(self, codigo: str, nombre: str, precio: float, stock: int, stock_minimo: int,
+                             activo: bool, actualizar_existentes: bool) -> Optional[bool]:
+        """
+        Crea el producto o actualiza el existente; devuelve True si es nuevo, False si se
+        actualizó y None si se omitió. Una fila idéntica al producto existente se omite sin
+        tocarlo: no cuenta como actualizada, no se anota, no se marca ni se avisa a nadie.
+        """
+        producto_existente = self._indice_codigos.get(codigo)
+        
+        if producto_existente:
+            if not actualizar_existentes:
+                return None
+            if (producto_existente._precio == precio and producto_existente._stock == stock
+                    and producto_existente._nombre == nombre and producto_existente._stock_minimo == stock_minimo
+                    and producto_existente._activo == activo):
+                return None
+            # Actualizar producto existente
+            self._antes_de_cambiar(producto_existente)
+            producto_existente._nombre = nombre
+            producto_existente._precio = precio
+            producto_existente._stock = stock
+            producto_existente._stock_minimo = stock_minimo
+            producto_existente._activo = activo
+            self._indice_nombres.agregar(codigo, nombre)
+            self._despues_de_cambiar(producto_existente)
+            if self._diario:
+                self._anotar('producto', **producto_existente.to_dict())
+            return False
+        
+        # Crear nuevo producto
+        producto = Producto(codigo, nombre, precio, stock, stock_minimo)
+        producto._activo = activo
+        self._agregar_producto(producto)
+        if self._diario:
+            self._anotar('producto', **producto.to_dict())
+        return True
+    
+    def fusionar(self, otro: 'Inventario', modo_importacion: str = 'agregar',
+                 incluir_movimientos: bool = False) -> tuple[int, int]:
+        """
+        Incorpora los productos de otro inventario (p. ej. uno cargado en segundo plano)
+        con los mismos modos que importar_csv, más 'nuevos', que solo agrega los códigos
+        que no existen (como importar_json). Devuelve (importados, actualizados).
+        """
+        productos_importados = 0
+        productos_actualizados = 0
+        
+        if modo_importacion == 'reemplazar':
+            self._limpiar_productos()
+            if self._diario:
+                self._anotar('limpiar')
+        
+        actualizar_existentes = modo_importacion in ('actualizar', 'agregar')
+        for producto in otro._iterar_productos():
+            resultado = self._incorporar_producto(producto.codigo, producto.nombre, producto.precio, producto.stock,
+                                                  producto.stock_minimo, producto.activo, actualizar_existentes)
+            if resultado is True:
+                productos_importados += 1
+            elif resultado is False:
+                productos_actualizados += 1
+        
+        if incluir_movimientos:
+            for movimiento in otro._iterar_movimientos():
+                self._incorporar_movimiento(movimiento)
+        
+        return productos_importados, productos_actualizados
+    
+    @staticmethod
+    def _compilar_conversor_csv(encabezado: List[str]) -> Callable[[List[str]], tuple]:
+        """
+        Función que convierte una fila del CSV en (codigo, nombre, precio, stock, stock_minimo, activo)
+        y lanza ErrorFilaCSV indicando el campo que no pudo convertirse (ver conversion_csv)
+        """
+        return compilar_conversor_csv(encabezado, Producto.STOCK_MINIMO_DEFAULT, Inventario.VALORES_VERDADEROS)
+    
+    def importar_csv(self, ruta_archivo: str, modo_importacion: str = 'agregar',
+                     tamano_lote: int = 10000, ruta_errores: Optional[str] = None,
+                     callback_progreso: Optional[Callable[[int, int, int, int], None]] = None) -> tuple[int, int]:
+        """
+        Importa productos desde un archivo CSV por lotes de `tamano_lote` filas
+        modos: 'agregar', 'reemplazar', 'actualizar'; las filas rechazadas van a `ruta_errores`
+        callback_progreso: (filas_procesadas, importados, actualizados, errores) tras cada lote
+        """
+        if tamano_lote <= 0:
+            raise ValueError("El tamaño de lote debe ser mayor a cero")
+        
+        productos_importados = 0
+        productos_actualizados = 0
+        filas_procesadas = 0
+        errores = 0
+        archivo_errores = None
+        
+        try:
+            with open(ruta_archivo, 'r', newline='', encoding='utf-8') as archivo:
+                lector = csv.reader(archivo)
+                encabezado = next(lector, None)
+                if encabezado is None:
+                    return 0, 0
+                convertir = self._compilar_conversor_csv(encabezado)
+                
+                if ruta_errores:
+                    archivo_errores = open(ruta_errores, 'w', newline='', encoding='utf-8')
+                    escritor_errores = csv.writer(archivo_errores)
+                    escritor_errores.writerow(['fila', 'campo', 'motivo'] + encabezado)
+                
+                if modo_importacion == 'reemplazar':
+                    self._limpiar_productos()
+                    if self._diario:
+                        self._anotar('limpiar')
+                
+                actualizar_existentes = modo_importacion in ('actualizar', 'agregar')
+                incorporar = self._incorporar_producto
+                
+                for lote in iter(lambda: list(islice(lector, tamano_lote)), []):
+                    for fila in lote:
+                        filas_procesadas += 1
+                        if not fila:
+                            continue
+                        
+                        try:
+                            codigo, nombre, precio, stock, stock_minimo, activo = convertir(fila)
+                        except ErrorFilaCSV as e:
+                            errores += 1
+                            # +1 por el encabezado: coincide con la línea del archivo
+                            if archivo_errores:
+                                escritor_errores.writerow([filas_procesadas + 1, e.campo, e.motivo] + fila)
+                            continue
+                        
+                        resultado = incorporar(codigo, nombre, precio, stock, stock_minimo, activo, actualizar_existentes)
+                        if resultado is True:
+                            productos_importados += 1
+                        elif resultado is False:
+                            productos_actualizados += 1
+                    
+                    if callback_progreso:
+                        callback_progreso(filas_procesadas, productos_importados, productos_actualizados, errores)
+                        
+        except FileNotFoundError:
+            raise Exception(f"Archivo no encontrado: {ruta_archivo}")
+        except Exception as e:
+            raise Exception(f"Error al importar CSV: {str(e)}")
+        finally:
+            if archivo_errores:
+                archivo_errores.close()
+        
+        if not ruta_errores:
+            self._avisar_rechazadas(ruta_archivo, errores)
+        return productos_importados, productos_actualizados
+    
+    @staticmethod
+    def _avisar_rechazadas(ruta_archivo: str, rechazadas: int) -> None:
+        """Sin archivo de errores, un solo aviso por consola en lugar de una línea por fila"""
+        if rechazadas:
+            print(f"{ruta_archivo}: {rechazadas} filas rechazadas (indique ruta_errores para ver el detalle)")
+    
+    @staticmethod
+    def _limites_csv(ruta_archivo: str, trozos: int) -> tuple[List[str], List[int]]:
+        """
+        Encabezado del CSV y desplazamientos en bytes que lo parten en hasta `trozos` partes.
+        Cada límite cae al final de un registro: un salto de línea con una cantidad par de
+        comillas antes (los saltos dentro de un campo entre comillas no cortan el registro).
+        """
+        tamano = os.path.getsize(ruta_archivo)
+        with open(ruta_archivo, 'rb') as archivo:
+            primera = archivo.readline()
+            encabezado = next(csv.reader([primera.decode('utf-8')]), None)
+            limites = [archivo.tell()]
+            for i in range(1, trozos):
+                objetivo = limites[0] + (tamano - limites[0]) * i // trozos
+                if objetivo <= limites[-1]:
+                    continue
+                archivo.seek(limites[-1])
+                entre_comillas = archivo.read(objetivo - limites[-1]).count(b'"') % 2
+                while True:
+                    linea = archivo.readline()
+                    entre_comillas = (entre_comillas + linea.count(b'"')) % 2
+                    if not linea or not entre_comillas:
+                        break
+                if archivo.tell() >= tamano:
+                    break
+                limites.append(archivo.tell())
+        limites.append(tamano)
+        return encabezado, limites
+    
+    def _incorporar_filas_csv(self, filas: List[tuple], modo_importacion: str) -> tuple[int, int]:
+        """Aplica en orden filas ya convertidas por _compilar_conversor_csv; devuelve (importados, actualizados)"""
+        importados = 0
+        actualizados = 0
+        actualizar_existentes = modo_importacion in ('actualizar', 'agregar')
+        incorporar = self._incorporar_producto
+        for codigo, nombre, precio, stock, stock_minimo, activo in filas:
+            resultado = incorporar(codigo, nombre, precio, stock, stock_minimo, activo, actualizar_existentes)
+            if resultado is True:
+                importados += 1
+            elif resultado is False:
+                actualizados += 1
+        return importados, actualizados
+    
+    def importar_csv_paralelo(self, ruta_archivo: str, modo_importacion: str = 'agregar',
+                              procesos: Optional[int] = None, ruta_errores: Optional[str] = None,
+                              callback_progreso: Optional[Callable[[int, int, int, int], None]] = None) -> tuple[int, int]:
+        """
+        Como importar_csv, pero las filas se convierten en `procesos` procesos (ver contexto_procesos).
+        Si los procesos no llegan a arrancar, se importa en este proceso con importar_csv.
+        """
+        procesos = procesos or os.cpu_count() or 1
+        if procesos <= 0:
+            raise ValueError("La cantidad de procesos debe ser mayor a cero")
+        
+        productos_importados = 0
+        productos_actualizados = 0
+        filas_procesadas = 0
+        errores = 0
+        archivo_errores = None
+        sin_procesos = False
+        
+        try:
+            trozos = max(procesos * 4, os.path.getsize(ruta_archivo) // self.TAMANO_TROZO_CSV)
+            encabezado, limites = self._limites_csv(ruta_archivo, trozos)
+            if encabezado is None:
+                return 0, 0
+            # Valida las columnas antes de lanzar los procesos
+            self._compilar_conversor_csv(encabezado)
+            
+            if ruta_errores:
+                archivo_errores = open(ruta_errores, 'w', newline='', encoding='utf-8')
+                escritor_errores = csv.writer(archivo_errores)
+                escritor_errores.writerow(['fila', 'campo', 'motivo'] + encabezado)
+            
+            if modo_importacion == 'reemplazar':
+                self._limpiar_productos()
+                if self._diario:
+                    self._anotar('limpiar')
+            
+            # Las tareas de los procesos solo necesitan conversion_csv
+            with ProcessPoolExecutor(max_workers=procesos, mp_context=contexto_procesos()) as ejecutor:
+                # A lo sumo dos trozos por proceso en vuelo: si aplicar es más lento que convertir,
+                # los resultados no se acumulan en memoria
+                pendientes = deque()
+                siguiente = 0
+                while pendientes or siguiente < len(limites) - 1:
+                    while siguiente < len(limites) - 1 and len(pendientes) < 2 * procesos:
+                        pendientes.append(ejecutor.submit(convertir_trozo_csv, ruta_archivo, limites[siguiente],
+                                                          limites[siguiente + 1], encabezado,
+                                                          Producto.STOCK_MINIMO_DEFAULT, self.VALORES_VERDADEROS))
+                        siguiente += 1
+                    try:
+                        filas, errores_trozo, registros = pendientes.popleft().result()
+                    except BrokenProcessPool:
+                        if filas_procesadas:
+                            raise
+                        # Ningún trozo aplicado todavía: los procesos no pudieron arrancar
+                        sin_procesos = True
+                        break
+                    
+                    errores += len(errores_trozo)
+                    if archivo_errores:
+                        # +1 por el encabezado: coincide con la línea del archivo, como en importar_csv
+                        escritor_errores.writerows([filas_procesadas + numero + 1, campo, motivo] + fila
+                                                   for numero, campo, motivo, fila in errores_trozo)
+                    filas_procesadas += registros
+                    
+                    importados, actualizados = self._incorporar_filas_csv(filas, modo_importacion)
+                    productos_importados += importados
+                    productos_actualizados += actualizados
+                    
+                    if callback_progreso:
+                        callback_progreso(filas_procesadas, productos_importados, productos_actualizados, errores)
+        
+        except FileNotFoundError:
+            raise Exception(f"Archivo no encontrado: {ruta_archivo}")
+        except Exception as e:
+            raise Exception(f"Error al importar CSV: {str(e)}")
+        finally:
+            if archivo_errores:
+                archivo_errores.close()
+        
+        if sin_procesos:
+            return self.importar_csv(ruta_archivo, modo_importacion, ruta_errores=ruta_errores,
+                                     callback_progreso=callback_progreso)
+        if not ruta_errores:
+            self._avisar_rechazadas(ruta_archivo, errores)
+        return productos_importados, productos_actualizados
+    
+    def exportar_txt(self, ruta_archivo: str, tipo_reporte: str = 'inventario',
+                     callback_progreso: Optional[Callable[[int], None]] = None) -> None:
+        """
+        Exporta reporte a archivo TXT
+        callback_progreso: se llama con las líneas escritas cada 1000 líneas (ver Reporte.escribir)
+        """
+        try:
+            if tipo_reporte == 'inventario':
+                # Generador sobre el almacén: el reporte no copia la lista de productos
+                reporte = ReporteInventario((p for p in self._iterar_productos() if p.activo), self.total_activos)
+            elif tipo_reporte == 'stock_bajo':
+                reporte = ReporteStockBajo(self.productos_stock_bajo, self.total_stock_bajo)
+            elif tipo_reporte == 'valor':
+                # Recorre el orden por valor que se conserva entre llamadas, sin ordenar el catálogo
+                reporte = ReporteValorInventario(self.iterar_ranking_valor(), self.valor_total,
+                                                 self.total_activos, ordenados=True)
+            elif tipo_reporte == 'historial':
+                reporte = ReporteHistorial(self.obtener_historial(100))  # Últimos 100 movimientos
+            elif tipo_reporte == 'consumo':
+                reporte = self.reporte_consumo()
+            else:
+                reporte = ReporteListadoSimple((p for p in self._iterar_productos() if p.activo), self.total_activos)
+            
+            with open(ruta_archivo, 'w', encoding='utf-8', buffering=1024 * 1024) as archivo:
+                reporte.escribir(archivo, callback_progreso)
+                
+        except Exception as e:
+            raise Exception(f"Error al exportar TXT: {str(e)}")
+    
+    def exportar_json(self, ruta_archivo: str, callback_progreso: Optional[Callable[[int], None]] = None) -> None:
+        """
+        Exporta todos los datos a JSON, registro por registro
+        callback_progreso: se llama cada 10000 registros y al final; si lanza, la exportación se corta
+        """
+        codificar = json.JSONEncoder(ensure_ascii=False).encode
+        # Productos y movimientos son diccionarios planos: el codificador en C, con el salto y
+        # la sangría de indent=2 como separador, da lo mismo que json.dump y bastante más rápido
+        codificar_registro = json.JSONEncoder(ensure_ascii=False, separators=(',\n      ', ': ')).encode
+        escritos = 0
+        try:
+            with open(ruta_archivo, 'w', encoding='utf-8', buffering=1024 * 1024) as archivo:
+                archivo.write('{')
+                for clave, registros in (('productos', (p.to_dict() for p in self._iterar_productos())),
+                                         ('movimientos', (m.to_dict() for m in self._iterar_movimientos()))):
+                    archivo.write(f'\n  "{clave}": [')
+                    separador = '\n    '
+                    for datos in registros:
+                        archivo.write(separador + '{\n      ' + codificar_registro(datos)[1:-1] + '\n    }')
+                        separador = ',\n    '
+                        escritos += 1
+                        if callback_progreso and escritos % 10000 == 0:
+                            callback_progreso(escritos)
+                    archivo.write('],' if separador == '\n    ' else '\n  ],')
+                archivo.write(f'\n  "fecha_exportacion": {codificar(datetime.now().strftime("%Y-%m-%d %H:%M:%S"))},'
+                              f'\n  "empresa": {codificar("TechNova Solutions S.A.")}\n}}')
+            
+            if callback_progreso:
+                callback_progreso(escritos)
+        except Exception as e:
+            raise Exception(f"Error al exportar JSON: {str(e)}")
+    
+    def importar_json(self, ruta_archivo: str) -> tuple[int, int]:
+        """Importa datos desde JSON"""
+        productos_importados = 0
+        
+        try:
+            with open(ruta_archivo, 'r', encoding='utf-8') as archivo:
+                datos = json.load(archivo)
+            
+            # Importar productos
+            if 'productos' in datos:
+                for producto_data in datos['productos']:
+                    try:
+                        producto = Producto.from_dict(producto_data)
+                        # Verificar si ya existe
+                        if not self._buscar_producto_por_codigo(producto.codigo):
+                            self._agregar_producto(producto)
+                            productos_importados += 1
+                            if self._diario:
+                                self._anotar('producto', **producto.to_dict())
+                    except Exception as e:
+                        print(f"Error al importar producto: {producto_data} - Error: {e}")
+                        continue
+            
+            # Importar movimientos (opcional)
+            if 'movimientos' in datos:
+                movimientos = []
+                for mov_data in datos['movimientos']:
+                    try:
+                        movimientos.append(MovimientoInventario(
+                            producto_codigo=mov_data['producto_codigo'],
+                            tipo=TipoMovimiento(mov_data['tipo']),
+                            cantidad=int(mov_data['cantidad']),
+                            # fromisoformat es mucho más rápido que strptime y acepta el mismo formato
+                            fecha=datetime.fromisoformat(mov_data['fecha']) if 'fecha' in mov_data else None
+                        ))
+                    except Exception as e:
+                        print(f"Error al importar movimiento: {mov_data} - Error: {e}")
+                        continue
+                # El archivo puede traerlos desordenados: ordenados por fecha casi todos se anexan al
+                # final del índice en vez de insertarse en medio (sort es estable para fechas iguales)
+                movimientos.sort(key=lambda m: m.fecha)
+                for movimiento in movimientos:
+                    self._incorporar_movimiento(movimiento)
+                        
+        except FileNotFoundError:
+            raise Exception(f"Archivo no encontrado: {ruta_archivo}")
+        except json.JSONDecodeError:
+            raise Exception("Error: El archivo JSON no tiene un formato válido")
+        except Exception as e:
+            raise Exception(f"Error al importar JSON: {str(e)}")
+        
+        return productos_importados, 0
+    
+    def exportar_jsonl(self, ruta_archivo: str, callback_progreso: Optional[Callable[[int], None]] = None) -> None:
+        """
+        Exporta en formato JSON Lines: una línea de encabezado y luego un objeto por
+        producto o movimiento (campo 'registro'). Se escribe en streaming, sin armar
+        todo el documento en memoria; las fechas de los movimientos van como epoch en µs.
+        """
+        codificar = json.JSONEncoder(ensure_ascii=False, separators=(',', ':')).encode
+        fecha_a_epoch = MovimientoInventario.fecha_a_epoch
+        escritos = 0
+        try:
+            with open(ruta_archivo, 'w', encoding='utf-8') as archivo:
+                archivo.write(codificar({
+                    'registro': 'encabezado',
+                    'version': 1,
+                    'fecha_exportacion': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+                    'empresa': 'TechNova Solutions S.A.'
+                }) + '\n')
+                
+                for producto in self._iterar_productos():
+                    datos = producto.to_dict()
+                    datos['registro'] = 'producto'
+                    archivo.write(codificar(datos) + '\n')
+                    escritos += 1
+                    if callback_progreso and escritos % 10000 == 0:
+                        callback_progreso(escritos)
+                
+                for movimiento in self._iterar_movimientos():
+                    archivo.write(codificar({
+                        'registro': 'movimiento',
+                        'producto_codigo': movimiento.producto_codigo,
+                        'tipo': movimiento.tipo.value,
+                        'cantidad': movimiento.cantidad,
+                        'fecha': fecha_a_epoch(movimiento.fecha)
+                    }) + '\n')
+                    escritos += 1
+                    if callback_progreso and escritos % 10000 == 0:
+                        callback_progreso(escritos)
+            
+            if callback_progreso:
+                callback_progreso(escritos)
+        except Exception as e:
+            raise Exception(f"Error al exportar JSON Lines: {str(e)}")
+    
+    def importar_jsonl(self, ruta_archivo: str,
+                       callback_progreso: Optional[Callable[[int], None]] = None) -> tuple[int, int]:
+        """
+        Importa un archivo JSON Lines línea por línea, como importar_json.
+        Devuelve (productos_importados, movimientos_importados).
+        """
+        productos_importados = 0
+        movimientos_importados = 0
+        tipos = {tipo.value: tipo for tipo in TipoMovimiento}
+        fecha_desde_epoch = MovimientoInventario.fecha_desde_epoch
+        
+        try:
+            with open(ruta_archivo, 'r', encoding='utf-8') as archivo:
+                for numero_linea, linea in enumerate(archivo, 1):
+                    if not linea.strip():
+                        continue
+                    try:
+                        datos = json.loads(linea)
+                        registro = datos.get('registro')
+                        if registro == 'movimiento':
+                            fecha = datos.get('fecha')
+                            if isinstance(fecha, int):
+                                fecha = fecha_desde_epoch(fecha)
+                            elif fecha is not None:
+                                fecha = datetime.fromisoformat(fecha)
+                            self._incorporar_movimiento(MovimientoInventario(
+                                datos['producto_codigo'], tipos[datos['tipo']], int(datos['cantidad']), fecha))
+                            movimientos_importados += 1
+                        elif registro == 'producto':
+                            if self._incorporar_producto(
+                                    datos['codigo'], datos['nombre'], float(datos['precio']), int(datos['stock']),
+                                    int(datos['stock_minimo']), bool(datos['activo']), False):
+                                productos_importados += 1
+                    except Exception as e:
+                        print(f"Error al importar línea {numero_linea}: {linea.strip()} - Error: {e}")
+                        continue
+                    
+                    if callback_progreso and numero_linea % 10000 == 0:
+                        callback_progreso(numero_linea)
+                        
+        except FileNotFoundError:
+            raise Exception(f"Archivo no encontrado: {ruta_archivo}")
+        except Exception as e:
+            raise Exception(f"Error al importar JSON Lines: {str(e)}")
+        
+        return productos_importados, movimientos_importados
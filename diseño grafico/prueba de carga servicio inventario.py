@@ -0,0 +1,74 @@
+import asyncio
+import random
+import time
+
+from cargador_inventario import cargar_servicio
+
+def percentil(valores: list, p: float) -> float:
+    ordenados = sorted(valores)
+    return ordenados[min(len(ordenados) - 1, int(len(ordenados) * p))]
+
+# -------------------------------
+# Carga: varias terminales con peticiones en paralelo
+# -------------------------------
+async def terminal(servicio, numero: int, peticiones: int, en_paralelo: int, cantidad_productos: int,
+                   latencias: list, errores: list, host: str, puerto: int):
+    aleatorio = random.Random(numero)
+    async with await servicio.ClienteInventario().conectar(host, puerto) as cliente:
+        async def una(_):
+            codigo = f"COD{aleatorio.randrange(cantidad_productos):07d}"
+            inicio = time.perf_counter_ns()
+            try:
+                if aleatorio.random() < 0.5:
+                    await cliente.salida_stock(codigo, aleatorio.randint(1, 5))
+                else:
+                    await cliente.entrada_stock(codigo, aleatorio.randint(1, 5))
+            except servicio.ErrorServicio:
+                errores.append(codigo)
+            latencias.append(time.perf_counter_ns() - inicio)
+
+        # Como mucho `en_paralelo` peticiones sin respuesta por terminal
+        pendientes = iter(range(peticiones))
+        async def trabajador():
+            for i in pendientes:
+                await una(i)
+        await asyncio.gather(*(trabajador() for _ in range(en_paralelo)))
+
+async def prueba(terminales: int = 20, peticiones_por_terminal: int = 5000, en_paralelo: int = 32,
+                 cantidad_productos: int = 10_000, host: str = '127.0.0.1', puerto: int = 8766):
+    servicio = cargar_servicio()
+
+    # Servidor en este mismo proceso, con un inventario en memoria
+    inventario = servicio.inv.Inventario()
+    for i in range(cantidad_productos):
+        inventario.registrar_producto(servicio.inv.Producto(f"COD{i:07d}", f"Producto {i}", 10.0, 20))
+    servidor = servicio.ServidorInventario(inventario)
+    await servidor.iniciar(host, puerto)
+
+    latencias: list = []
+    errores: list = []
+    inicio = time.perf_counter()
+    await asyncio.gather(*(terminal(servicio, n, peticiones_por_terminal, en_paralelo, cantidad_productos,
+                                    latencias, errores, host, puerto) for n in range(terminales)))
+    segundos = time.perf_counter() - inicio
+    await servidor.cerrar()
+
+    negativos = sum(1 for p in inventario.productos if p.stock < 0)
+    print("=" * 60)
+    print("PRUEBA DE CARGA - SERVICIO DE INVENTARIO".center(60))
+    print("=" * 60)
+    print(f"Terminales: {terminales} | Peticiones por terminal: {peticiones_por_terminal:,} | En paralelo: {en_paralelo}")
+    print("-" * 60)
+    print(f"Peticiones:              {len(latencias):>12,}")
+    print(f"Rechazadas (sin stock):  {len(errores):>12,}")
+    print(f"Peticiones por segundo:  {len(latencias) / segundos:>12,.0f}")
+    print(f"Latencia p50:            {percentil(latencias, 0.50) / 1e6:>12.2f} ms")
+    print(f"Latencia p99:            {percentil(latencias, 0.99) / 1e6:>12.2f} ms")
+    print(f"Productos con stock < 0: {negativos:>12}")
+    print("=" * 60)
+
+def main():
+    asyncio.run(prueba())
+
+if __name__ == "__main__":
+    main()
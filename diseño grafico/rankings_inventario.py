@@ -0,0 +1,130 @@
+from typing import Dict, Iterable, Iterator, List
+from itertools import chain
+from bisect import bisect_left
+
+# -------------------------------
+# Rankings: lista ordenada por cubetas y selección parcial
+# -------------------------------
+class ListaOrdenada:
+    """
+    Lista ordenada en cubetas de hasta 2 * CARGA elementos (como sortedcontainers): agregar
+    y quitar cuestan O(log n + CARGA). Los elementos deben ser únicos y comparables.
+    """
+    CARGA = 1000
+    
+    def __init__(self, elementos: Iterable = ()):
+        elementos = sorted(elementos)
+        self._cubetas = [elementos[i:i + self.CARGA] for i in range(0, len(elementos), self.CARGA)]
+        self._maximos = [cubeta[-1] for cubeta in self._cubetas]
+        self._largo = len(elementos)
+    
+    def __len__(self) -> int:
+        return self._largo
+    
+    def __iter__(self) -> Iterator:
+        return chain.from_iterable(self._cubetas)
+    
+    def agregar(self, elemento) -> None:
+        self._largo += 1
+        if not self._cubetas:
+            self._cubetas.append([elemento])
+            self._maximos.append(elemento)
+            return
+        i = bisect_left(self._maximos, elemento)
+        if i == len(self._cubetas):
+            i -= 1
+            self._cubetas[i].append(elemento)
+            self._maximos[i] = elemento
+        else:
+            cubeta = self._cubetas[i]
+            cubeta.insert(bisect_left(cubeta, elemento), elemento)
+        cubeta = self._cubetas[i]
+        if len(cubeta) > 2 * self.CARGA:
+            self._cubetas.insert(i + 1, cubeta[self.CARGA:])
+            del cubeta[self.CARGA:]
+            self._maximos.insert(i, cubeta[-1])
+    
+    def quitar(self, elemento) -> None:
+        i = bisect_left(self._maximos, elemento)
+        cubeta = self._cubetas[i] if i < len(self._cubetas) else None
+        j = bisect_left(cubeta, elemento) if cubeta else 0
+        if cubeta is None or j == len(cubeta) or cubeta[j] != elemento:
+            raise ValueError(f"{elemento!r} no está en la lista")
+        del cubeta[j]
+        self._largo -= 1
+        if not cubeta:
+            del self._cubetas[i]
+            del self._maximos[i]
+        elif j == len(cubeta):
+            self._maximos[i] = cubeta[-1]
+    
+    def tramo(self, inicio: int, fin: int) -> Iterator:
+        """Elementos en las posiciones [inicio, fin)"""
+        for cubeta in self._cubetas:
+            if inicio >= fin:
+                return
+            if inicio >= len(cubeta):
+                inicio -= len(cubeta)
+                fin -= len(cubeta)
+                continue
+            yield from cubeta[inicio:min(fin, len(cubeta))]
+            fin -= len(cubeta)
+            inicio = 0
+
+def _umbral_mayores(valores: List[float], objetivo: float) -> float:
+    """
+    Valor u tal que los valores mayores que u suman menos que `objetivo` y, sumando los
+    iguales a u, lo alcanzan. Como quickselect: cada pasada se queda solo con la parte
+    donde está u (O(n) esperado, sin ordenar). -inf si ni sumando todos se alcanza.
+    """
+    acumulado = 0.0
+    while valores:
+        pivote = valores[len(valores) // 2]
+        mayores = [v for v in valores if v > pivote]
+        suma_mayores = sum(mayores)
+        if acumulado + suma_mayores >= objetivo:
+            valores = mayores
+            continue
+        menores = [v for v in valores if v < pivote]
+        acumulado += suma_mayores + pivote * (len(valores) - len(mayores) - len(menores))
+        if acumulado >= objetivo:
+            return pivote
+        valores = menores
+    return float('-inf')
+
+def _seleccionar_mayores(valores: List[tuple], objetivo: float) -> tuple[list, list]:
+    """
+    Separa pares (valor, codigo) en los de mayor valor cuya suma alcanza `objetivo` y el
+    resto, sin ordenar (ver _umbral_mayores). Entre valores iguales se eligen primero los de menor código.
+    """
+    # Tolerancia para que el redondeo de la suma no agregue un producto de más
+    objetivo -= abs(objetivo) * 1e-12
+    if objetivo <= 0:
+        return [], valores
+    umbral = _umbral_mayores([par[0] for par in valores], objetivo)
+    elegidos = [par for par in valores if par[0] > umbral]
+    resto = [par for par in valores if par[0] < umbral]
+    faltante = objetivo - sum(par[0] for par in elegidos)
+    iguales = sorted((par for par in valores if par[0] == umbral), key=lambda par: par[1])
+    for i, par in enumerate(iguales):
+        if faltante <= 0:
+            resto += iguales[i:]
+            break
+        elegidos.append(par)
+        faltante -= par[0]
+    return elegidos, resto
+
+def clasificar_abc(valores: List[tuple], umbrales: tuple[float, float] = (0.80, 0.95)) -> Dict[str, List[str]]:
+    """
+    Clasificación ABC (Pareto) de pares (valor, codigo): A son los de mayor valor hasta
+    acumular umbrales[0] del total, B los siguientes hasta umbrales[1] y C el resto.
+    Devuelve los códigos de cada clase, sin ordenar.
+    """
+    total = sum(par[0] for par in valores)
+    if total <= 0:
+        return {'A': [], 'B': [], 'C': [codigo for _, codigo in valores]}
+    clase_a, resto = _seleccionar_mayores(valores, umbrales[0] * total)
+    suma_a = sum(par[0] for par in clase_a)
+    clase_b, clase_c = _seleccionar_mayores(resto, umbrales[1] * total - suma_a)
+    return {'A': [codigo for _, codigo in clase_a], 'B': [codigo for _, codigo in clase_b],
+            'C': [codigo for _, codigo in clase_c]}
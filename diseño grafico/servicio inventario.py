@@ -0,0 +1,370 @@
+import asyncio
+import itertools
+import json
+import os
+from typing import Dict, List, Optional
+
+from cargador_inventario import cargar_inventario
+
+inv = cargar_inventario()
+
+# -------------------------------
+# Error devuelto por el servicio
+# -------------------------------
+class ErrorServicio(Exception):
+    pass
+
+# -------------------------------
+# Servidor asyncio (JSON por líneas)
+# -------------------------------
+class ServidorInventario:
+    """
+    Expone un Inventario por TCP o socket Unix. Cada línea es una petición JSON
+    {"id": ..., "op": ..., ...} y se responde con {"id": ..., "ok": true, "resultado": ...}
+    o {"id": ..., "ok": false, "error": "..."}; un cliente puede enviar varias peticiones
+    sin esperar respuesta (las respuestas llegan en el orden en que terminan).
+
+    Las entradas y salidas de todos los clientes se juntan en una cola y se aplican en
+    lotes de hasta `tamano_lote` con Inventario.registrar_movimientos. Contrapresión: la
+    cola tiene capacidad `max_pendientes` y cada conexión admite `max_en_vuelo`
+    peticiones sin responder; al llegar a cualquiera de los límites se deja de leer
+    el socket de ese cliente hasta que haya lugar.
+
+    Al cerrar se dejan de aceptar movimientos, se aplican los que ya estaban en la cola
+    y se envían sus respuestas antes de cortar las conexiones.
+
+    Operaciones: registrar, entrada, salida, buscar, buscar_nombre, reporte, historial, resumen.
+    """
+    # Segundos que se esperan las respuestas pendientes al cerrar
+    ESPERA_CIERRE = 5.0
+
+    REPORTES = {
+        'inventario': lambda i: inv.ReporteInventario(i.productos_activos),
+        'stock_bajo': lambda i: inv.ReporteStockBajo(i.productos_stock_bajo),
+        'valor': lambda i: inv.ReporteValorInventario(i.productos_activos, i.valor_total),
+        'historial': lambda i: inv.ReporteHistorial(i.obtener_historial(100)),
+    }
+
+    def __init__(self, inventario: 'inv.Inventario', tamano_lote: int = 1000,
+                 max_pendientes: int = 10000, max_en_vuelo: int = 256):
+        self.inventario = inventario
+        self.tamano_lote = tamano_lote
+        self.max_en_vuelo = max_en_vuelo
+        self._cola: Optional[asyncio.Queue] = None
+        self._max_pendientes = max_pendientes
+        self._servidor: Optional[asyncio.AbstractServer] = None
+        self._tarea_lotes: Optional[asyncio.Task] = None
+        self._cerrando = False
+        self._respuestas: set = set()
+        self._escritores: set = set()
+        self._operaciones = {
+            'registrar': self._op_registrar,
+            'buscar': self._op_buscar,
+            'buscar_nombre': self._op_buscar_nombre,
+            'reporte': self._op_reporte,
+            'historial': self._op_historial,
+            'resumen': self._op_resumen,
+        }
+
+    async def iniciar(self, host: str = '127.0.0.1', puerto: int = 8765, ruta_unix: Optional[str] = None):
+        """Empieza a escuchar (en ruta_unix si se indica; si no, en host:puerto)"""
+        self._cola = asyncio.Queue(self._max_pendientes)
+        self._tarea_lotes = asyncio.create_task(self._aplicar_lotes())
+        if ruta_unix:
+            self._servidor = await asyncio.start_unix_server(self._atender, path=ruta_unix)
+        else:
+            self._servidor = await asyncio.start_server(self._atender, host, puerto)
+        return self._servidor
+
+    async def cerrar(self) -> None:
+        self._cerrando = True
+        if self._servidor:
+            self._servidor.close()
+        if self._tarea_lotes:
+            self._tarea_lotes.cancel()
+            try:
+                await self._tarea_lotes
+            except asyncio.CancelledError:
+                pass
+            self._tarea_lotes = None
+        if self._cola is not None:
+            await self._vaciar_cola()
+        # Las respuestas de lo ya aplicado salen antes de cortar las conexiones
+        if self._respuestas:
+            await asyncio.wait(set(self._respuestas), timeout=self.ESPERA_CIERRE)
+        for escritor in list(self._escritores):
+            escritor.close()
+        if self._servidor:
+            await self._servidor.wait_closed()
+            self._servidor = None
+
+    async def _vaciar_cola(self) -> None:
+        """Aplica lo que quedó en la cola, incluidos los envíos que esperaban lugar en ella"""
+        cola = self._cola
+        while not cola.empty():
+            while not cola.empty():
+                lote = []
+                while len(lote) < self.tamano_lote and not cola.empty():
+                    lote.append(cola.get_nowait())
+                self._aplicar_lote(lote)
+            # Al liberar lugar se despiertan los put() bloqueados; se les deja encolar
+            await asyncio.sleep(0)
+
+    # --- Conexiones ---
+    async def _atender(self, lector: asyncio.StreamReader, escritor: asyncio.StreamWriter) -> None:
+        en_vuelo = asyncio.Semaphore(self.max_en_vuelo)
+        tareas = set()
+        self._escritores.add(escritor)
+        try:
+            while True:
+                linea = await lector.readline()
+                if not linea:
+                    break
+                if not linea.strip():
+                    continue
+                await en_vuelo.acquire()
+                tarea = asyncio.create_task(self._responder(linea, escritor, en_vuelo))
+                tareas.add(tarea)
+                tarea.add_done_callback(tareas.discard)
+                self._respuestas.add(tarea)
+                tarea.add_done_callback(self._respuestas.discard)
+            if tareas:
+                await asyncio.gather(*tareas)
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            for tarea in tareas:
+                tarea.cancel()
+            self._escritores.discard(escritor)
+            escritor.close()
+
+    async def _responder(self, linea: bytes, escritor: asyncio.StreamWriter, en_vuelo: asyncio.Semaphore) -> None:
+        id_peticion = None
+        try:
+            peticion = json.loads(linea)
+            id_peticion = peticion.get('id')
+            respuesta = {'id': id_peticion, 'ok': True, 'resultado': await self._ejecutar(peticion)}
+        except Exception as e:
+            respuesta = {'id': id_peticion, 'ok': False, 'error': str(e)}
+        finally:
+            en_vuelo.release()
+        if escritor.is_closing():
+            return
+        escritor.write(json.dumps(respuesta, ensure_ascii=False).encode('utf-8') + b'\n')
+        await escritor.drain()
+
+    async def _ejecutar(self, peticion: dict):
+        operacion = peticion.get('op')
+        if operacion in ('entrada', 'salida'):
+            if self._cerrando:
+                raise ErrorServicio("El servicio se está cerrando")
+            futuro = asyncio.get_running_loop().create_future()
+            # Si la cola está llena, esta espera frena la lectura del cliente (contrapresión)
+            await self._cola.put(((peticion['codigo'], operacion, peticion['cantidad']), futuro))
+            return await futuro
+        funcion = self._operaciones.get(operacion)
+        if funcion is None:
+            raise ErrorServicio(f"Operación desconocida: '{operacion}'")
+        return funcion(peticion)
+
+    # --- Movimientos por lotes ---
+    async def _aplicar_lotes(self) -> None:
+        cola = self._cola
+        while True:
+            lote = [await cola.get()]
+            while len(lote) < self.tamano_lote and not cola.empty():
+                lote.append(cola.get_nowait())
+            self._aplicar_lote(lote)
+
+    def _aplicar_lote(self, lote: list) -> None:
+        """Registra un lote de ((codigo, tipo, cantidad), futuro) y resuelve cada futuro"""
+        try:
+            _, rechazados = self.inventario.registrar_movimientos(registro for registro, _ in lote)
+        except Exception as e:
+            for _, futuro in lote:
+                if not futuro.done():
+                    futuro.set_exception(ErrorServicio(str(e)))
+            return
+
+        motivos = dict(rechazados)
+        for numero, (registro, futuro) in enumerate(lote, 1):
+            if futuro.done():
+                continue
+            if numero in motivos:
+                futuro.set_exception(ErrorServicio(motivos[numero]))
+            else:
+                futuro.set_result(self._stock(registro[0]))
+
+    def _stock(self, codigo: str) -> int:
+        return self.inventario.buscar_producto(codigo).stock
+
+    # --- Resto de operaciones (rápidas: se ejecutan en el bucle) ---
+    def _op_registrar(self, peticion: dict) -> dict:
+        datos = peticion['producto']
+        producto = inv.Producto(datos['codigo'], datos['nombre'], float(datos['precio']),
+                                int(datos.get('stock', 0)),
+                                int(datos.get('stock_minimo', inv.Producto.STOCK_MINIMO_DEFAULT)))
+        self.inventario.registrar_producto(producto)
+        return producto.to_dict()
+
+    def _op_buscar(self, peticion: dict) -> dict:
+        return self.inventario.buscar_producto(peticion['codigo']).to_dict()
+
+    def _op_buscar_nombre(self, peticion: dict) -> List[dict]:
+        return [p.to_dict() for p in self.inventario.buscar_por_nombre(peticion['texto'], peticion.get('limite', 50))]
+
+    def _op_reporte(self, peticion: dict) -> str:
+        tipo = peticion.get('tipo', 'inventario')
+        if tipo not in self.REPORTES:
+            raise ErrorServicio(f"Tipo de reporte desconocido: '{tipo}'")
+        return self.REPORTES[tipo](self.inventario).generar()
+
+    def _op_historial(self, peticion: dict) -> List[dict]:
+        ultimos = peticion.get('ultimos', 20)
+        codigo = peticion.get('codigo')
+        if codigo:
+            movimientos = self.inventario.historial_producto(codigo, ultimos)
+        else:
+            movimientos = self.inventario.obtener_historial(ultimos)
+        return [m.to_dict() for m in movimientos]
+
+    def _op_resumen(self, peticion: dict) -> dict:
+        return {
+            'total_productos': self.inventario.total_productos,
+            'total_activos': self.inventario.total_activos,
+            'total_stock_bajo': self.inventario.total_stock_bajo,
+            'valor_total': self.inventario.valor_total,
+        }
+
+# -------------------------------
+# Cliente asyncio
+# -------------------------------
+class ClienteInventario:
+    """
+    Cliente del ServidorInventario. Las llamadas pueden hacerse en paralelo desde
+    varias tareas sobre la misma conexión: cada petición lleva un id y una tarea
+    lectora entrega cada respuesta a quien la espera.
+    """
+
+    # Segundos que se espera a la tarea lectora al cerrar
+    ESPERA_CIERRE = 5.0
+
+    def __init__(self):
+        self._lector: Optional[asyncio.StreamReader] = None
+        self._escritor: Optional[asyncio.StreamWriter] = None
+        self._pendientes: Dict[int, asyncio.Future] = {}
+        self._ids = itertools.count(1)
+        self._tarea_lectora: Optional[asyncio.Task] = None
+
+    async def conectar(self, host: str = '127.0.0.1', puerto: int = 8765, ruta_unix: Optional[str] = None):
+        if ruta_unix:
+            self._lector, self._escritor = await asyncio.open_unix_connection(ruta_unix)
+        else:
+            self._lector, self._escritor = await asyncio.open_connection(host, puerto)
+        self._tarea_lectora = asyncio.create_task(self._leer_respuestas())
+        return self
+
+    async def cerrar(self) -> None:
+        if self._escritor:
+            self._escritor.close()
+            await self._escritor.wait_closed()
+            self._escritor = None
+        if self._tarea_lectora:
+            try:
+                # Al vencer la espera se cancela la tarea, que falla las peticiones pendientes
+                await asyncio.wait_for(self._tarea_lectora, self.ESPERA_CIERRE)
+            except asyncio.TimeoutError:
+                pass
+            self._tarea_lectora = None
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *excepcion):
+        await self.cerrar()
+
+    async def _leer_respuestas(self) -> None:
+        try:
+            async for linea in self._lector:
+                respuesta = json.loads(linea)
+                futuro = self._pendientes.pop(respuesta.get('id'), None)
+                if futuro is None or futuro.done():
+                    continue
+                if respuesta['ok']:
+                    futuro.set_result(respuesta.get('resultado'))
+                else:
+                    futuro.set_exception(ErrorServicio(respuesta['error']))
+        except ConnectionError:
+            pass
+        finally:
+            for futuro in self._pendientes.values():
+                if not futuro.done():
+                    futuro.set_exception(ConnectionError("Conexión cerrada por el servidor"))
+            self._pendientes.clear()
+
+    async def llamar(self, operacion: str, **datos):
+        """Envía una petición y espera su resultado; los errores del servidor se lanzan como ErrorServicio"""
+        if not self._escritor:
+            raise ConnectionError("El cliente no está conectado")
+        id_peticion = next(self._ids)
+        futuro = asyncio.get_running_loop().create_future()
+        self._pendientes[id_peticion] = futuro
+        datos['id'] = id_peticion
+        datos['op'] = operacion
+        self._escritor.write(json.dumps(datos, ensure_ascii=False).encode('utf-8') + b'\n')
+        await self._escritor.drain()
+        return await futuro
+
+    async def registrar_producto(self, codigo: str, nombre: str, precio: float,
+                                 stock: int = 0, stock_minimo: int = 5) -> dict:
+        return await self.llamar('registrar', producto={'codigo': codigo, 'nombre': nombre, 'precio': precio,
+                                                        'stock': stock, 'stock_minimo': stock_minimo})
+
+    async def entrada_stock(self, codigo: str, cantidad: int) -> int:
+        """Devuelve el stock del producto después de aplicar el lote que incluyó el movimiento"""
+        return await self.llamar('entrada', codigo=codigo, cantidad=cantidad)
+
+    async def salida_stock(self, codigo: str, cantidad: int) -> int:
+        """Devuelve el stock del producto después de aplicar el lote que incluyó el movimiento"""
+        return await self.llamar('salida', codigo=codigo, cantidad=cantidad)
+
+    async def buscar_producto(self, codigo: str) -> dict:
+        return await self.llamar('buscar', codigo=codigo)
+
+    async def buscar_por_nombre(self, texto: str, limite: int = 50) -> List[dict]:
+        return await self.llamar('buscar_nombre', texto=texto, limite=limite)
+
+    async def reporte(self, tipo: str = 'inventario') -> str:
+        return await self.llamar('reporte', tipo=tipo)
+
+    async def historial(self, ultimos: int = 20, codigo: Optional[str] = None) -> List[dict]:
+        return await self.llamar('historial', ultimos=ultimos, codigo=codigo)
+
+    async def resumen(self) -> dict:
+        return await self.llamar('resumen')
+
+# -------------------------------
+# Función principal
+# -------------------------------
+DIRECTORIO_DATOS = os.path.join(os.path.dirname(os.path.abspath(__file__)), "datos_technova_servicio")
+
+async def servir(host: str = '127.0.0.1', puerto: int = 8765, ruta_unix: Optional[str] = None):
+    inventario = inv.Inventario()
+    inventario.usar_diario(inv.DiarioInventario(DIRECTORIO_DATOS))
+    servidor = ServidorInventario(inventario)
+    try:
+        await servidor.iniciar(host, puerto, ruta_unix)
+        print(f"Servicio de inventario escuchando en {ruta_unix or f'{host}:{puerto}'}")
+        await asyncio.Event().wait()
+    finally:
+        await servidor.cerrar()
+        inventario.cerrar()
+
+def main():
+    try:
+        asyncio.run(servir())
+    except KeyboardInterrupt:
+        pass
+
+if __name__ == "__main__":
+    main()
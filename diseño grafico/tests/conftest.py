@@ -0,0 +1,24 @@
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from cargador_inventario import cargar_inventario
+
+@pytest.fixture(scope='session')
+def inv():
+    """El módulo 'inventario con tkinder.py' (el mismo para todas las pruebas)"""
+    return cargar_inventario()
+
+def escribir_csv(ruta, filas, encabezado=('codigo', 'nombre', 'precio', 'stock', 'stock_minimo', 'activo')):
+    with open(ruta, 'w', newline='', encoding='utf-8') as archivo:
+        archivo.write(','.join(encabezado) + '\n')
+        for fila in filas:
+            archivo.write(','.join(str(valor) for valor in fila) + '\n')
+    return str(ruta)
+
+def estado(inventario) -> list:
+    """Contenido del catálogo, ordenado por código, para comparar inventarios"""
+    return sorted(tuple(p.to_dict().values()) for p in inventario.productos)
@@ -0,0 +1,30 @@
+from conftest import escribir_csv
+
+FILAS = [
+    ("A1", "Cámara réflex", 900.0, 4, 2, True),
+    ("B2", "Cable HDMI", 12.0, 40, 5, True),
+    ("C3", "Camiseta", 20.0, 9, 5, True),
+]
+
+def test_indice_de_nombres_se_arma_en_la_primera_busqueda(inv, tmp_path):
+    ruta = escribir_csv(tmp_path / "productos.csv", FILAS)
+    for clase in (inv.Inventario, inv.InventarioConcurrente, inv.InventarioSQLite):
+        inventario = clase()
+        try:
+            inventario.importar_csv(ruta)
+            # La importación no indexa fila por fila
+            assert not inventario._indice_nombres._armado
+            assert [p.codigo for p in inventario.buscar_por_nombre("cam")] == ["A1", "C3"]
+
+            # Armado, sigue los cambios de nombre y los productos nuevos
+            inventario._incorporar_producto("B2", "Cámara web", 30.0, 8, 5, True, True)
+            inventario.registrar_producto(inv.Producto("D4", "Cargador", 15.0, 3))
+            assert [p.codigo for p in inventario.buscar_por_nombre("camara")] == ["A1", "B2"]
+            assert [p.codigo for p in inventario.buscar_por_nombre("carg")] == ["D4"]
+
+            # Reemplazar el catálogo lo deja otra vez sin armar
+            inventario.importar_csv(ruta, 'reemplazar')
+            assert not inventario._indice_nombres._armado
+            assert [p.codigo for p in inventario.buscar_por_nombre("hdmi")] == ["B2"]
+        finally:
+            inventario.cerrar()
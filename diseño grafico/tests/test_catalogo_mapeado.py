@@ -0,0 +1,47 @@
+import random
+
+def _catalogo(inv, tmp_path, cantidad: int = 10_000):
+    aleatorio = random.Random(6)
+    original = inv.Inventario()
+    for i in range(cantidad):
+        original._incorporar_producto(f"P{i:05d}", f"Producto {i}", 2.0, aleatorio.randint(0, 40), 5,
+                                      aleatorio.random() < 0.8, False)
+    ruta = str(tmp_path / "catalogo.bin")
+    original.guardar_instantanea(ruta)
+    return original, ruta
+
+def _paginas(inventario, tamano: int) -> list:
+    return [[p.codigo for p in inventario.pagina_activos(inicio, tamano)]
+            for inicio in range(0, inventario.total_activos + tamano, tamano)]
+
+def test_el_arranque_no_arma_productos(inv, tmp_path):
+    _, ruta = _catalogo(inv, tmp_path)
+    mapeado = inv.InventarioMapeado(ruta)
+    assert mapeado.total_productos == 10_000
+    pagina = mapeado.pagina_activos(7_000, 30)
+    assert len(pagina) == 30
+    # Solo se armaron los productos de la página
+    assert len(mapeado._indice_codigos._cargados) == 30
+
+def test_paginas_iguales_a_productos_activos(inv, tmp_path):
+    original, ruta = _catalogo(inv, tmp_path)
+    mapeado = inv.InventarioMapeado(ruta)
+    aleatorio = random.Random(8)
+    # Cambios de estado sobre productos ya armados (la columna de la instantánea queda vieja) y nuevos al final
+    for _ in range(300):
+        codigo = f"P{aleatorio.randrange(10_000):05d}"
+        activo = aleatorio.random() < 0.5
+        original.cambiar_estado(codigo, activo)
+        mapeado.cambiar_estado(codigo, activo)
+    for i in range(50):
+        for inventario in (original, mapeado):
+            inventario.registrar_producto(inv.Producto(f"N{i:03d}", "Nuevo", 1.0, 3))
+    mapeado.cambiar_estado("N007", False)
+    original.cambiar_estado("N007", False)
+
+    esperado = [p.codigo for p in original.productos_activos]
+    for tamano in (37, 4096, 5000):
+        paginas = _paginas(mapeado, tamano)
+        assert [codigo for pagina in paginas for codigo in pagina] == esperado
+        assert paginas == _paginas(original, tamano)
+    assert mapeado.pagina_activos(0, 0) == []
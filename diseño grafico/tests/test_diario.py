@@ -0,0 +1,72 @@
+import os
+from datetime import datetime
+
+import pytest
+
+from conftest import estado
+
+def _historial(inventario) -> list:
+    return [(m.producto_codigo, m.tipo, m.cantidad, m.fecha) for m in inventario.obtener_historial(10_000)]
+
+def _cargar_movimientos(inv, inventario):
+    inventario.registrar_producto(inv.Producto("A1", "Laptop", 1000.0, 10, 2))
+    inventario.registrar_producto(inv.Producto("B2", "Mouse", 25.5, 50))
+    inventario.entrada_stock("A1", 5)
+    inventario.salida_stock("B2", 7)
+    inventario.actualizar_precio("B2", 30.0)
+    inventario.cambiar_estado("A1", False)
+    inventario.registrar_movimientos([("B2", "salida", 3), ("A1", "Entrada", 2), ("B2", "salida", 999)])
+
+def test_reaplica_el_diario_al_reabrir(inv, tmp_path):
+    original = inv.Inventario()
+    original.usar_diario(inv.DiarioInventario(str(tmp_path), intervalo_fsync=0))
+    _cargar_movimientos(inv, original)
+    original.cerrar()
+
+    restaurado = inv.Inventario()
+    reaplicados = restaurado.usar_diario(inv.DiarioInventario(str(tmp_path), intervalo_fsync=0))
+    restaurado.cerrar()
+
+    assert reaplicados > 0
+    assert estado(restaurado) == estado(original)
+    assert _historial(restaurado) == _historial(original)
+    assert restaurado.valor_total == original.valor_total
+
+def test_ignora_una_ultima_linea_incompleta(inv, tmp_path):
+    original = inv.Inventario()
+    diario = inv.DiarioInventario(str(tmp_path), intervalo_fsync=0)
+    original.usar_diario(diario)
+    _cargar_movimientos(inv, original)
+    original.cerrar()
+    with open(diario.ruta_diario, 'a', encoding='utf-8') as archivo:
+        archivo.write('{"op": "entrada", "codigo": "A1", "cant')
+
+    restaurado = inv.Inventario()
+    restaurado.usar_diario(inv.DiarioInventario(str(tmp_path), intervalo_fsync=0))
+    restaurado.cerrar()
+    assert estado(restaurado) == estado(original)
+
+@pytest.mark.parametrize('historial_compacto', [False, True])
+def test_instantanea_ida_y_vuelta(inv, tmp_path, historial_compacto):
+    for catalogo_binario in (False, True):
+        directorio = str(tmp_path / f"binario-{catalogo_binario}")
+        original = inv.Inventario(historial_compacto)
+        # Instantánea cada 4 registros: el estado queda repartido entre instantánea y diario
+        original.usar_diario(inv.DiarioInventario(directorio, intervalo_fsync=0, snapshot_cada=4,
+                                                  catalogo_binario=catalogo_binario))
+        _cargar_movimientos(inv, original)
+        original._incorporar_movimiento(inv.MovimientoInventario("A1", inv.TipoMovimiento.SALIDA, 1,
+                                                                 datetime(2020, 1, 1, 12, 0)))
+        original.cerrar()
+        assert os.path.exists(os.path.join(directorio, inv.DiarioInventario.ARCHIVO_SNAPSHOT))
+
+        restaurado = inv.Inventario(historial_compacto)
+        restaurado.usar_diario(inv.DiarioInventario(directorio, intervalo_fsync=0))
+        restaurado.cerrar()
+        # El historial binario se copia sin indexar: el índice se arma en la primera consulta
+        assert (restaurado._indexados == 0) == catalogo_binario
+        assert estado(restaurado) == estado(original)
+        assert _historial(restaurado) == _historial(original)
+        ahora = datetime(2030, 1, 1)
+        esperadas = original.estadisticas_movimientos(ahora)
+        assert restaurado.estadisticas_movimientos(ahora) == {codigo: pytest.approx(datos) for codigo, datos in esperadas.items()}
@@ -0,0 +1,50 @@
+import json
+
+import pytest
+
+def _inventario(inv, cantidad: int):
+    inventario = inv.Inventario(historial_compacto=True)
+    for i in range(cantidad):
+        inventario.registrar_producto(inv.Producto(f"P{i:06d}", f"Producto \"{i}\", ñ\n", 2.5, 10 + i % 7, 12))
+    inventario.registrar_movimientos([(f"P{i:06d}", "salida", 1) for i in range(0, cantidad, 3)])
+    return inventario
+
+def test_json_igual_que_json_dump(inv, tmp_path):
+    for cantidad in (0, 1, 25):
+        ruta = tmp_path / f"datos-{cantidad}.json"
+        avances = []
+        _inventario(inv, cantidad).exportar_json(str(ruta), avances.append)
+        texto = ruta.read_text(encoding='utf-8')
+        datos = json.loads(texto)
+        assert texto == json.dumps(datos, indent=2, ensure_ascii=False)
+        assert len(datos['productos']) == cantidad
+        assert avances[-1] == len(datos['productos']) + len(datos['movimientos'])
+
+def _cancelar_al_primer_aviso(inv, avances):
+    """Como el progreso de la GUI después de pulsar Cancelar"""
+    def progreso(hecho):
+        avances.append(hecho)
+        raise inv.OperacionCancelada()
+    return progreso
+
+def test_cancelar_corta_la_exportacion_en_el_bloque_siguiente(inv, tmp_path):
+    inventario = _inventario(inv, 25_000)
+    avances = []
+    with pytest.raises(Exception):
+        inventario.exportar_json(str(tmp_path / "datos.json"), _cancelar_al_primer_aviso(inv, avances))
+    assert avances == [10_000]
+
+    for tipo in ('inventario', 'valor', 'simple'):
+        avances = []
+        with pytest.raises(Exception):
+            inventario.exportar_txt(str(tmp_path / f"{tipo}.txt"), tipo, _cancelar_al_primer_aviso(inv, avances))
+        assert len(avances) == 1
+
+def test_txt_informa_las_lineas_escritas(inv, tmp_path):
+    inventario = _inventario(inv, 3000)
+    avances = []
+    ruta = tmp_path / "inventario.txt"
+    inventario.exportar_txt(str(ruta), 'inventario', avances.append)
+    with open(ruta, encoding='utf-8') as archivo:
+        lineas = len(archivo.read().split('\n'))
+    assert avances == sorted(avances) and avances[-1] == lineas
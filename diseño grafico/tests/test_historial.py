@@ -0,0 +1,101 @@
+import random
+import statistics
+from datetime import datetime, timedelta
+
+import pytest
+
+INICIO = datetime(2024, 3, 1, 8, 0)
+
+def _movimientos(inv, cantidad: int = 400, semilla: int = 7) -> list:
+    """Movimientos de tres productos con fechas desordenadas (como al fusionar un JSON)"""
+    aleatorio = random.Random(semilla)
+    tipos = list(inv.TipoMovimiento)
+    return [inv.MovimientoInventario(aleatorio.choice("ABC"), aleatorio.choice(tipos), aleatorio.randint(1, 20),
+                                     INICIO + timedelta(minutes=aleatorio.randrange(10_000)))
+            for _ in range(cantidad)]
+
+@pytest.mark.parametrize('historial_compacto', [False, True])
+def test_rangos_de_fechas_como_un_filtro(inv, historial_compacto):
+    inventario = inv.Inventario(historial_compacto=historial_compacto)
+    movimientos = _movimientos(inv)
+    for movimiento in movimientos:
+        inventario._incorporar_movimiento(movimiento)
+
+    def clave(m):
+        return m.producto_codigo, m.tipo.value, m.cantidad, m.fecha
+
+    aleatorio = random.Random(1)
+    for _ in range(50):
+        desde = INICIO + timedelta(minutes=aleatorio.randrange(10_000))
+        hasta = desde + timedelta(minutes=aleatorio.randrange(3_000))
+        codigo = aleatorio.choice([None, "A", "B", "C", "Z"])
+        esperados = sorted((m for m in movimientos if desde <= m.fecha <= hasta
+                            and codigo in (None, m.producto_codigo)), key=lambda m: m.fecha)
+        obtenidos = inventario.movimientos_entre(desde, hasta, codigo)
+        assert [m.fecha for m in obtenidos] == [m.fecha for m in esperados]
+        assert sorted(map(clave, obtenidos)) == sorted(map(clave, esperados))
+
+    # Los bordes del rango se incluyen
+    fecha = movimientos[0].fecha
+    assert all(m.fecha == fecha for m in inventario.movimientos_entre(fecha, fecha))
+    assert inventario.movimientos_entre(fecha, fecha)
+
+    ultimos = inventario.historial_producto("A", 5)
+    de_a = sorted((m.fecha for m in movimientos if m.producto_codigo == "A"))
+    assert [m.fecha for m in ultimos] == de_a[-5:]
+    assert [m.fecha for m in inventario.obtener_historial(3)] == sorted(m.fecha for m in movimientos)[-3:]
+
+def test_welford_coincide_con_el_calculo_directo(inv):
+    aleatorio = random.Random(3)
+    cantidades = [aleatorio.randint(1, 500) for _ in range(1000)]
+    una_a_una = inv.EstadisticasProducto()
+    epoch = inv.MovimientoInventario.fecha_a_epoch(INICIO)
+    for cantidad in cantidades:
+        una_a_una.registrar(inv.TipoMovimiento.SALIDA, cantidad, epoch)
+    assert una_a_una.salidas == len(cantidades)
+    assert una_a_una.unidades_salida == sum(cantidades)
+    assert una_a_una.media_salida == pytest.approx(statistics.fmean(cantidades))
+    assert una_a_una.varianza_salida == pytest.approx(statistics.variance(cantidades))
+
+def test_lotes_combinados_con_chan_igual_que_uno_a_uno(inv):
+    aleatorio = random.Random(5)
+    epoch = inv.MovimientoInventario.fecha_a_epoch(INICIO)
+    una_a_una = inv.EstadisticasProducto()
+    por_lotes = inv.EstadisticasProducto()
+    todas = []
+    for _ in range(40):
+        lote = [aleatorio.randint(1, 100) for _ in range(aleatorio.randint(1, 30))]
+        todas += lote
+        for cantidad in lote:
+            una_a_una.registrar(inv.TipoMovimiento.SALIDA, cantidad, epoch)
+        por_lotes.registrar_salidas(lote, epoch)
+    assert por_lotes.salidas == una_a_una.salidas == len(todas)
+    assert por_lotes.media_salida == pytest.approx(una_a_una.media_salida)
+    assert por_lotes.varianza_salida == pytest.approx(statistics.variance(todas))
+    assert por_lotes.tasa_consumo(INICIO) == pytest.approx(una_a_una.tasa_consumo(INICIO))
+
+def test_registrar_movimientos_suma_las_estadisticas(inv):
+    inventario = inv.Inventario()
+    inventario.registrar_producto(inv.Producto("A", "Cable", 2.0, 1000))
+    inventario.registrar_movimientos([("A", "salida", 3), ("A", "salida", 9), ("A", "entrada", 4)])
+    inventario.salida_stock("A", 6)
+    datos = inventario.estadisticas_producto("A")
+    assert (datos['salidas'], datos['unidades_salida'], datos['entradas']) == (3, 18, 1)
+    assert datos['media_salida'] == pytest.approx(6.0)
+    assert datos['varianza_salida'] == pytest.approx(statistics.variance([3, 9, 6]))
+    assert inventario.estadisticas_producto("Z") is None
+
+def test_indice_mezcla_los_que_llegan_fuera_de_orden(inv):
+    # Fechas con muchas repeticiones: a igual fecha se conserva el orden de llegada
+    aleatorio = random.Random(3)
+    indice = inv.IndiceMovimientos()
+    llegados = []
+    for posicion in range(2_000):
+        codigo, epoch = aleatorio.choice("AB"), aleatorio.randrange(300)
+        indice.agregar(posicion, codigo, epoch)
+        llegados.append((epoch, posicion, codigo))
+        if posicion % 500 == 499:
+            # Una consulta en medio del lote mezcla lo pendiente
+            assert list(indice.posiciones()) == [p for _, p, _ in sorted(llegados)]
+    assert list(indice.posiciones()) == [p for _, p, _ in sorted(llegados)]
+    assert list(indice.posiciones("B", ultimos=5)) == [p for _, p, c in sorted(llegados) if c == "B"][-5:]
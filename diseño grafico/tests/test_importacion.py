@@ -0,0 +1,153 @@
+import csv
+import random
+
+import pytest
+
+from conftest import escribir_csv, estado
+
+BASE = [
+    ("A1", "Laptop", 1000.0, 10, 2, True),
+    ("B2", "Mouse", 25.5, 50, 5, True),
+    ("C3", "Teclado", 80.0, 3, 5, True),
+    ("D4", "Monitor", 300.0, 0, 1, False),
+]
+
+# Repite códigos dentro del archivo y trae filas idénticas, cambiadas, nuevas y con errores
+FILAS_CSV = [
+    ("A1", "Laptop", 1000.0, 10, 2, True),
+    ("B2", "Mouse óptico", 25.5, 50, 5, True),
+    ("E5", "Router", 60.0, 7, 5, True),
+    ("E5", "Router", 65.0, 7, 5, True),
+    ("C3", "Teclado", "caro", 3, 5, True),
+    ("F6", "Cámara", 120.0, 2, 5, "no"),
+    ("A1", "Laptop", 1000.0, 10, 2, True),
+]
+
+def _con_base(inv, clase):
+    inventario = clase()
+    for codigo, nombre, precio, stock, stock_minimo, activo in BASE:
+        producto = inv.Producto(codigo, nombre, precio, stock, stock_minimo)
+        producto._activo = activo
+        inventario.registrar_producto(producto)
+    return inventario
+
+@pytest.mark.parametrize('modo', ['agregar', 'actualizar', 'reemplazar'])
+def test_sqlite_importa_igual_que_la_memoria(inv, tmp_path, modo):
+    ruta = escribir_csv(tmp_path / "productos.csv", FILAS_CSV)
+    memoria = _con_base(inv, inv.Inventario)
+    sqlite = _con_base(inv, inv.InventarioSQLite)
+
+    # Lotes de 2 filas: los códigos repetidos caen en lotes distintos y en el mismo lote
+    for tamano_lote in (2, 10):
+        resultado_memoria = memoria.importar_csv(ruta, modo, tamano_lote, ruta_errores=str(tmp_path / "e1.csv"))
+        resultado_sqlite = sqlite.importar_csv(ruta, modo, tamano_lote, ruta_errores=str(tmp_path / "e2.csv"))
+        assert resultado_sqlite == resultado_memoria
+        assert estado(sqlite) == estado(memoria)
+    sqlite.cerrar()
+
+def test_omite_las_filas_sin_cambios(inv, tmp_path):
+    for clase in (inv.Inventario, inv.InventarioSQLite):
+        inventario = _con_base(inv, clase)
+        avisados = []
+        inventario.agregar_observador(avisados.append)
+        marca = inventario.marca_cambios
+
+        ruta = escribir_csv(tmp_path / "iguales.csv", BASE)
+        for modo in ('agregar', 'actualizar'):
+            assert inventario.importar_csv(ruta, modo) == (0, 0)
+        assert inventario.marca_cambios == marca
+        assert avisados == []
+
+        # Solo la fila que cambia cuenta como actualizada y queda marcada
+        cambiadas = [fila if fila[0] != "C3" else ("C3", "Teclado", 80.0, 30, 5, True) for fila in BASE]
+        assert inventario.importar_csv(escribir_csv(tmp_path / "una.csv", cambiadas), 'actualizar') == (0, 1)
+        cambiados, eliminados = inventario.cambios_desde(marca)
+        assert [p.codigo for p in cambiados] == ["C3"] and eliminados == []
+        inventario.cerrar()
+
+def _leer(ruta) -> list:
+    with open(ruta, newline='', encoding='utf-8') as archivo:
+        return list(csv.DictReader(archivo))
+
+def test_exportacion_incremental(inv, tmp_path):
+    for clase in (inv.Inventario, inv.InventarioSQLite):
+        inventario = _con_base(inv, clase)
+        marca = inventario.exportar_csv(str(tmp_path / "completo.csv"))
+        assert len(_leer(tmp_path / "completo.csv")) == len(BASE)
+
+        # Sin cambios, el delta solo trae el encabezado
+        assert inventario.exportar_csv(str(tmp_path / "vacio.csv"), desde_marca=marca) == marca
+        assert _leer(tmp_path / "vacio.csv") == []
+
+        inventario.entrada_stock("A1", 4)
+        inventario.actualizar_precio("B2", 27.0)
+        inventario.actualizar_precio("B2", 28.0)
+        nueva_marca = inventario.exportar_csv(str(tmp_path / "delta.csv"), desde_marca=marca)
+        filas = {fila['codigo']: fila for fila in _leer(tmp_path / "delta.csv")}
+        assert set(filas) == {"A1", "B2"}
+        assert filas["A1"]['stock'] == '14' and filas["B2"]['precio'] == '28.0'
+        assert {fila['eliminado'] for fila in filas.values()} == {'False'}
+
+        # Reemplazar el catálogo deja lápidas para los códigos que ya no están
+        inventario.avanzar_marca_exportacion(nueva_marca)
+        inventario.importar_csv(escribir_csv(tmp_path / "nuevo.csv", BASE[:2]), 'reemplazar')
+        inventario.exportar_csv(str(tmp_path / "lapidas.csv"), desde_marca=nueva_marca)
+        eliminados = {fila['codigo'] for fila in _leer(tmp_path / "lapidas.csv") if fila['eliminado'] == 'True'}
+        assert eliminados == {"C3", "D4"}
+        with pytest.raises(ValueError):
+            inventario.cambios_desde(marca)
+        inventario.cerrar()
+
+def _csv_grande(ruta, cantidad: int = 3000) -> str:
+    """Códigos repetidos, filas con error y nombres entre comillas con comas y saltos de línea"""
+    aleatorio = random.Random(4)
+    with open(ruta, 'w', newline='', encoding='utf-8') as archivo:
+        escritor = csv.writer(archivo)
+        escritor.writerow(['codigo', 'nombre', 'precio', 'stock', 'stock_minimo', 'activo'])
+        for i in range(cantidad):
+            codigo = f"P{aleatorio.randrange(cantidad // 2):05d}"
+            nombre = aleatorio.choice(["Cable", "Monitor, 24\"", "Mouse\ninalámbrico", "Router"])
+            precio = aleatorio.choice([str(aleatorio.randint(1, 900)), "-3", "gratis"])
+            escritor.writerow([codigo, nombre, precio, aleatorio.randint(0, 40), 5, aleatorio.choice(["true", "no"])])
+    return str(ruta)
+
+@pytest.mark.parametrize('modo', ['agregar', 'actualizar', 'reemplazar'])
+def test_importacion_paralela_igual_que_la_secuencial(inv, tmp_path, modo):
+    ruta = _csv_grande(tmp_path / "grande.csv")
+@pytest.mark.parametrize('modo', ['agregar', 'actualizar', 'reemplazar'])
+def test_importacion_paralela_igual_que_la_secuencial(inv, tmp_path, modo):
+    ruta = _csv_grande(tmp_path / "grande.csv")
+    secuencial = _con_base(inv, inv.Inventario)
+    paralelo = _con_base(inv, inv.Inventario)
+    # Con el hilo de fsync del diario vivo, como en la GUI
+    paralelo.usar_diario(inv.DiarioInventario(str(tmp_path / "diario")))
+    try:
+        esperado = secuencial.importar_csv(ruta, modo, ruta_errores=str(tmp_path / "errores1.csv"))
+        obtenido = paralelo.importar_csv_paralelo(ruta, modo, procesos=2, ruta_errores=str(tmp_path / "errores2.csv"))
+    finally:
+        paralelo.cerrar()
+    assert obtenido == esperado
+    assert estado(paralelo) == estado(secuencial)
+    assert _leer(tmp_path / "errores2.csv") == _leer(tmp_path / "errores1.csv")
+    assert _leer(tmp_path / "errores1.csv")
+
+def test_archivo_de_errores_conserva_los_campos(inv, tmp_path, capsys):
+    ruta = tmp_path / "comillas.csv"
+    with open(ruta, 'w', newline='', encoding='utf-8') as archivo:
+        escritor = csv.writer(archivo)
+        escritor.writerow(['codigo', 'nombre', 'precio', 'stock', 'stock_minimo', 'activo'])
+        escritor.writerow(['M1', 'Monitor, 24"', 'caro', 3, 5, 'true'])
+        escritor.writerow(['M2', 'Mouse\ninalámbrico', '-1', 3, 5, 'true'])
+        escritor.writerow(['M3', 'Router', 60, 3, 5, 'true'])
+
+    # Sin archivo de errores, un solo aviso con la cantidad
+    assert inv.Inventario().importar_csv(str(ruta)) == (1, 0)
+    assert capsys.readouterr().out.count('\n') == 1
+
+    for importar in ('importar_csv', 'importar_csv_paralelo'):
+        ruta_errores = tmp_path / f"errores-{importar}.csv"
+        getattr(inv.Inventario(), importar)(str(ruta), ruta_errores=str(ruta_errores))
+        filas = _leer(ruta_errores)
+        assert [(fila['fila'], fila['campo'], fila['nombre']) for fila in filas] == \
+               [('2', 'precio', 'Monitor, 24"'), ('3', 'precio', 'Mouse\ninalámbrico')]
+    assert capsys.readouterr().out == ''
@@ -0,0 +1,39 @@
+import pytest
+
+def _inventarios(inv):
+    return [inv.Inventario(), inv.InventarioConcurrente(), inv.InventarioSQLite(), inv.InventarioParticionado(2)]
+
+@pytest.fixture
+def inventarios(inv):
+    lista = _inventarios(inv)
+    for inventario in lista:
+        inventario.registrar_producto(inv.Producto("A1", "Laptop", 1000.0, 10))
+        inventario.registrar_producto(inv.Producto("B2", "Mouse", 25.0, 5))
+    yield lista
+    for inventario in lista:
+        inventario.cerrar()
+
+def test_rechaza_registros_mal_formados_sin_cortar_el_lote(inv, inventarios):
+    registros = [
+        ("A1", "salida", 3),
+        42,                              # no es una secuencia
+        iter(("A1", "devolucion", 3)),   # se desarma pero no se puede indexar
+        ("A1", "salida"),                # le falta la cantidad
+        (["A1"], "salida", 1),           # código no hasheable
+        (7, "entrada", 1),               # código que no es texto
+        ("A1", "devolucion", 1),         # tipo desconocido
+        ("B2", "salida", "muchas"),      # cantidad no numérica
+        ("B2", "salida", 0),
+        ("Z9", "entrada", 1),            # producto inexistente
+        ("B2", inv.TipoMovimiento.SALIDA, 2),
+    ]
+    for inventario in inventarios:
+        aplicados, rechazados = inventario.registrar_movimientos(registros)
+        assert aplicados == 2
+        assert [numero for numero, _ in rechazados] == list(range(2, 11))
+        motivos = dict(rechazados)
+        assert motivos[2] == "Se esperaba (codigo, tipo, cantidad)"
+        assert motivos[5] == "Código no válido: ['A1']"
+        assert motivos[7] == "Tipo de movimiento desconocido: 'devolucion'"
+        assert inventario.buscar_producto("A1").stock == 7
+        assert inventario.buscar_producto("B2").stock == 3
@@ -0,0 +1,13 @@
+def test_pagina_activos_en_todos_los_inventarios(inv):
+    for clase in (inv.Inventario, inv.InventarioConcurrente, inv.InventarioSQLite, inv.InventarioParticionado):
+        inventario = clase()
+        try:
+            for i in range(60):
+                inventario.registrar_producto(inv.Producto(f"C{i:02d}", f"Cosa {i}", 1.0, 5))
+                if i % 4 == 0:
+                    inventario.cambiar_estado(f"C{i:02d}", False)
+            esperado = [p.codigo for p in inventario.productos_activos]
+            for inicio, cantidad in [(0, 10), (12, 25), (40, 30), (45, 5), (0, 0)]:
+                assert [p.codigo for p in inventario.pagina_activos(inicio, cantidad)] == esperado[inicio:inicio + cantidad]
+        finally:
+            inventario.cerrar()
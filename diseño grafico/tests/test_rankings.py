@@ -0,0 +1,91 @@
+import random
+
+import pytest
+
+def _abc_ordenando(valores: list, umbrales=(0.80, 0.95)) -> dict:
+    """Referencia: ordena todo y corta donde el acumulado alcanza cada umbral"""
+    total = sum(valor for valor, _ in valores)
+    clases = {'A': [], 'B': [], 'C': []}
+    acumulado = 0.0
+    for valor, codigo in sorted(valores, key=lambda par: (-par[0], par[1])):
+        if total > 0 and acumulado < umbrales[0] * total:
+            clases['A'].append(codigo)
+        elif total > 0 and acumulado < umbrales[1] * total:
+            clases['B'].append(codigo)
+        else:
+            clases['C'].append(codigo)
+        acumulado += valor
+    return clases
+
+def test_lista_ordenada_como_una_lista(inv):
+    aleatorio = random.Random(11)
+    inv.ListaOrdenada.CARGA, carga = 8, inv.ListaOrdenada.CARGA
+    try:
+        elementos = set(aleatorio.sample(range(100_000), 500))
+        lista = inv.ListaOrdenada(elementos)
+        for _ in range(3000):
+            if elementos and aleatorio.random() < 0.5:
+                elemento = aleatorio.choice(sorted(elementos))
+                elementos.discard(elemento)
+                lista.quitar(elemento)
+            else:
+                elemento = aleatorio.randrange(100_000)
+                if elemento not in elementos:
+                    elementos.add(elemento)
+                    lista.agregar(elemento)
+        ordenados = sorted(elementos)
+        assert list(lista) == ordenados and len(lista) == len(ordenados)
+        for inicio, fin in [(0, 10), (5, 23), (len(ordenados) - 3, len(ordenados) + 5), (40, 40)]:
+            assert list(lista.tramo(inicio, fin)) == ordenados[inicio:fin]
+    finally:
+        inv.ListaOrdenada.CARGA = carga
+
+def test_abc_por_seleccion_igual_que_ordenando(inv):
+    aleatorio = random.Random(2)
+    for _ in range(30):
+        # Valores enteros con muchos repetidos: los empates se deciden por código
+        valores = [(float(aleatorio.choice([0, 1, 5, 5, 10, 50, aleatorio.randint(1, 1000)])), f"P{i:04d}")
+                   for i in range(aleatorio.randint(0, 400))]
+        obtenido = inv.clasificar_abc(list(valores))
+        esperado = _abc_ordenando(valores)
+        assert {clase: sorted(codigos) for clase, codigos in obtenido.items()} == \
+               {clase: sorted(codigos) for clase, codigos in esperado.items()}
+
+def test_top_y_paginas_con_el_catalogo_cambiando(inv):
+    aleatorio = random.Random(9)
+    inventario = inv.Inventario()
+    # Orden incremental desde el primer producto, para probar los pendientes
+    inventario.UMBRAL_ORDEN_VALOR = 0
+    for i in range(300):
+        inventario.registrar_producto(inv.Producto(f"C{i:03d}", f"Producto {i}", aleatorio.choice([1.0, 2.5, 10.0]),
+                                                   aleatorio.randint(0, 50)))
+    for _ in range(20):
+        for _ in range(10):
+            codigo = f"C{aleatorio.randrange(300):03d}"
+            accion = aleatorio.random()
+            if accion < 0.4:
+                inventario.entrada_stock(codigo, aleatorio.randint(1, 30))
+            elif accion < 0.7:
+                inventario.actualizar_precio(codigo, aleatorio.choice([1.0, 3.0, 7.5]))
+            else:
+                inventario.cambiar_estado(codigo, aleatorio.random() < 0.5)
+        esperado = sorted(inventario.productos_activos, key=lambda p: (-p.precio * p.stock, p.codigo))
+        assert [p.codigo for p in inventario.top_productos(15)] == [p.codigo for p in esperado[:15]]
+        assert [p.codigo for p in inventario.pagina_ranking(3, 20)] == [p.codigo for p in esperado[40:60]]
+        assert [p.codigo for p in inventario.iterar_ranking_valor()] == [p.codigo for p in esperado]
+
+def test_criterio_desconocido_siempre_es_value_error(inv):
+    for clase in (inv.Inventario, inv.InventarioConcurrente, inv.InventarioSQLite, inv.InventarioParticionado):
+        inventario = clase()
+        try:
+            # Vacío (sin candidatos) y con productos, con y sin stock bajo
+            for stock in (None, 1, 100):
+                if stock is not None:
+                    inventario.registrar_producto(inv.Producto(f"S{stock}", "Cosa", 2.0, stock))
+                with pytest.raises(ValueError):
+                    inventario.top_productos(5, 'precio')
+                with pytest.raises(ValueError):
+                    inventario.pagina_ranking(2, 5, 'precio')
+            assert [p.codigo for p in inventario.top_productos(5, 'deficit')] == ["S1"]
+        finally:
+            inventario.cerrar()
@@ -0,0 +1,87 @@
+import sqlite3
+from datetime import datetime, timedelta
+
+import pytest
+
+from conftest import escribir_csv
+
+FILAS = [
+    ("A1", "Laptop", 1000.0, 10, 2, True),
+    ("B2", "Mouse", 25.5, 50, 5, True),
+    ("C3", "Teclado", 80.0, 3, 5, True),
+    ("D4", "Monitor", 300.0, 0, 1, False),
+]
+
+def _totales(inventario):
+    return (inventario.total_productos, inventario.total_activos,
+            round(inventario.valor_total, 6), inventario.total_stock_bajo)
+
+@pytest.mark.parametrize('modo', ['agregar', 'actualizar', 'reemplazar'])
+def test_agregados_iguales_a_la_memoria(inv, tmp_path, modo):
+    ruta_bd = str(tmp_path / "inventario.db")
+    memoria, sqlite = inv.Inventario(), inv.InventarioSQLite(ruta_bd)
+    for inventario in (memoria, sqlite):
+        inventario.importar_csv(escribir_csv(tmp_path / "base.csv", FILAS), 'agregar')
+        inventario.salida_stock("B2", 46)
+        inventario.entrada_stock("C3", 10)
+        inventario.actualizar_precio("A1", 900.0)
+        inventario.cambiar_estado("D4", True)
+        inventario.registrar_movimientos([("A1", "salida", 9), ("C3", "salida", 1)])
+        otras = [("A1", "Laptop", 950.0, 1, 2, False), ("E5", "Router", 60.0, 7, 5, True)]
+        inventario.importar_csv(escribir_csv(tmp_path / "otras.csv", otras), modo)
+    assert _totales(sqlite) == _totales(memoria)
+
+    sqlite.cerrar()
+    reabierto = inv.InventarioSQLite(ruta_bd)
+    assert _totales(reabierto) == _totales(memoria)
+    reabierto.cerrar()
+
+def test_agregados_de_una_base_anterior(inv, tmp_path):
+    ruta_bd = str(tmp_path / "anterior.db")
+    conexion = sqlite3.connect(ruta_bd)
+    conexion.execute("CREATE TABLE productos (codigo TEXT PRIMARY KEY, nombre TEXT NOT NULL, precio REAL NOT NULL,"
+                     " stock INTEGER NOT NULL, stock_minimo INTEGER NOT NULL, activo INTEGER NOT NULL)")
+    conexion.executemany("INSERT INTO productos VALUES (?, ?, ?, ?, ?, ?)",
+                         [fila[:5] + (int(fila[5]),) for fila in FILAS])
+    conexion.commit()
+    conexion.close()
+
+    inventario = inv.InventarioSQLite(ruta_bd)
+    assert _totales(inventario) == (4, 3, 11515.0, 1)
+    inventario.salida_stock("A1", 8)
+    assert _totales(inventario) == (4, 3, 3515.0, 2)
+    inventario.cerrar()
+
+def test_estadisticas_al_reabrir(inv, tmp_path):
+    ruta_bd = str(tmp_path / "inventario.db")
+    sqlite = inv.InventarioSQLite(ruta_bd)
+    sqlite.importar_csv(escribir_csv(tmp_path / "base.csv", FILAS), 'agregar')
+    sqlite.salida_stock("A1", 3)
+    sqlite.registrar_movimientos([("B2", "salida", 5), ("B2", "salida", 7), ("C3", "entrada", 4)])
+    ahora = datetime.now() + timedelta(days=1)
+    esperadas = sqlite.estadisticas_movimientos(ahora)
+    sqlite.cerrar()
+
+    # Un producto leído solo, y los movimientos posteriores sumados sobre lo leído
+    reabierto = inv.InventarioSQLite(ruta_bd)
+    assert reabierto.estadisticas_producto("B2", ahora) == esperadas["B2"]
+    assert reabierto.estadisticas_producto("D4") is None
+    reabierto.registrar_movimientos([("B2", "salida", 1), ("A1", "salida", 1)])
+    reabierto.entrada_stock("C3", 2)
+    obtenidas = reabierto.estadisticas_movimientos()
+    assert obtenidas["B2"]["salidas"] == esperadas["B2"]["salidas"] + 1
+    assert obtenidas["A1"]["salidas"] == esperadas["A1"]["salidas"] + 1
+    assert obtenidas["C3"]["entradas"] == esperadas["C3"]["entradas"] + 1
+    reabierto.cerrar()
+
+def test_carga_masiva_fallida_conserva_los_triggers(inv, tmp_path):
+    sqlite = inv.InventarioSQLite()
+    sqlite.importar_csv(escribir_csv(tmp_path / "base.csv", FILAS), 'agregar')
+    antes = _totales(sqlite)
+    with pytest.raises(AttributeError):
+        sqlite.fusionar(None, 'reemplazar')
+    assert _totales(sqlite) == antes
+    # El rollback devolvió los triggers: los cambios siguientes se siguen sumando
+    sqlite.salida_stock("A1", 9)
+    assert _totales(sqlite) == (4, 3, antes[2] - 9000.0, 2)
+    sqlite.cerrar()
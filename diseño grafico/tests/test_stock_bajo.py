@@ -0,0 +1,15 @@
+def test_stock_bajo_en_el_orden_en_que_entraron(inv):
+    inventario = inv.Inventario()
+    for i, stock in enumerate([2, 50, 1, 50, 3, 50]):
+        inventario.registrar_producto(inv.Producto(f"S{i}", f"Cosa {i}", 1.0, stock, 5))
+    assert [p.codigo for p in inventario.productos_stock_bajo] == ["S0", "S2", "S4"]
+
+    # Los que bajan después van al final; el que se repone y vuelve a bajar también
+    inventario.salida_stock("S3", 48)
+    inventario.entrada_stock("S0", 10)
+    inventario.salida_stock("S1", 47)
+    inventario.salida_stock("S0", 10)
+    inventario.cambiar_estado("S2", False)
+    inventario.cambiar_estado("S2", True)
+    assert [p.codigo for p in inventario.productos_stock_bajo] == ["S4", "S3", "S1", "S0", "S2"]
+    assert inventario.total_stock_bajo == 5